@@ -0,0 +1,77 @@
+"""
+Benchmark fuzzy SOC title matching for the smart search (/soc-smart-list/).
+
+Compares the original per-row fuzz.partial_ratio loop with the precomputed SocTitleCorpus on a synthetic corpus. The
+default size is 10x the ~800 occupations in the SocDescription model.
+
+Run from the api directory:
+    python -m benchmarks.fuzzy_search --socs 8000 --repeat 20
+"""
+import argparse
+import os
+import random
+import timeit
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jobhopper.settings")
+django.setup()
+
+from rapidfuzz import fuzz  # noqa: E402
+from jobs.search import SocTitleCorpus  # noqa: E402
+
+WORDS = ["registered", "nurses", "truck", "drivers", "heavy", "tractor", "trailer", "teachers", "elementary",
+         "school", "except", "special", "education", "software", "developers", "applications", "managers",
+         "financial", "accountants", "auditors", "waiters", "waitresses", "cooks", "restaurant", "clerks", "general",
+         "office", "customer", "service", "representatives", "laborers", "freight", "stock", "material", "movers",
+         "hand", "maintenance", "repair", "workers", "physicians", "surgeons", "all", "other", "analysts"]
+KEYWORDS = ["nurse", "driver", "teacher", "software", "accountant", "cook", "29-1141", "mechanic"]
+
+
+def synthetic_socs(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [{"id": index,
+             "soc_code": f"{rng.randint(11, 53)}-{rng.randint(1000, 9999)}",
+             "soc_title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).capitalize(),
+             "total_transition_obs": Decimal(rng.randint(0, 500000))}
+            for index in range(count)]
+
+
+def legacy_match(socs, keyword, min_obs, score_cutoff):
+    """
+    Original implementation from SocListSmartViewSet.list
+    """
+    available_socs = [dict(soc) for soc in socs if soc["total_transition_obs"] >= min_obs]
+    for soc_entry in available_socs:
+        soc_string = soc_entry.get("soc_title").lower() + soc_entry.get("soc_code")
+        soc_entry["input_match_score"] = fuzz.partial_ratio(keyword.lower(), soc_string)
+    return [soc for soc in available_socs if soc["input_match_score"] >= score_cutoff]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socs", type=int, default=8000, help="Number of synthetic occupations")
+    parser.add_argument("--repeat", type=int, default=20, help="Searches per keyword")
+    args = parser.parse_args()
+
+    socs = synthetic_socs(args.socs)
+    min_obs, score_cutoff = 1000, 90
+
+    build_seconds = timeit.timeit(lambda: SocTitleCorpus(socs), number=1)
+    corpus = SocTitleCorpus(socs)
+    print(f"Corpus of {args.socs} occupations built in {build_seconds * 1000:.1f} ms")
+
+    for name, search in [("legacy loop", lambda keyword: legacy_match(socs, keyword, min_obs, score_cutoff)),
+                         ("SocTitleCorpus", lambda keyword: corpus.match(keyword, min_obs, score_cutoff))]:
+        seconds = min(timeit.repeat(lambda: [search(keyword) for keyword in KEYWORDS], number=1, repeat=args.repeat))
+        print(f"{name:>15}: {seconds / len(KEYWORDS) * 1000:.2f} ms per keyword")
+
+    for keyword in KEYWORDS:
+        legacy = {soc["soc_code"] for soc in legacy_match(socs, keyword, min_obs, score_cutoff)}
+        vectorized = {soc["soc_code"] for soc, score in corpus.match(keyword, min_obs, score_cutoff)}
+        assert legacy == vectorized, f"Results differ for keyword {keyword}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark cleaning a year of OES data (OESDataDownloader._clean_oes_data).
+
+Compares the original per-element cleaning (.apply(to_float/to_int), a per-row format for soc_decimal_code and a
+query string filter) with the vectorized cleaning, on a synthetic frame with every OES column as text, as read from
+the workbook. The default size matches a full OES year. Both paths build the same output columns: the legacy path
+converts the wage percentiles element by element too, and shares the area columns' code, which has no per-element
+original. The numeric conversion of a single column is also timed on its own.
+
+Run from the api directory:
+    python -m benchmarks.oes_cleaning --rows 400000
+"""
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from data.bls.oes_data_downloader import OESDataDownloader
+from data.bls.utils.constants import OES_XLSX_PARAMS, OES_HOURLY_PERCENTILE_COLUMNS, OES_ANNUAL_PERCENTILE_COLUMNS
+from data.bls.utils.dtype_conversion import to_float, to_int, to_numeric_flagged
+from data.bls.utils.oes_areas import normalize_area_codes, parent_state_codes
+from data.bls.utils.wage_percentiles import WAGE_PERCENTILES_DTYPE
+
+NAICS = ["000000", "113300", "211000", "221100", "236100", "311100", "423100", "524100", "541100", "611100"]
+# (area, area_title, area_type, prim_state)
+AREAS = [
+    ("99", "U.S.", "1", "US"),
+    ("01", "Alabama", "2", "AL"),
+    ("06", "California", "2", "CA"),
+    ("25", "Massachusetts", "2", "MA"),
+    ("48", "Texas", "2", "TX"),
+    ("72", "Puerto Rico", "3", "PR"),
+    ("14460", "Boston-Cambridge-Nashua, MA-NH", "4", "MA"),
+    ("31080", "Los Angeles-Long Beach-Anaheim, CA", "4", "CA"),
+    ("2500004", "Southeast Massachusetts nonmetropolitan area", "6", "MA"),
+    ("4800003", "Big Thicket Region of Texas nonmetropolitan area", "6", "TX"),
+]
+AREA_COLUMNS = ["area", "area_title", "area_type", "prim_state"]
+
+
+def synthetic_oes_frame(rows: int, suppressed_share: float = 0.05, seed: int = 0) -> pd.DataFrame:
+    """
+    Every OES_XLSX_PARAMS column, as text, with footnote markers in a share of the numeric values
+    """
+    rng = np.random.default_rng(seed)
+    areas = np.array(AREAS, dtype=object)[rng.integers(0, len(AREAS), size=rows)]
+    data = {}
+    for name, column_type in OES_XLSX_PARAMS["dtype"].items():
+        if name == "naics":
+            values = rng.choice(NAICS, size=rows)
+        elif name in AREA_COLUMNS:
+            values = areas[:, AREA_COLUMNS.index(name)]
+        elif name == "occ_code":
+            values = np.char.add(np.char.add(rng.integers(11, 54, size=rows).astype(str), "-"),
+                                 rng.integers(1000, 10000, size=rows).astype(str))
+        elif column_type is str:
+            values = np.char.add(f"{name} ", rng.integers(0, 1000, size=rows).astype(str))
+        else:
+            numbers = rng.integers(30, 500000, size=rows) if column_type is int else rng.uniform(10, 200000, rows)
+            values = numbers.astype(str).astype(object)
+            suppressed = rng.random(rows) < suppressed_share
+            values[suppressed] = rng.choice(OES_XLSX_PARAMS["na_values"], size=suppressed.sum())
+        data[name] = pd.Series(values, dtype=object)
+    return pd.DataFrame(data)
+
+
+def legacy_clean(bls_oes_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Original implementation of OESDataDownloader._clean_oes_data, extended to the columns it builds now: the area
+    columns (with the same code), suppressed flags, and wage percentiles converted element by element
+    """
+    include_columns = ["area_title", "occ_code", "occ_title", "h_mean", "a_mean", "tot_emp"]
+    bls_oes_data = bls_oes_data.query("naics == '000000'")
+    markers = OES_XLSX_PARAMS["na_values"]
+
+    def packed_percentiles(columns):
+        values = np.column_stack([bls_oes_data[name].apply(lambda x: to_float(x)) for name in columns])
+        return [row.tobytes() for row in values.astype(WAGE_PERCENTILES_DTYPE)]
+
+    area_type = bls_oes_data["area_type"].apply(lambda x: to_int(x)).astype("Int64")
+    area_code = normalize_area_codes(bls_oes_data["area"], area_type)
+    return (bls_oes_data[include_columns]
+            .assign(area_code=area_code,
+                    area_type=area_type,
+                    state_code=parent_state_codes(area_code, area_type, bls_oes_data["area_title"],
+                                                  bls_oes_data["prim_state"]),
+                    soc_decimal_code=bls_oes_data["occ_code"].apply(lambda x: "{}.00".format(x)),
+                    h_mean=bls_oes_data["h_mean"].apply(lambda x: to_float(x)),
+                    a_mean=bls_oes_data["a_mean"].apply(lambda x: to_float(x)),
+                    tot_emp=bls_oes_data["tot_emp"].apply(lambda x: to_int(x)),
+                    hourly_mean_wage_suppressed=bls_oes_data["h_mean"].isin(markers),
+                    annual_mean_wage_suppressed=bls_oes_data["a_mean"].isin(markers),
+                    total_employment_suppressed=bls_oes_data["tot_emp"].isin(markers),
+                    hourly_wage_percentiles=packed_percentiles(OES_HOURLY_PERCENTILE_COLUMNS),
+                    annual_wage_percentiles=packed_percentiles(OES_ANNUAL_PERCENTILE_COLUMNS))
+            .rename({"occ_code": "soc_code",
+                     "occ_title": "soc_title",
+                     "h_mean": "hourly_mean_wage",
+                     "a_mean": "annual_mean_wage",
+                     "tot_emp": "total_employment"},
+                    axis=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=400000, help="Rows in the synthetic OES frame")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation")
+    args = parser.parse_args()
+
+    data = synthetic_oes_frame(args.rows)
+    print(f"Synthetic OES frame: {len(data)} rows x {len(data.columns)} columns")
+
+    # _clean_oes_data does not use the downloader's state; skip __init__ so that nothing is looked up
+    downloader = OESDataDownloader.__new__(OESDataDownloader)
+    for name, clean in [("legacy apply", legacy_clean), ("vectorized", downloader._clean_oes_data)]:
+        seconds = min(timeit.repeat(lambda: clean(data), number=1, repeat=args.repeat))
+        print(f"{name:>13}: {seconds * 1000:.0f} ms")
+
+    hourly_mean_wage = data.loc[data["naics"] == "000000", "h_mean"]
+    for name, convert in [("apply(to_float)", lambda: hourly_mean_wage.apply(lambda x: to_float(x))),
+                          ("to_numeric_flagged", lambda: to_numeric_flagged(hourly_mean_wage,
+                                                                            OES_XLSX_PARAMS["na_values"]))]:
+        seconds = min(timeit.repeat(convert, number=1, repeat=args.repeat))
+        print(f"h_mean only, {name:>18}: {seconds * 1000:.0f} ms")
+
+    legacy, vectorized = legacy_clean(data), downloader._clean_oes_data(data)
+    assert set(legacy.columns) == set(vectorized.columns), set(legacy.columns) ^ set(vectorized.columns)
+    for column in legacy.columns:
+        expected = legacy[column]
+        actual = vectorized[column].astype("float64") if column == "total_employment" else vectorized[column]
+        pd.testing.assert_series_equal(expected, actual, check_dtype=False, check_names=False)
+    print(f"Suppressed values flagged: {int(vectorized['hourly_mean_wage_suppressed'].sum())} hourly wages, "
+          f"{int(vectorized['total_employment_suppressed'].sum())} employment counts")
+
+
+if __name__ == "__main__":
+    main()
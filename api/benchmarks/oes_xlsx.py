@@ -0,0 +1,107 @@
+"""
+Benchmark parsing an OES all_data_M_<year>.xlsx workbook.
+
+Compares pd.read_excel on the whole workbook (followed by the NAICS filter and column selection in _clean_oes_data)
+with the streaming read_oes_xlsx reader, on a synthetic workbook with the OES layout. Each reader runs in a fresh
+process, so its peak memory (max RSS) is measured on its own. The default size matches a full OES year.
+
+Run from the api directory:
+    python -m benchmarks.oes_xlsx --rows 350000
+"""
+import argparse
+import random
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import Workbook
+
+from data.bls.utils.constants import OES_XLSX_PARAMS
+from data.bls.utils.oes_xlsx_reader import read_oes_xlsx, OES_COLUMNS, CROSS_INDUSTRY_NAICS
+
+AREAS = ["U.S.", "Alabama", "Alaska", "Arizona", "California", "Colorado", "Massachusetts", "New York", "Texas"]
+NAICS = ["113300", "211000", "221100", "236100", "311100", "423100", "524100", "541100", "611100", "722500"]
+SUPPRESSED = ["*", "**", "#"]
+
+
+def write_synthetic_workbook(path: Path, rows: int, cross_industry_share: float, seed: int = 0):
+    """
+    Write a workbook with the OES columns (OES_XLSX_PARAMS) and a mix of cross-industry and industry rows
+    """
+    rng = random.Random(seed)
+    columns = list(OES_XLSX_PARAMS["dtype"])
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([name.upper() for name in columns])
+    for index in range(rows):
+        naics = CROSS_INDUSTRY_NAICS if rng.random() < cross_industry_share else rng.choice(NAICS)
+        occ_code = f"{rng.randint(11, 53)}-{rng.randint(1000, 9999)}"
+        row = []
+        for name, column_type in OES_XLSX_PARAMS["dtype"].items():
+            if name == "naics":
+                row.append(naics)
+            elif name == "area_title":
+                row.append(rng.choice(AREAS))
+            elif name == "occ_code":
+                row.append(occ_code)
+            elif column_type is str:
+                row.append(f"{name} {rng.randint(0, 999)}")
+            elif rng.random() < 0.05:
+                row.append(rng.choice(SUPPRESSED))
+            elif column_type is int:
+                row.append(rng.randint(30, 500000))
+            else:
+                row.append(round(rng.uniform(10, 200000), 2))
+        sheet.append(row)
+    workbook.save(path)
+
+
+def read_with_pandas(path: Path) -> pd.DataFrame:
+    """
+    Original approach from OESDataDownloader.download_oes_data and _clean_oes_data
+    """
+    data = pd.read_excel(path, engine="openpyxl", dtype={"NAICS": str})
+    data.columns = [str(name).lower() for name in data.columns]
+    return data[data["naics"].astype(str) == CROSS_INDUSTRY_NAICS][OES_COLUMNS]
+
+
+def measure(read, path: Path):
+    """
+    Run a reader, returning the SOC codes it kept, seconds taken and the process's peak memory in bytes
+    """
+    started = time.perf_counter()
+    data = read(path)
+    seconds = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux
+    return data["occ_code"].tolist(), seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=350000, help="Rows in the synthetic workbook")
+    parser.add_argument("--cross-industry-share", type=float, default=0.15,
+                        help="Share of rows with the cross-industry NAICS code")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "all_data_M_synthetic.xlsx"
+        started = time.perf_counter()
+        write_synthetic_workbook(path, rows=args.rows, cross_industry_share=args.cross_industry_share)
+        print(f"Wrote {args.rows} rows to {path.name} in {time.perf_counter() - started:.1f} s")
+
+        results = {}
+        for name, read in [("pd.read_excel", read_with_pandas), ("read_oes_xlsx", read_oes_xlsx)]:
+            with ProcessPoolExecutor(max_workers=1) as process:
+                occ_codes, seconds, peak = process.submit(measure, read, path).result()
+            results[name] = occ_codes
+            print(f"{name:>14}: {seconds:.1f} s, peak RSS {peak / 2 ** 20:.0f} MiB, {len(occ_codes)} rows kept")
+
+    assert results["pd.read_excel"] == results["read_oes_xlsx"], "Readers kept different rows"
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 from lxml import html
 import requests
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
 
 from pathlib import Path
-
 import os
-from io import BytesIO
-from zipfile import ZipFile
-from urllib.request import urlopen
-from data.bls.utils.dtype_conversion import to_float, to_int
 
-from concurrent.futures import ThreadPoolExecutor
+from data.bls.utils.constants import OES_XLSX_PARAMS, OES_HOURLY_PERCENTILE_COLUMNS, OES_ANNUAL_PERCENTILE_COLUMNS
+from data.bls.utils.dtype_conversion import to_numeric_flagged
+from data.bls.utils.oes_xlsx_reader import read_oes_xlsx, CROSS_INDUSTRY_NAICS
+from data.bls.utils.oes_cache import OESParquetCache, file_sha256
+from data.bls.utils.oes_areas import normalize_area_codes, parent_state_codes
+from data.bls.utils.wage_percentiles import pack_wage_percentiles
+from data.bls.utils.oes_industry import (write_industry_partitions, read_industry_marker, read_industries,
+                                         iter_industry_partitions)
+from data.bls.utils.oes_download import DownloadManifest, download_file, extract_member
+from data.instrumentation import load_report, measure_stage, collect_stages, record_stages, file_size
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import logging
 
@@ -19,27 +29,50 @@ log = logging.getLogger()
 log.setLevel(logging.INFO)
 
 
-# TODO: *, #, and ** are not returned as NA
 class OESDataDownloader(object):
     """
     Download BLS data on Occupational Employment Statistics (OES). Data for various years provided
     at https://www.bls.gov/oes/tables.htm
 
     Data format: Zip folder, with a single Excel file containing OES data, at least for 2018 and 2019
+
+    The BLS site can be swapped for a mirror (or a local stand-in) with the BLS_BASE_URL environment variable.
     """
 
+    # Version of _clean_oes_data. Bump it when the cleaning changes, so that cached years are cleaned again.
+    CLEANER_VERSION = 4
+    # Version of the industry-specific cleaning (see data.bls.utils.oes_industry)
+    INDUSTRY_CLEANER_VERSION = 2
+
     def __init__(self, year: int = 2019):
         """
         :param year: String indicating the year for the download. Zip names are in
             oesm<last 2 digits of year>all.zip format.
         :param tempfile_dir: Specify a (temp)file directory
         """
-        self.base_url = "https://www.bls.gov/"
-        self.oes_data_url = "https://www.bls.gov/oes/tables.htm"
+        self.base_url = os.getenv("BLS_BASE_URL", "https://www.bls.gov/")
+        self.oes_data_url = "{}oes/tables.htm".format(self.base_url)
         self.oes_zipname = "oesm{}all".format(year[2:4])
         self.year = year
 
-        self.oes_download_path = self._get_oes_download_path()
+        self.download_dir = Path(__file__).parent / "downloads"
+        self.cache = OESParquetCache(self.download_dir)
+        self.manifest = DownloadManifest(self.download_dir / "manifest.json")
+        self._oes_download_path = None
+
+    @property
+    def oes_download_path(self) -> str:
+        """
+        Download link for the year's zip file. Looked up from the BLS site on first use, so loading a cached year
+        never touches the network, and recorded in the download manifest, so the site is only scraped once per year.
+        """
+        if self._oes_download_path is None:
+            url = self.manifest.get(self.year).get("url")
+            if url is None or not url.startswith(self.base_url):
+                url = self._get_oes_download_path()
+                self.manifest.update(self.year, url=url)
+            self._oes_download_path = url
+        return self._oes_download_path
 
     def _get_oes_download_path(self) -> str:
         """
@@ -68,92 +101,180 @@ class OESDataDownloader(object):
         are the only selection options in the final product.
             * naics = 0 represents all industries
 
-        We also only want data from areas corresponding to the US, and states in the US. Note that MSAs have changed
-        classification since the earliest available dataset.
+        Every area is kept (see OES_AREA_TYPES), identified by its area_code, since titles change between years. Note
+        that MSAs have changed classification since the earliest available dataset.
             * area_type = 1 represents the US
             * area_type = 2 represents US States
-        """
-        include_columns = ["area_title", "occ_code", "occ_title", "h_mean", "a_mean", "tot_emp"]
+            * area_type = 4 represents metropolitan statistical areas (MSAs), and 6 nonmetropolitan areas. Their
+              state_code is the area code of the (primary) state they belong to.
 
+        Wages and employment are converted to numbers column by column, with BLS footnote markers (*, ** and #) as NA.
+        A <column>_suppressed flag records which values were markers rather than missing. Employment is a nullable
+        integer. The percentile wages (h_pct10 to h_pct90, a_pct10 to a_pct90) are packed into one fixed-width array
+        per row for each of hourly and annual wages (see pack_wage_percentiles).
+        """
         #  Add (area_type == 1 or area_type == 2) to filter to just the U.S. and states
-        bls_oes_data = bls_oes_data.query("naics == '000000'")
-        bls_oes_data = (
-            bls_oes_data[
-                include_columns
-            ]
-                .assign(
-                soc_decimal_code=bls_oes_data["occ_code"].apply(
-                    lambda x: "{}.00".format(x)
-                ),
-                h_mean=bls_oes_data["h_mean"].apply(lambda x: to_float(x)),
-                a_mean=bls_oes_data["a_mean"].apply(lambda x: to_float(x)),
-                tot_emp=bls_oes_data["tot_emp"].apply(lambda x: to_int(x)),
-            )
-                .rename(
-                {
-                    "occ_code": "soc_code",
-                    "occ_title": "soc_title",
-                    "h_mean": "hourly_mean_wage",
-                    "a_mean": "annual_mean_wage",
-                    "tot_emp": "total_employment",
-                },
-                axis=1,
-            )
-        )
+        naics = bls_oes_data["naics"]
+        # NAICS codes are text, but are numbers (000000 -> 0) if the workbook was read without OES_XLSX_PARAMS
+        naics_code = int(CROSS_INDUSTRY_NAICS) if is_numeric_dtype(naics) else CROSS_INDUSTRY_NAICS
+        # Take the cross-industry rows of the used columns only, rather than filtering every column of the frame
+        rows = np.flatnonzero((naics == naics_code).to_numpy())
+        index = bls_oes_data.index[rows]
+
+        def column(name: str) -> pd.Series:
+            return pd.Series(bls_oes_data[name].to_numpy()[rows], index=index)
+
+        markers = OES_XLSX_PARAMS["na_values"]
+        hourly_mean_wage, hourly_mean_wage_suppressed = to_numeric_flagged(column("h_mean"), markers)
+        annual_mean_wage, annual_mean_wage_suppressed = to_numeric_flagged(column("a_mean"), markers)
+        total_employment, total_employment_suppressed = to_numeric_flagged(column("tot_emp"), markers, integer=True)
+        soc_code = column("occ_code").str.strip()
+        area_type = pd.to_numeric(column("area_type"), errors="coerce").astype("Int64")
+        area_code = normalize_area_codes(column("area"), area_type)
+        state_code = parent_state_codes(area_code,
+                                        area_type,
+                                        column("area_title"),
+                                        column("prim_state") if "prim_state" in bls_oes_data else None)
+
+        return pd.DataFrame({
+            "area_title": column("area_title"),
+            "area_code": area_code,
+            "area_type": area_type,
+            "state_code": state_code,
+            "soc_code": soc_code,
+            "soc_title": column("occ_title"),
+            "hourly_mean_wage": hourly_mean_wage,
+            "annual_mean_wage": annual_mean_wage,
+            "total_employment": total_employment,
+            "soc_decimal_code": soc_code + ".00",
+            "hourly_mean_wage_suppressed": hourly_mean_wage_suppressed,
+            "annual_mean_wage_suppressed": annual_mean_wage_suppressed,
+            "total_employment_suppressed": total_employment_suppressed,
+            "hourly_wage_percentiles": pack_wage_percentiles([column(name) for name in OES_HOURLY_PERCENTILE_COLUMNS]),
+            "annual_wage_percentiles": pack_wage_percentiles([column(name) for name in OES_ANNUAL_PERCENTILE_COLUMNS]),
+        })
+
+    def _download_workbook(self, refresh: bool = False) -> Path:
+        """
+        Download the zip folder into the downloads directory and extract the workbook, unless the workbook was already
+        extracted.
 
-        return bls_oes_data
+        The zip is streamed to disk (see download_file), resuming an interrupted download, and only the workbook is
+        extracted from it. A refresh is a conditional request using the validators in the download manifest, so an
+        unchanged zip is not downloaded again.
 
-    def download_oes_data(self, clean_up=False) -> pd.DataFrame:
+        :param refresh: Check for a new zip folder even if the workbook is already in the downloads directory
+        :return: Path to the all_data_M_<year>.xlsx workbook
         """
-        Download the zip folder into the tempfile_dir, and load the Excel file
+        expected_filename = "all_data_M_{}.xlsx".format(self.year)
+        entry = self.manifest.get(self.year)
+        # Path of the workbook within the zip, as extracted
+        local_path = self.download_dir / entry.get("workbook", "{}/{}".format(self.oes_zipname, expected_filename))
+        if local_path.exists() and not refresh:
+            log.info("OES workbook for year {} found in {}".format(self.year, local_path))
+            return local_path
+
+        zip_path = self.download_dir / "{}.zip".format(self.oes_zipname)
+        log.info("Downloading OES data from {} to {}".format(self.oes_download_path, zip_path))
+        with measure_stage(f"oes_{self.year}.download") as stage:
+            download = download_file(self.oes_download_path,
+                                     zip_path,
+                                     etag=entry.get("etag"),
+                                     last_modified=entry.get("last_modified"))
+            stage.bytes_read = file_size(zip_path) if download["changed"] else 0
+        self.manifest.update(self.year, etag=download["etag"], last_modified=download["last_modified"])
+
+        if download["changed"] or not local_path.exists():
+            with measure_stage(f"oes_{self.year}.unzip", bytes_read=file_size(zip_path)):
+                local_path = extract_member(zip_path, expected_filename, self.download_dir)
+            self.manifest.update(self.year, workbook=local_path.relative_to(self.download_dir).as_posix())
+        return local_path
+
+    def download_oes_data(self, clean_up=False, refresh=False) -> pd.DataFrame:
+        """
+        Download the zip folder into the downloads directory, and load the Excel file
         Estimated number of rows: 350K+
+
+        Cleaned data is cached as Parquet (see OESParquetCache), keyed by the workbook's checksum and CLEANER_VERSION.
+        A cached year is loaded without downloading or reading the workbook.
+
+        :param clean_up: Clean the data, keeping cross-industry rows and the columns used by the app. Otherwise, return
+            every row and column of the workbook.
+        :param refresh: Download the workbook again, even if it (or its cleaned data) is available locally. The cleaned
+            data is only rebuilt if the workbook changed.
+        """
+        if clean_up and not refresh and self.cache.is_valid(self.year, self.CLEANER_VERSION):
+            return self.cache.load(self.year)
+
+        excelfile = self._download_workbook(refresh=refresh)
+        log.info("Reading Excel file: {}".format(excelfile))
+        if not clean_up:
+            return read_oes_xlsx(excelfile, columns=None, naics=None)
+
+        source_sha256 = file_sha256(excelfile)
+        if self.cache.is_valid(self.year, self.CLEANER_VERSION, source_sha256=source_sha256):
+            log.info("OES workbook for year {} is unchanged".format(self.year))
+            return self.cache.load(self.year)
+
+        # Stream the workbook, keeping only the cross-industry rows and columns that the cleaning step uses. Values are
+        # kept as text, so that cleaning can tell suppressed estimates from missing ones.
+        with measure_stage(f"oes_{self.year}.parse", bytes_read=file_size(excelfile)) as stage:
+            df = read_oes_xlsx(excelfile, dtype={}, na_values=[])
+            stage.rows_out = len(df)
+
+        log.info("Cleaning file and caching it for faster loading in future runs.")
+        with measure_stage(f"oes_{self.year}.clean", rows_in=len(df)) as stage:
+            df = self._clean_oes_data(bls_oes_data=df)
+            df = df.assign(file_year=int(self.year)).reset_index(drop=True)
+            stage.rows_out = len(df)
+
+        with measure_stage(f"oes_{self.year}.write", rows_in=len(df)) as stage:
+            self.cache.save(self.year,
+                            df,
+                            source_sha256=source_sha256,
+                            cleaner_version=self.CLEANER_VERSION)
+            stage.rows_out = len(df)
+        return df
+
+    def cache_oes_data(self, refresh=False) -> Path:
         """
-        log.info("Downloading OES data from {} if it has not been downloaded already".format(self.oes_download_path))
-        # Download the zip folder and find the file
-        response = urlopen(self.oes_download_path)
-        dir = Path(__file__).parent / "downloads"
-
-        download_filepath = str(dir) + "/{}/all_data_M_{}.xlsx".format(self.oes_zipname, self.year)
-        csv_path = os.path.splitext(download_filepath)[0] + ".csv"
-
-        # For compatibility with older versions that did not include a file_year column
-        if os.path.exists(csv_path) and "file_year" in list(pd.read_csv(csv_path).columns):
-            log.info("OES data year {} was found in {}. Loading it in.".format(self.year, csv_path))
-            df = pd.read_csv(csv_path)
-            return df
-
-        else:
-            zipfile = ZipFile(BytesIO(response.read()))
-
-            log.info("Downloading to directory {}".format(dir))
-            zipfile.extractall(dir)
-
-            expected_filename = "all_data_M_{}.xlsx".format(self.year)
-
-            zipped_files = zipfile.namelist()
-            log.info("Files found: {}".format(zipped_files))
-            for filename in zipped_files:
-                if expected_filename in filename:
-                    log.info(
-                        "Check the data/bls/downloads directory for the xlsx file downloaded"
-                    )
-                    log.info(
-                        "Reading Excel file: {} --- This may take a few minutes.".format(
-                            filename
-                        )
-                    )
-                    excelfile = zipfile.open(filename)
-                    df = pd.read_excel(excelfile)
-
-                    if clean_up:
-                        log.info("Cleaning file and saving as a csv for faster loading in future runs.")
-                        df = self._clean_oes_data(bls_oes_data=df)
-                        df = df.assign(file_year=self.year)
-
-                        # Save as CSV for faster loading in future rounds
-                        df.to_csv(csv_path,
-                                  index=False)
-                    return df
+        Make sure the year's cleaned data is in the Parquet cache, downloading and cleaning it if needed, without loading
+        it from the cache
+
+        :return: Path to the cached Parquet file
+        """
+        if refresh or not self.cache.is_valid(self.year, self.CLEANER_VERSION):
+            self.download_oes_data(clean_up=True, refresh=refresh)
+        return self.cache.path(self.year)
+
+    def cache_industry_data(self, refresh=False) -> Path:
+        """
+        Make sure the year's industry-specific (NAICS) estimates are partitioned on disk (see
+        write_industry_partitions), streaming them out of the workbook if needed. Unlike the cross-industry data, these
+        are most of the workbook's rows, so they are never held in memory at once.
+
+        :param refresh: Download the workbook again. The partitions are only rebuilt if the workbook changed.
+        :return: Directory of the year's partitions
+        """
+        directory = self.download_dir / f"oes_industry_{self.year}"
+        marker = read_industry_marker(directory) or {}
+        if not refresh and marker.get("cleaner_version") == self.INDUSTRY_CLEANER_VERSION:
+            return directory
+
+        excelfile = self._download_workbook(refresh=refresh)
+        source_sha256 = file_sha256(excelfile)
+        if (marker.get("source_sha256") == source_sha256
+                and marker.get("cleaner_version") == self.INDUSTRY_CLEANER_VERSION):
+            log.info("OES workbook for year {} is unchanged".format(self.year))
+            return directory
+
+        with measure_stage(f"oes_{self.year}.industry_parse", bytes_read=file_size(excelfile)) as stage:
+            stage.rows_out = write_industry_partitions(excelfile,
+                                                       self.year,
+                                                       directory,
+                                                       metadata={"source_sha256": source_sha256,
+                                                                 "cleaner_version": self.INDUSTRY_CLEANER_VERSION})
+        return directory
 
 
 def download_oes_wrapper(year):
@@ -169,35 +290,175 @@ def download_oes_wrapper(year):
     return oes_data
 
 
+def cache_oes_wrapper(year) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Wrapper for downloading and cleaning a year of OES data into the Parquet cache, in a worker process. Only the path
+    of the cached file is sent back to the parent process, rather than a pickled DataFrame, along with the metrics of
+    the stages that ran (see data.instrumentation).
+
+    :param year: Download year
+    :return: Path to the cached Parquet file, and stage metrics
+    """
+    with collect_stages() as stages:
+        path = str(OESDataDownloader(year=year).cache_oes_data())
+    return path, stages
+
+
 def download_multi_year_oes(start_year: int = 2017,
-                            end_year: int = 2019):
+                            end_year: int = 2019,
+                            max_workers: Optional[int] = None):
     """
-    Download and clean multiple years of OES data
+    Download and clean multiple years of OES data, keeping the latest year of each area and SOC code (see
+    combine_multi_year_oes and latest_oes_years)
 
     :param start_year: Integer start year
     :param end_year: Integer end year
+    :param max_workers: Worker processes; defaults to one per year, up to the number of CPUs
     :return: Combined DataFrame of multiple cleaned years
     """
-    download_years = list(range(start_year, end_year + 1))
-    download_years = [str(year) for year in download_years]
+    return latest_oes_years(combine_multi_year_oes(start_year=start_year, end_year=end_year, max_workers=max_workers))
+
+
+def cache_multi_year_oes(start_year: int = 2017,
+                         end_year: int = 2019,
+                         max_workers: Optional[int] = None) -> List[str]:
+    """
+    Download and clean multiple years of OES data into the Parquet cache, without reading them back
 
-    with ThreadPoolExecutor(max_workers=5) as threadpool:
-        oes_dfs = threadpool.map(download_oes_wrapper, download_years)
+    Years are downloaded, parsed and cleaned in parallel worker processes, since parsing and cleaning are CPU-bound and
+    threads would contend for the GIL. Workers are spawned rather than forked: the loaders call this from threads, and a
+    child forked while another thread holds a lock (logging, a database connection, pandas or pyarrow internals) would
+    inherit the lock held, and deadlock on it.
 
-    all_years = pd.DataFrame()
-    for df in oes_dfs:
-        all_years = all_years.append(df)
+    :param start_year: Integer start year
+    :param end_year: Integer end year
+    :param max_workers: Worker processes; defaults to one per year, up to the number of CPUs
+    :return: Paths to the cached Parquet file of each year, in year order
+    """
+    download_years = [str(year) for year in range(start_year, end_year + 1)]
+    max_workers = max_workers or min(len(download_years), os.cpu_count() or 1)
 
-    # Deduplicate soc_code and area_title; grab the latest year's wage and employment data for each of these records
-    all_years = (all_years
-                 .sort_values('file_year', ascending=False)
-                 .drop_duplicates(['soc_code', 'area_title'],
-                                  keep='first')
-                 .sort_values('area_title')
-                 .reset_index(drop=True))
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as processpool:
+        cache_paths = []
+        for path, stages in processpool.map(cache_oes_wrapper, download_years):
+            cache_paths.append(path)
+            record_stages(stages)
+    return cache_paths
 
+
+def combine_multi_year_oes(start_year: int = 2017,
+                           end_year: int = 2019,
+                           max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Download and clean multiple years of OES data, and combine every year's rows
+
+    Each year is cleaned into the Parquet cache by a worker process (see cache_multi_year_oes), and the parent reads
+    the years back from there and combines them in a single concatenation. area_title, area_code and soc_code
+    are categorical, since the same few thousand values repeat across hundreds of thousands of rows.
+
+    :param start_year: Integer start year
+    :param end_year: Integer end year
+    :param max_workers: Worker processes; defaults to one per year, up to the number of CPUs
+    :return: Combined DataFrame of every cleaned year
+    """
+    cache_paths = cache_multi_year_oes(start_year=start_year, end_year=end_year, max_workers=max_workers)
+
+    with measure_stage("oes.combine", bytes_read=sum(file_size(path) or 0 for path in cache_paths)) as stage:
+        all_years = pd.concat([OESParquetCache.read(path) for path in cache_paths], ignore_index=True)
+        all_years = all_years.astype({"area_title": "category", "area_code": "category", "soc_code": "category"})
+        stage.rows_out = len(all_years)
     return all_years
 
 
+def latest_oes_years(all_years: pd.DataFrame) -> pd.DataFrame:
+    """
+    Latest year's row for each area and SOC code of combined OES years (see combine_multi_year_oes)
+    """
+    # Deduplicate soc_code and area_code; grab the latest year's wage and employment data for each of these records.
+    # Rows are ordered by area, then SOC code, so each area's rows are stored together when loaded.
+    with measure_stage("oes.dedupe", rows_in=len(all_years)) as stage:
+        all_years = (all_years
+                     .sort_values('file_year', ascending=False)
+                     .drop_duplicates(['soc_code', 'area_code'],
+                                      keep='first')
+                     .sort_values(['area_code', 'soc_code'])
+                     .reset_index(drop=True))
+        stage.rows_out = len(all_years)
+
+    return all_years
+
+
+def cache_industry_wrapper(year) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Wrapper for partitioning a year of industry-specific OES data on disk, in a worker process (see cache_oes_wrapper)
+
+    :param year: Download year
+    :return: Directory of the year's partitions, and stage metrics
+    """
+    with collect_stages() as stages:
+        directory = str(OESDataDownloader(year=year).cache_industry_data())
+    return directory, stages
+
+
+def download_multi_year_oes_industries(start_year: int = 2017,
+                                       end_year: int = 2019,
+                                       max_workers: Optional[int] = None
+                                       ) -> Tuple[Iterator[pd.DataFrame], pd.DataFrame]:
+    """
+    Download multiple years of industry-specific (NAICS) OES data
+
+    Each year's workbook is streamed into compact partitions by a worker process, as in cache_multi_year_oes. The
+    partitions are then combined one NAICS sector at a time as the estimates are read, keeping the latest year's
+    estimates for each area, industry and SOC code, so only one sector is in memory at a time.
+
+    :return: (estimates, industries): generator of each sector's estimates with the INDUSTRY_SCHEMA columns, indexed
+        by row number across sectors, and industries as naics_code, naics_title and industry_group (latest title for
+        each code)
+    """
+    download_years = [str(year) for year in range(start_year, end_year + 1)]
+    max_workers = max_workers or min(len(download_years), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as processpool:
+        directories = []
+        for directory, stages in processpool.map(cache_industry_wrapper, download_years):
+            directories.append(directory)
+            record_stages(stages)
+
+    # Directories are in year order, so the last title seen for a code is the latest
+    industries = (pd.concat([read_industries(directory) for directory in directories], ignore_index=True)
+                  .drop_duplicates("naics_code", keep="last")
+                  .sort_values("naics_code")
+                  .reset_index(drop=True))
+    return combine_industry_sectors(directories), industries
+
+
+def combine_industry_sectors(directories: List[str]) -> Iterator[pd.DataFrame]:
+    """
+    Combine the years partitioned in directories one NAICS sector at a time, keeping the latest year's estimates for
+    each area, industry and SOC code (see download_multi_year_oes_industries)
+    """
+    sectors = sorted({int(path.name.split("=")[1])
+                      for directory in directories
+                      for path in Path(directory).glob("sector=*")})
+    rows = 0
+    for sector in sectors:
+        with measure_stage(f"oes_industries.combine_{sector:02d}") as stage:
+            sector_years = pd.concat([partition
+                                      for directory in directories
+                                      for partition in iter_industry_partitions(directory, sectors=[sector])],
+                                     ignore_index=True)
+            stage.rows_in = len(sector_years)
+            estimates = (sector_years
+                         .sort_values("file_year", ascending=False)
+                         .drop_duplicates(["area_code", "naics_code", "soc"], keep="first")
+                         .sort_values(["naics_code", "soc", "area_code"]))
+            del sector_years
+            estimates.index = pd.RangeIndex(rows, rows + len(estimates))
+            stage.rows_out = len(estimates)
+        rows += len(estimates)
+        yield estimates
+
+
 if __name__ == "__main__":
-    download_multi_year_oes()
+    with load_report("oes_download"):
+        download_multi_year_oes()
@@ -21,6 +21,9 @@ def bls_api_query_v1(
     :param end: End year, str
     :param series_id: Series ID
     :return: JSON response
+
+    For more than one request's worth of series or years, use BlsTimeSeriesClient (bls_timeseries.py), which batches,
+    rate-limits and caches queries.
     """
     log.info("Querying BLS API (v1) for data on {}".format(series_id))
     headers = {"Content-type": "application/json"}
@@ -37,7 +40,7 @@ def parse_bls_api_query_v1(
     json_response: Dict[str, Union[str, Any]]
 ) -> List[Dict[str, Any]]:
     """
-    Parse the BLS API (V1) response.
+    Parse the BLS API (V1) response, with the observations of every series in it.
 
     :param json_response: JSON response from API query.
         {'status': 'REQUEST_SUCCEEDED',
@@ -60,11 +63,10 @@ def parse_bls_api_query_v1(
           'series_name': 'CUUR0000SA0'}, ...}]
     """
     log.info("Parsing API response")
-    series: List[str, Any] = json_response.get("Results").get("series")
+    series: List[Dict[str, Any]] = json_response.get("Results").get("series")
+    data = []
     for series_id in series:
         series_name = series_id.get("seriesID")
-        data = [record for record in series_id.get("data")]
-        for record in data:
-            record.update({"series_name": series_name})
+        data.extend({**record, "series_name": series_name} for record in series_id.get("data"))
 
-        return data
+    return data
@@ -0,0 +1,248 @@
+"""
+Client for the BLS Public Data API (https://www.bls.gov/developers/) that fetches any number of time series over any
+range of years, within the API's per-request limits
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger()
+
+DEFAULT_BASE_URL = "https://api.bls.gov/publicAPI/"
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "downloads" / "bls_api"
+
+# Per-request limits of each API version: v2 needs a registration key (BLS_API_KEY), and allows more series and years
+API_LIMITS = {
+    "v1": {"max_series": 25, "max_years": 10},
+    "v2": {"max_series": 50, "max_years": 20},
+}
+
+# Responses worth retrying: rate limited, or BLS temporarily unavailable
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class BlsApiError(Exception):
+    """
+    The BLS API did not process a request (e.g. the daily query limit was reached, or a series ID is malformed)
+    """
+    pass
+
+
+class RateLimiter(object):
+    """
+    Space calls at least min_interval seconds apart, across threads
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.min_interval
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+
+def batch_series(series_ids: Iterable[str], max_series: int) -> List[List[str]]:
+    """
+    Split series IDs (deduplicated, in order) into batches of at most max_series
+    """
+    unique_ids = list(dict.fromkeys(series_ids))
+    return [unique_ids[i:i + max_series] for i in range(0, len(unique_ids), max_series)]
+
+
+def year_windows(start_year: int, end_year: int, max_years: int) -> List[Tuple[int, int]]:
+    """
+    Split an inclusive range of years into consecutive (start, end) windows of at most max_years
+    """
+    if end_year < start_year:
+        raise ValueError(f"end_year {end_year} is before start_year {start_year}")
+    return [(start, min(start + max_years - 1, end_year)) for start in range(start_year, end_year + 1, max_years)]
+
+
+class BlsTimeSeriesClient(object):
+    """
+    Fetch BLS time series, however many series and years are requested.
+
+    Series are split into batches, and years into windows, within the API version's per-request limits. The requests
+    for each batch and window run concurrently on a thread pool, spaced by a rate limiter, over one pooled Session. The
+    responses are merged into one typed DataFrame.
+
+    Successful responses are cached on disk, keyed by the request. Windows that ended before the current year are
+    final and are always read from the cache; windows that include the current year are fetched again once
+    max_age seconds old, since BLS adds new periods to them.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 base_url: str = DEFAULT_BASE_URL,
+                 cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+                 max_age: float = 24 * 60 * 60,
+                 max_workers: int = 4,
+                 min_interval: float = 0.5,
+                 timeout: float = 30.0,
+                 max_retries: int = 3):
+        """
+        :param api_key: BLS registration key, for the v2 API and its higher limits. Defaults to the BLS_API_KEY
+            environment variable; without one, the v1 API is used.
+        :param base_url: API root; point this at a local stub server for testing
+        :param cache_dir: Directory for cached responses, or None not to cache
+        :param max_age: Seconds a cached response that includes the current year stays fresh
+        :param max_workers: Requests to run at a time
+        :param min_interval: Minimum seconds between the start of two requests
+        :param timeout: Seconds to wait for a response
+        :param max_retries: Retries for connection errors and 429/5xx responses, with exponential backoff
+        """
+        self.api_key = api_key if api_key is not None else os.getenv("BLS_API_KEY")
+        self.version = "v2" if self.api_key else "v1"
+        self.limits = API_LIMITS[self.version]
+        base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.url = f"{base_url}{self.version}/timeseries/data/"
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = RateLimiter(min_interval)
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session = requests.Session()
+        self.session.headers.update({"Content-type": "application/json"})
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_series(self, series_ids: Iterable[str], start_year: int, end_year: int) -> pd.DataFrame:
+        """
+        Fetch every observation of the series between start_year and end_year (inclusive)
+
+        :return: DataFrame with columns series_id, year, period, period_name, value, latest and footnotes, sorted by
+            series_id, year and period. value is NA where BLS reports no value.
+        """
+        requests_to_send = [(batch, window)
+                            for batch in batch_series(series_ids, self.limits["max_series"])
+                            for window in year_windows(int(start_year), int(end_year), self.limits["max_years"])]
+        log.info(f"Fetching BLS series in {len(requests_to_send)} requests")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as threadpool:
+            responses = list(threadpool.map(lambda request: self.query(*request), requests_to_send))
+
+        return records_to_frame(record for response in responses for record in parse_series_records(response))
+
+    def query(self, series_ids: List[str], window: Tuple[int, int]) -> Dict[str, Any]:
+        """
+        One API request for a batch of series and a window of years, read from the cache if possible
+
+        :raises BlsApiError: if BLS did not process the request
+        :raises requests.RequestException: if the request failed, after retries
+        """
+        payload = {"seriesid": list(series_ids), "startyear": str(window[0]), "endyear": str(window[1])}
+        cache_path = self._cache_path(payload)
+        if cache_path is not None and self._is_fresh(cache_path, window):
+            try:
+                return json.loads(cache_path.read_text())
+            except ValueError as e:
+                log.warning(f"Ignoring unreadable cached BLS response {cache_path} | {e}")
+
+        body = {**payload, "registrationkey": self.api_key} if self.api_key else payload
+        result = self._post(json.dumps(body))
+
+        if result.get("status") != "REQUEST_SUCCEEDED":
+            raise BlsApiError(f"BLS did not process the request for {series_ids} {window}: "
+                              f"{result.get('status')} {result.get('message')}")
+        for message in result.get("message") or []:
+            log.warning(f"BLS: {message}")
+
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            partial_path = cache_path.with_suffix(".json.part")
+            partial_path.write_text(json.dumps(result))
+            os.replace(partial_path, cache_path)
+        return result
+
+    def _post(self, data: str) -> Dict[str, Any]:
+        """
+        POST a query through the rate limiter, retrying connection errors and RETRY_STATUSES responses. Retries are
+        done here rather than by urllib3, which does not retry POSTs by default.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            try:
+                response = self.session.post(self.url, data=data, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise e
+                log.warning(f"BLS request failed, retrying | {e}")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+                log.warning(f"BLS responded {response.status_code}, retrying")
+            time.sleep(0.5 * 2 ** attempt)
+
+    def _cache_path(self, payload: Dict[str, Any]) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _is_fresh(self, cache_path: Path, window: Tuple[int, int]) -> bool:
+        if not cache_path.exists():
+            return False
+        if window[1] < date.today().year:
+            return True
+        return time.time() - cache_path.stat().st_mtime < self.max_age
+
+
+def parse_series_records(json_response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Observations of every series in a BLS API response, each with its series ID
+
+    :param json_response: {"status": "REQUEST_SUCCEEDED", "Results": {"series": [{"seriesID": ..., "data": [...]}]}}
+    :return: [{"series_id", "year", "period", "periodName", "value", "latest", "footnotes"}, ...]
+    """
+    records = []
+    for series in (json_response.get("Results") or {}).get("series", []):
+        series_id = series.get("seriesID")
+        records.extend({**record, "series_id": series_id} for record in series.get("data", []))
+    return records
+
+
+def records_to_frame(records: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Typed DataFrame of BLS API observations (see BlsTimeSeriesClient.get_series)
+    """
+    frame = pd.DataFrame.from_records(list(records),
+                                      columns=["series_id", "year", "period", "periodName", "value", "latest",
+                                               "footnotes"])
+    frame = frame.rename(columns={"periodName": "period_name"})
+    footnotes = frame["footnotes"].map(
+        lambda notes: "; ".join(note["text"] for note in notes or [] if note and note.get("text")))
+
+    frame = frame.assign(
+        series_id=frame["series_id"].astype("category"),
+        year=pd.to_numeric(frame["year"]).astype("int64"),
+        period=frame["period"].astype("category"),
+        # BLS reports values it does not have as "-"
+        value=pd.to_numeric(frame["value"], errors="coerce").astype(float),
+        latest=frame["latest"].eq("true"),
+        footnotes=footnotes,
+    )
+    return (frame
+            .drop_duplicates(subset=["series_id", "year", "period"])
+            .sort_values(["series_id", "year", "period"])
+            .reset_index(drop=True))
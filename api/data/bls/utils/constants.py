@@ -7,6 +7,7 @@ OES_XLSX_PARAMS = {
         "area": str,
         "area_title": str,
         "area_type": str,
+        "prim_state": str,
         "naics": str,
         "naics_title": str,
         "i_group": str,
@@ -36,3 +37,40 @@ OES_XLSX_PARAMS = {
         "hourly": str,
     },
 }
+
+"""
+OES area types (the area_type column)
+"""
+OES_AREA_TYPES = {
+    1: "U.S.",
+    2: "State",
+    3: "U.S. territory",
+    4: "Metropolitan statistical area",
+    6: "Nonmetropolitan area",
+}
+
+"""
+Digits in each area type's area codes: 99 for the U.S., state FIPS codes, 5-digit CBSA codes for metropolitan areas,
+and 7-digit codes (starting with the state FIPS code) for nonmetropolitan areas
+"""
+OES_AREA_CODE_DIGITS = {1: 2, 2: 2, 3: 2, 4: 5, 6: 7}
+
+"""
+Wage percentile columns, in the order they are stored in the wage percentile arrays (see wage_percentiles.py): the
+10th, 25th, 50th (median), 75th and 90th percentiles
+"""
+OES_WAGE_PERCENTILES = [10, 25, 50, 75, 90]
+OES_HOURLY_PERCENTILE_COLUMNS = ["h_pct10", "h_pct25", "h_median", "h_pct75", "h_pct90"]
+OES_ANNUAL_PERCENTILE_COLUMNS = ["a_pct10", "a_pct25", "a_median", "a_pct75", "a_pct90"]
+
+"""
+FIPS codes of states and territories, by postal abbreviation, which the OES area codes of states use
+"""
+STATE_FIPS = {
+    "AL": "01", "AK": "02", "AZ": "04", "AR": "05", "CA": "06", "CO": "08", "CT": "09", "DE": "10", "DC": "11",
+    "FL": "12", "GA": "13", "HI": "15", "ID": "16", "IL": "17", "IN": "18", "IA": "19", "KS": "20", "KY": "21",
+    "LA": "22", "ME": "23", "MD": "24", "MA": "25", "MI": "26", "MN": "27", "MS": "28", "MO": "29", "MT": "30",
+    "NE": "31", "NV": "32", "NH": "33", "NJ": "34", "NM": "35", "NY": "36", "NC": "37", "ND": "38", "OH": "39",
+    "OK": "40", "OR": "41", "PA": "42", "RI": "44", "SC": "45", "SD": "46", "TN": "47", "TX": "48", "UT": "49",
+    "VT": "50", "VA": "51", "WA": "53", "WV": "54", "WI": "55", "WY": "56", "GU": "66", "PR": "72", "VI": "78",
+}
@@ -1,4 +1,8 @@
+from typing import List, Tuple
+
 import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
 
 
 def to_float(x: str):
@@ -13,3 +17,33 @@ def to_int(x: str):
         return int(x)
     except:
         return np.nan
+
+
+def to_numeric_flagged(values: pd.Series,
+                       markers: List[str],
+                       integer: bool = False) -> Tuple[pd.Series, pd.Series]:
+    """
+    Convert a column of BLS estimates to numbers in one vectorized pass, recording which values were suppressed.
+
+    BLS replaces estimates it does not publish with footnote markers, e.g. * (wage not available), ** (employment not
+    available) or # (wage above the top of the reported range). Markers and any other non-numeric text become NA.
+
+    :param values: Raw column, as text (or already numeric)
+    :param markers: Footnote markers for suppressed estimates
+    :param integer: Return a nullable Int64 column instead of float64
+    :return: (numbers, suppressed), where suppressed is True where the value was a footnote marker
+    """
+    if is_numeric_dtype(values):
+        numbers = values.astype("float64")
+        suppressed = pd.Series(False, index=values.index)
+    else:
+        suppressed = values.isin(markers)
+        try:
+            # Fast path: every remaining value is a number (or missing), so the whole column converts in C
+            numbers = values.mask(suppressed).astype("float64")
+        except (ValueError, TypeError):
+            numbers = pd.to_numeric(values.mask(suppressed).astype(str).str.strip(), errors="coerce")
+
+    if integer:
+        numbers = numbers.round().astype("Int64")
+    return numbers, suppressed
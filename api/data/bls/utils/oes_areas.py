@@ -0,0 +1,63 @@
+"""
+Area dimension of the OES data: the U.S., states and territories, metropolitan (MSA) and nonmetropolitan areas
+"""
+import re
+
+import pandas as pd
+
+from data.bls.utils.constants import OES_AREA_CODE_DIGITS, STATE_FIPS
+
+# Area types with a parent state
+SUBSTATE_AREA_TYPES = (4, 6)
+
+# State abbreviations at the end of a metropolitan area title, e.g. "Boston-Cambridge-Nashua, MA-NH"
+TITLE_STATES_PATTERN = re.compile(r",\s*([A-Z]{2})(?:-[A-Z]{2})*\s*$")
+
+
+def normalize_area_codes(area_code: pd.Series, area_type: pd.Series) -> pd.Series:
+    """
+    Area codes as text, zero-padded to their type's width (see OES_AREA_CODE_DIGITS), since workbooks may store them
+    as numbers (01 -> 1)
+    """
+    codes = area_code.astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    widths = area_type.map(OES_AREA_CODE_DIGITS).fillna(0).astype(int)
+    return pd.Series([code.zfill(width) for code, width in zip(codes, widths)], index=area_code.index)
+
+
+def parent_state_codes(area_code: pd.Series,
+                       area_type: pd.Series,
+                       area_title: pd.Series,
+                       prim_state: pd.Series = None) -> pd.Series:
+    """
+    Area code of the state each metropolitan and nonmetropolitan area belongs to (None for the U.S., states and
+    territories). A metropolitan area that spans states belongs to its primary state.
+
+    The primary state is taken from the prim_state column where the workbook has one. Otherwise, it is the first
+    state in a metropolitan area's title, or the state FIPS code that a nonmetropolitan area's code starts with.
+    """
+    if prim_state is None:
+        prim_state = pd.Series(None, index=area_code.index, dtype=object)
+    title_state = area_title.astype(str).str.extract(TITLE_STATES_PATTERN, expand=False)
+    abbreviation = prim_state.where(prim_state.notna() & (prim_state.astype(str).str.strip() != ""), title_state)
+
+    state_code = abbreviation.astype(str).str.strip().map(STATE_FIPS)
+    nonmetropolitan = area_type.eq(6) & state_code.isna()
+    state_code = state_code.where(~nonmetropolitan, area_code.str[:2])
+    state_code = state_code.where(area_type.isin(SUBSTATE_AREA_TYPES)).astype(object)
+    return state_code.where(state_code.notna(), None)
+
+
+def oes_area_table(bls_oes_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per area in cleaned OES data (see OESDataDownloader._clean_oes_data), with the latest title for its code
+
+    :return: DataFrame of area_code, area_title, area_type and state_code, sorted by area_code
+    """
+    areas = bls_oes_data[["area_code", "area_title", "area_type", "state_code", "file_year"]]
+    areas = areas.astype({"area_code": str, "area_title": str})
+    return (areas
+            .sort_values("file_year", ascending=False)
+            .drop_duplicates("area_code")
+            .drop(columns="file_year")
+            .sort_values("area_code")
+            .reset_index(drop=True))
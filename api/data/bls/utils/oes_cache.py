@@ -0,0 +1,116 @@
+"""
+Local Parquet cache of cleaned OES data, one file per year
+"""
+from typing import Optional, Dict
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+log = logging.getLogger()
+
+# Key for the cache metadata in the Parquet file's schema metadata
+METADATA_KEY = b"jobhopper.oes"
+
+
+def file_sha256(path: Path, chunk_size: int = 2 ** 20) -> str:
+    """
+    SHA-256 checksum of a file, read in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OESParquetCache(object):
+    """
+    Cleaned OES data for each year, stored as Parquet next to the downloaded workbooks.
+
+    Each file records the year, the checksum of the source workbook, and the version of the cleaning code that
+    produced it, in the Parquet schema metadata. An entry can be validated by reading that footer alone. Column types
+    (including nullable integers) survive the round trip, unlike the CSV cache this replaces.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def path(self, year: str) -> Path:
+        return self.cache_dir / f"oes_{year}.parquet"
+
+    def metadata(self, year: str) -> Optional[Dict[str, str]]:
+        """
+        Cache metadata for a year, read from the Parquet footer without reading any data
+
+        :return: {"year", "source_sha256", "cleaner_version"}, or None if the year is not cached or unreadable
+        """
+        path = self.path(year)
+        if not path.exists():
+            return None
+
+        try:
+            schema_metadata = pq.read_schema(path).metadata or {}
+            return json.loads(schema_metadata[METADATA_KEY])
+        except (KeyError, ValueError, OSError, pa.ArrowException) as e:
+            log.warning(f"Ignoring unreadable OES cache file {path} | {e}")
+            return None
+
+    def is_valid(self,
+                 year: str,
+                 cleaner_version: int,
+                 source_sha256: Optional[str] = None) -> bool:
+        """
+        Check whether the cached data for a year can be used, from its metadata alone
+
+        :param year: OES data year
+        :param cleaner_version: Current version of the cleaning code; entries from other versions are stale
+        :param source_sha256: Checksum of the source workbook, if known. Without it, any source is accepted, so loads
+            do not need the source file (or the network).
+        """
+        metadata = self.metadata(year)
+        return (metadata is not None
+                and metadata.get("year") == str(year)
+                and metadata.get("cleaner_version") == cleaner_version
+                and (source_sha256 is None or metadata.get("source_sha256") == source_sha256))
+
+    def load(self, year: str) -> pd.DataFrame:
+        """
+        Load the cached data for a year into a DataFrame
+        """
+        log.info(f"Loading OES data year {year} from {self.path(year)}")
+        return self.read(self.path(year))
+
+    @staticmethod
+    def read(path: Path) -> pd.DataFrame:
+        """
+        Read a cache file into a DataFrame. Every column is decoded into memory.
+        """
+        return pq.read_table(path).to_pandas()
+
+    def save(self,
+             year: str,
+             data: pd.DataFrame,
+             source_sha256: str,
+             cleaner_version: int):
+        """
+        Cache the cleaned data for a year. The file is written under a temporary name and moved into place, so an
+        interrupted write never leaves a truncated cache entry behind.
+        """
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        metadata = json.dumps({"year": str(year),
+                               "source_sha256": source_sha256,
+                               "cleaner_version": cleaner_version})
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: metadata.encode()})
+
+        path = self.path(year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = path.with_suffix(".parquet.part")
+        pq.write_table(table, partial_path)
+        os.replace(partial_path, path)
+        log.info(f"Cached OES data year {year} in {path}")
@@ -0,0 +1,178 @@
+"""
+Streaming, resumable and conditional downloads of the OES zip files
+"""
+from typing import Optional, Dict, Any
+from pathlib import Path
+from zipfile import ZipFile
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+
+import requests
+
+log = logging.getLogger()
+
+# Bytes written to disk per chunk of a download
+DOWNLOAD_CHUNK_SIZE = 2 ** 20
+DOWNLOAD_TIMEOUT = 60
+
+
+class DownloadManifest(object):
+    """
+    Record of what has been downloaded, kept as JSON in the downloads directory: for each key (an OES year), the
+    resolved download URL and the ETag/Last-Modified validators the server sent with it. Resolving URLs from the
+    manifest means the BLS tables page is only scraped once per year, and the validators make re-downloads conditional.
+
+    Years may be downloaded by several threads or processes at once, so updates hold a lock on <manifest>.lock.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            log.warning(f"Ignoring unreadable download manifest {self.path} | {e}")
+            return {}
+
+    def get(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._read().get(str(key), {})
+
+    def update(self, key: str, **fields):
+        """
+        Merge fields into the entry for a key. The file is replaced atomically, so readers never see a partial write.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path.with_suffix(".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            entries = self._read()
+            entries[str(key)] = {**entries.get(str(key), {}), **fields}
+
+            partial_path = self.path.with_suffix(".json.part")
+            partial_path.write_text(json.dumps(entries, indent=2, sort_keys=True))
+            os.replace(partial_path, self.path)
+
+
+def download_file(url: str,
+                  path: Path,
+                  etag: Optional[str] = None,
+                  last_modified: Optional[str] = None,
+                  session: Optional[requests.Session] = None) -> Dict[str, Any]:
+    """
+    Stream a file to disk in chunks, without holding it in memory.
+
+    If path already exists and validators from its download are given, the request is conditional (If-None-Match /
+    If-Modified-Since), and the file is kept if the server answers 304 Not Modified. Data is written to <path>.part
+    and only moved to path once complete; if a .part file is left over from an interrupted download, the download
+    resumes from where it stopped with a Range request. If-Range makes the server send the whole file instead if it
+    changed in the meantime.
+
+    :param url: File to download
+    :param path: Where to save it
+    :param etag: ETag header from the download of the existing file
+    :param last_modified: Last-Modified header from the download of the existing file
+    :param session: requests session to use, e.g. to reuse connections
+    :return: {"changed": whether path was (re)written, "etag", "last_modified"} with the validators for path
+    """
+    path = Path(path)
+    partial_path = path.with_name(f"{path.name}.part")
+    session = session or requests.Session()
+
+    headers = {}
+    if path.exists():
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    offset = partial_path.stat().st_size if partial_path.exists() else 0
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        validator = _read_partial_validator(partial_path)
+        if validator:
+            headers["If-Range"] = validator
+
+    with session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        if response.status_code == 304:
+            log.info(f"{path.name} has not changed since it was downloaded")
+            return {"changed": False, "etag": etag, "last_modified": last_modified}
+
+        if response.status_code == 416:
+            # The partial file is no longer a prefix of the file on the server (e.g. it is complete, or the file
+            # shrank). Start over.
+            partial_path.unlink()
+            _remove(_partial_validator_path(partial_path))
+            return download_file(url, path, etag=etag, last_modified=last_modified, session=session)
+
+        response.raise_for_status()
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+        resumed = response.status_code == 206
+        if resumed:
+            log.info(f"Resuming download of {path.name} at byte {offset}")
+        else:
+            _write_partial_validator(partial_path, validators["etag"] or validators["last_modified"])
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(partial_path, "ab" if resumed else "wb") as destination:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                destination.write(chunk)
+
+    os.replace(partial_path, path)
+    _remove(_partial_validator_path(partial_path))
+    log.info(f"Downloaded {url} to {path}")
+    return {"changed": True, **validators}
+
+
+def _remove(path: Path):
+    if path.exists():
+        path.unlink()
+
+
+def _partial_validator_path(partial_path: Path) -> Path:
+    return partial_path.with_name(f"{partial_path.name}.validator")
+
+
+def _read_partial_validator(partial_path: Path) -> Optional[str]:
+    """
+    Validator (ETag or Last-Modified) of the response a .part file came from, for If-Range
+    """
+    try:
+        return _partial_validator_path(partial_path).read_text() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_partial_validator(partial_path: Path, validator: Optional[str]):
+    partial_path.parent.mkdir(parents=True, exist_ok=True)
+    _partial_validator_path(partial_path).write_text(validator or "")
+
+
+def extract_member(zip_path: Path, filename: str, destination: Path) -> Path:
+    """
+    Extract the single member of a zip file whose name ends with filename, keeping its path within the zip
+
+    :return: Path to the extracted file
+    """
+    with ZipFile(zip_path) as archive:
+        members = [name for name in archive.namelist() if name.endswith(filename)]
+        if not members:
+            raise FileNotFoundError(f"{filename} not found in {zip_path}")
+
+        target = Path(destination) / members[0]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = target.with_name(f"{target.name}.part")
+        with archive.open(members[0]) as source, open(partial_path, "wb") as extracted:
+            shutil.copyfileobj(source, extracted, DOWNLOAD_CHUNK_SIZE)
+        os.replace(partial_path, target)
+
+    log.info(f"Extracted {members[0]} from {zip_path}")
+    return target
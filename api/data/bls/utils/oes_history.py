@@ -0,0 +1,54 @@
+"""
+Wage and employment history of the OES data: one row per area and SOC code, holding every loaded year as arrays
+aligned with the years. The arrays are packed like the wage percentiles (see wage_percentiles.py), as little-endian
+values of a fixed width, and jobs.fields.PackedArrayField reads them back.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Packed type of each history array, and the cleaned column it is taken from
+HISTORY_ARRAYS = {
+    "years": ("file_year", np.dtype("<i2")),
+    "hourly_mean_wages": ("hourly_mean_wage", np.dtype("<f4")),
+    "annual_mean_wages": ("annual_mean_wage", np.dtype("<f4")),
+    # 64-bit, so that employment counts stay exact; NaN where employment is not available
+    "total_employment": ("total_employment", np.dtype("<f8")),
+}
+
+
+def pack_groups(values: np.ndarray, boundaries: np.ndarray) -> List[bytes]:
+    """
+    Pack consecutive runs of values, values[boundaries[i]:boundaries[i + 1]], into one bytes object each
+    """
+    packed = values.tobytes()
+    width = values.dtype.itemsize
+    return [packed[start * width:end * width] for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+
+def oes_history_table(all_years: pd.DataFrame) -> pd.DataFrame:
+    """
+    History of combined OES years (see combine_multi_year_oes), with the years of each area and SOC code in order
+
+    :return: DataFrame of area_code, area_title, soc_code and soc_title (from the latest year), and the HISTORY_ARRAYS
+        as bytes, sorted by area_code and soc_code
+    """
+    history = (all_years[["area_code", "area_title", "soc_code", "soc_title", "file_year", "hourly_mean_wage",
+                          "annual_mean_wage", "total_employment"]]
+               .astype({"area_code": str, "area_title": str, "soc_code": str})
+               .drop_duplicates(["area_code", "soc_code", "file_year"])
+               .sort_values(["area_code", "soc_code", "file_year"])
+               .reset_index(drop=True))
+
+    # Each (area, SOC code) is a run of consecutive rows; the last row of a run is its latest year
+    keys = history[["area_code", "soc_code"]]
+    starts = np.flatnonzero((keys != keys.shift()).any(axis=1).to_numpy())
+    boundaries = np.append(starts, len(history))
+    latest = history.iloc[boundaries[1:] - 1] if len(history) else history
+
+    table = latest[["area_code", "area_title", "soc_code", "soc_title"]].reset_index(drop=True)
+    for name, (column, dtype) in HISTORY_ARRAYS.items():
+        values = history[column].astype("float64").to_numpy().astype(dtype)
+        table[name] = pack_groups(values, boundaries)
+    return table
@@ -0,0 +1,210 @@
+"""
+Industry-specific (NAICS) OES estimates: streamed out of the workbook chunk by chunk, stored compactly with integer
+NAICS and SOC keys, and partitioned on disk by NAICS sector
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import json
+import logging
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data.bls.utils.constants import OES_XLSX_PARAMS
+from data.bls.utils.dtype_conversion import to_numeric_flagged
+from data.bls.utils.oes_areas import normalize_area_codes
+from data.bls.utils.oes_xlsx_reader import iter_oes_xlsx, CROSS_INDUSTRY_NAICS, OES_CHUNK_ROWS
+
+log = logging.getLogger()
+
+# Columns read for industry-specific estimates
+INDUSTRY_COLUMNS = ["area", "area_type", "naics", "naics_title", "i_group", "occ_code", "h_mean", "a_mean", "tot_emp"]
+
+# Compact column types of the cleaned data: integer keys, and 32-bit wages (cents fit well within their precision)
+INDUSTRY_SCHEMA = pa.schema([
+    ("area_code", pa.string()),
+    ("naics_code", pa.int32()),
+    ("soc", pa.int32()),
+    ("hourly_mean_wage", pa.float32()),
+    ("annual_mean_wage", pa.float32()),
+    ("total_employment", pa.int64()),
+    ("file_year", pa.int16()),
+])
+
+# NAICS sectors that span several two-digit codes (e.g. Manufacturing, 31-33), by their later codes. Their rows are
+# partitioned under the first code.
+NAICS_RANGE_SECTORS = {32: 31, 33: 31, 45: 44, 49: 48}
+
+# Written once every partition of a year is complete, with the metadata that makes the partitions valid
+COMPLETE_MARKER = "_COMPLETE.json"
+INDUSTRIES_FILE = "industries.parquet"
+
+
+def soc_to_int(soc_code: pd.Series) -> pd.Series:
+    """
+    SOC codes as integers, e.g. 11-1011 -> 111011. Codes that are not NN-NNNN become NA.
+    """
+    digits = soc_code.astype(str).str.strip().str.replace("-", "", regex=False)
+    return pd.to_numeric(digits.where(digits.str.fullmatch(r"\d{6}")), errors="coerce").astype("Int32")
+
+
+def parse_naics_codes(naics: pd.Series) -> pd.DataFrame:
+    """
+    Integer keys and sectors for NAICS codes as the workbooks write them. Six-digit codes are their own keys, e.g.
+    622100. Sector-level codes, which are two digits or a range of them (e.g. 11 or 31-33), are keyed by their first
+    code padded to six digits, e.g. 310000. Other codes, such as OES's own groupings of industries (e.g. 3250A1), are NA.
+
+    :return: DataFrame of naics_code and sector (the sector's first two-digit code, see NAICS_RANGE_SECTORS)
+    """
+    text = naics.astype(str).str.strip()
+    sector_level = text.str.fullmatch(r"\d{2}(-\d{2})?")
+    digits = text.where(~sector_level, text.str[:2].str.ljust(6, "0"))
+    naics_code = pd.to_numeric(digits.where(digits.str.fullmatch(r"\d{6}")), errors="coerce").astype("Int32")
+    sector = pd.to_numeric(text.str[:2].where(naics_code.notna()), errors="coerce").replace(NAICS_RANGE_SECTORS)
+    return pd.DataFrame({"naics_code": naics_code, "sector": sector.astype("Int32")}, index=naics.index)
+
+
+def int_to_soc(soc: int) -> str:
+    """
+    SOC code for an integer key, e.g. 111011 -> 11-1011
+    """
+    return f"{soc // 10000:02d}-{soc % 10000:04d}"
+
+
+def clean_industry_chunk(chunk: pd.DataFrame, year: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Clean a chunk of industry-specific rows read with INDUSTRY_COLUMNS
+
+    :return: (estimates, industries): estimates with the INDUSTRY_SCHEMA columns plus each row's NAICS sector (see
+        parse_naics_codes), and the chunk's industries as naics_code, naics_title and industry_group. Rows without a
+        NAICS code or SOC code that can be keyed are dropped, and counted in the log.
+    """
+    markers = OES_XLSX_PARAMS["na_values"]
+    area_type = pd.to_numeric(chunk["area_type"], errors="coerce").astype("Int64")
+    hourly_mean_wage, _ = to_numeric_flagged(chunk["h_mean"], markers)
+    annual_mean_wage, _ = to_numeric_flagged(chunk["a_mean"], markers)
+    total_employment, _ = to_numeric_flagged(chunk["tot_emp"], markers, integer=True)
+    naics = parse_naics_codes(chunk["naics"])
+    naics_code = naics["naics_code"]
+
+    estimates = pd.DataFrame({
+        "area_code": normalize_area_codes(chunk["area"], area_type),
+        "naics_code": naics_code,
+        "soc": soc_to_int(chunk["occ_code"]),
+        "hourly_mean_wage": hourly_mean_wage.astype("float32"),
+        "annual_mean_wage": annual_mean_wage.astype("float32"),
+        "total_employment": total_employment,
+        "file_year": int(year),
+        "sector": naics["sector"],
+    })
+    keyed = estimates["naics_code"].notna() & estimates["soc"].notna()
+    if not keyed.all():
+        unkeyed = chunk.loc[~keyed, "naics"].astype(str).str.strip()
+        log.warning(f"Dropping {int((~keyed).sum())} industry-specific OES rows for {year} without a usable NAICS or "
+                    f"SOC code (NAICS codes {sorted(unkeyed.unique())[:10]})")
+    estimates = estimates[keyed]
+
+    industries = (pd.DataFrame({"naics_code": naics_code,
+                                "naics_title": chunk["naics_title"],
+                                "industry_group": chunk["i_group"].fillna("")})
+                  .dropna(subset=["naics_code"])
+                  .drop_duplicates("naics_code"))
+    return estimates, industries
+
+
+def write_industry_partitions(workbook: Union[str, Path],
+                              year: str,
+                              directory: Path,
+                              metadata: Optional[Dict[str, Any]] = None,
+                              chunk_rows: int = OES_CHUNK_ROWS) -> int:
+    """
+    Stream the industry-specific rows of a workbook into Parquet files partitioned by NAICS sector (see
+    parse_naics_codes), <directory>/sector=<NN>/part.parquet. Only one chunk of rows is in memory at a time: each
+    chunk is cleaned and appended to its sectors' files as a row group. The industries found are written to <directory>/industries.parquet.
+
+    The partitions are written to a temporary directory and moved into place once complete, with a marker recording
+    the year and metadata (see read_industry_marker), so a partial write is never read.
+
+    :param metadata: Recorded in the marker, e.g. the source workbook's checksum
+    :return: Rows written
+    """
+    directory = Path(directory)
+    partial_directory = directory.with_name(f"{directory.name}.part")
+    shutil.rmtree(partial_directory, ignore_errors=True)
+    partial_directory.mkdir(parents=True)
+
+    writers = {}  # type: Dict[int, pq.ParquetWriter]
+    industries = []
+    rows = 0
+    try:
+        for chunk in iter_oes_xlsx(workbook,
+                                   columns=INDUSTRY_COLUMNS,
+                                   naics=None,
+                                   exclude_naics=CROSS_INDUSTRY_NAICS,
+                                   dtype={},
+                                   na_values=[],
+                                   optional_columns=[],
+                                   chunk_rows=chunk_rows):
+            estimates, chunk_industries = clean_industry_chunk(chunk, year)
+            industries.append(chunk_industries)
+            rows += len(estimates)
+
+            for sector, partition in estimates.groupby("sector", sort=False):
+                sector = int(sector)
+                if sector not in writers:
+                    sector_directory = partial_directory / f"sector={sector:02d}"
+                    sector_directory.mkdir()
+                    writers[sector] = pq.ParquetWriter(str(sector_directory / "part.parquet"), INDUSTRY_SCHEMA)
+                writers[sector].write_table(pa.Table.from_pandas(partition.drop(columns="sector"),
+                                                                 schema=INDUSTRY_SCHEMA,
+                                                                 preserve_index=False))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    industries = (pd.concat(industries, ignore_index=True).drop_duplicates("naics_code")
+                  if industries else pd.DataFrame({"naics_code": pd.Series(dtype="Int32"),
+                                                   "naics_title": pd.Series(dtype=object),
+                                                   "industry_group": pd.Series(dtype=object)}))
+    industries.to_parquet(partial_directory / INDUSTRIES_FILE, index=False)
+
+    marker = {**(metadata or {}), "year": str(year), "rows": rows}
+    (partial_directory / COMPLETE_MARKER).write_text(json.dumps(marker))
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(partial_directory, directory)
+    log.info(f"Wrote {rows} industry-specific OES rows for {year} to {len(writers)} sector partitions in {directory}")
+    return rows
+
+
+def read_industry_marker(directory: Path) -> Optional[Dict[str, Any]]:
+    """
+    Marker of complete partitions in directory (see write_industry_partitions), or None if there are none
+    """
+    try:
+        return json.loads((Path(directory) / COMPLETE_MARKER).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def read_industries(directory: Path) -> pd.DataFrame:
+    """
+    Industries found when the partitions in directory were written
+    """
+    return pd.read_parquet(Path(directory) / INDUSTRIES_FILE)
+
+
+def iter_industry_partitions(directory: Path, sectors: Optional[List[int]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read the partitions written by write_industry_partitions one sector at a time
+
+    :param sectors: Two-digit NAICS sectors to read; None reads every sector
+    """
+    for path in sorted(Path(directory).glob("sector=*/part.parquet")):
+        sector = int(path.parent.name.split("=")[1])
+        if sectors is None or sector in sectors:
+            yield (pq.read_table(str(path))
+                   .to_pandas()
+                   .astype({"naics_code": "int32", "soc": "int32", "total_employment": "Int64"}))
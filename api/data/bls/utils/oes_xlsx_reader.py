@@ -0,0 +1,245 @@
+"""
+Streaming reader for the OES all_data_M_<year>.xlsx workbooks
+"""
+from typing import List, Optional, Dict, Any, Union, BinaryIO, Iterator, Tuple
+from pathlib import Path
+from zipfile import ZipFile
+import re
+
+import pandas as pd
+from lxml import etree
+
+from data.bls.utils.constants import OES_XLSX_PARAMS, OES_HOURLY_PERCENTILE_COLUMNS, OES_ANNUAL_PERCENTILE_COLUMNS
+
+# Columns used by OESDataDownloader._clean_oes_data, out of the ~30 in each workbook
+OES_COLUMNS = (["area", "area_title", "area_type", "naics", "occ_code", "occ_title", "h_mean", "a_mean", "tot_emp"]
+               + OES_HOURLY_PERCENTILE_COLUMNS
+               + OES_ANNUAL_PERCENTILE_COLUMNS)
+
+# Columns used if the workbook has them: prim_state (an area's primary state) is only in recent years' workbooks
+OES_OPTIONAL_COLUMNS = ["prim_state"]
+
+# NAICS code for cross-industry estimates (all industries)
+CROSS_INDUSTRY_NAICS = "000000"
+
+# Rows per DataFrame yielded by iter_oes_xlsx
+OES_CHUNK_ROWS = 100000
+
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+CELL_COLUMN_PATTERN = re.compile(r"[A-Z]+")
+
+
+def read_oes_xlsx(file: Union[str, Path, BinaryIO],
+                  columns: Optional[List[str]] = OES_COLUMNS,
+                  naics: Optional[str] = CROSS_INDUSTRY_NAICS,
+                  dtype: Dict[str, Any] = OES_XLSX_PARAMS["dtype"],
+                  na_values: List[str] = OES_XLSX_PARAMS["na_values"],
+                  optional_columns: List[str] = OES_OPTIONAL_COLUMNS) -> pd.DataFrame:
+    """
+    Read an OES workbook row by row, keeping only the requested columns and industry.
+
+    pd.read_excel builds a cell object for every cell of the workbook (350K+ rows x ~30 columns) before any filtering.
+    Here, the sheet XML is parsed as a stream and each row is discarded once it is read. Only the requested columns
+    are converted to values. Rows for other industries are dropped as soon as their NAICS cell is read, before the
+    rest of the row is looked at.
+
+    :param file: Path to (or file object for) the xlsx file
+    :param columns: Columns to keep, by their lowercased header name. None keeps every column.
+    :param naics: Only keep rows for this NAICS industry code. None keeps every industry.
+    :param dtype: Types for the columns, as in OES_XLSX_PARAMS. Integer columns become nullable Int64, since
+        suppressed estimates are NA.
+    :param na_values: Cell values that represent missing or suppressed estimates
+    :param optional_columns: Columns to keep after the requested ones, if the workbook has them
+    :return: DataFrame with the requested columns, in the order given, then the optional columns found
+    """
+    [data] = iter_oes_xlsx(file,
+                           columns=columns,
+                           naics=naics,
+                           dtype=dtype,
+                           na_values=na_values,
+                           optional_columns=optional_columns,
+                           chunk_rows=None)
+    return data
+
+
+def iter_oes_xlsx(file: Union[str, Path, BinaryIO],
+                  columns: Optional[List[str]] = OES_COLUMNS,
+                  naics: Optional[str] = CROSS_INDUSTRY_NAICS,
+                  dtype: Dict[str, Any] = OES_XLSX_PARAMS["dtype"],
+                  na_values: List[str] = OES_XLSX_PARAMS["na_values"],
+                  optional_columns: List[str] = OES_OPTIONAL_COLUMNS,
+                  exclude_naics: Optional[str] = None,
+                  chunk_rows: Optional[int] = OES_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Read an OES workbook as read_oes_xlsx does, but yield the rows chunk_rows at a time, so that the whole workbook
+    (e.g. every industry's rows) can be processed without holding it in memory
+
+    :param exclude_naics: Drop rows for this NAICS industry code, e.g. CROSS_INDUSTRY_NAICS to keep the
+        industry-specific rows only
+    :param chunk_rows: Rows per DataFrame; None yields a single DataFrame. At least one (possibly empty) DataFrame is
+        yielded.
+    """
+    with ZipFile(file) as archive:
+        shared_strings = _read_shared_strings(archive)
+        with archive.open(_first_sheet_path(archive)) as sheet:
+            rows = _iter_row_elements(sheet)
+
+            header_row = next(rows, None)
+            if header_row is None:
+                raise ValueError("OES workbook is empty")
+            header = {str(_cell_value(cell, shared_strings)).strip().lower(): column
+                      for column, cell in _iter_cells(header_row)}
+
+            if columns is None:
+                columns = [name for name, column in sorted(header.items(), key=lambda item: item[1])]
+            else:
+                columns = columns + [name for name in optional_columns if name in header and name not in columns]
+            filter_naics = naics is not None or exclude_naics is not None
+            missing = [name for name in columns + (["naics"] if filter_naics else []) if name not in header]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in OES workbook header {sorted(header)}")
+
+            # Position of each wanted sheet column in the output records
+            wanted = {header[name]: index for index, name in enumerate(columns)}
+            naics_column = header["naics"] if filter_naics else None
+            last_column = max(list(wanted) + ([] if naics_column is None else [naics_column]))
+
+            records = []
+            yielded = False
+            for row in rows:
+                record = [None] * len(columns)
+                matched = naics_column is None
+                for column, cell in _iter_cells(row):
+                    if column == naics_column:
+                        # NAICS codes are text, but may be stored as numbers (000000 -> 0)
+                        code = _cell_value(cell, shared_strings)
+                        code = None if code is None else code.strip().zfill(6)
+                        if code is None or (naics is not None and code != naics) or code == exclude_naics:
+                            break
+                        matched = True
+                    index = wanted.get(column)
+                    if index is not None:
+                        record[index] = _cell_value(cell, shared_strings)
+                    if column >= last_column:
+                        break
+
+                if matched:
+                    records.append(record)
+                    if chunk_rows and len(records) >= chunk_rows:
+                        yield _apply_dtypes(pd.DataFrame.from_records(records, columns=columns),
+                                            dtype=dtype,
+                                            na_values=na_values)
+                        records = []
+                        yielded = True
+
+            if records or not yielded:
+                yield _apply_dtypes(pd.DataFrame.from_records(records, columns=columns),
+                                    dtype=dtype,
+                                    na_values=na_values)
+
+
+def _first_sheet_path(archive: ZipFile) -> str:
+    """
+    Path of the workbook's first sheet within the xlsx archive, e.g. xl/worksheets/sheet1.xml
+    """
+    workbook = etree.fromstring(archive.read("xl/workbook.xml"))
+    relationship_id = workbook.find(f"{SHEET_NS}sheets/{SHEET_NS}sheet").get(f"{RELATIONSHIP_NS}id")
+
+    relationships = etree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for relationship in relationships.iter(f"{PACKAGE_RELATIONSHIP_NS}Relationship"):
+        if relationship.get("Id") == relationship_id:
+            target = relationship.get("Target")
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+
+    raise ValueError(f"Sheet {relationship_id} not found in the workbook relationships")
+
+
+def _read_shared_strings(archive: ZipFile) -> List[str]:
+    """
+    Shared string table, which text cells refer to by index
+    """
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as shared:
+        for _, item in etree.iterparse(shared, tag=f"{SHEET_NS}si"):
+            strings.append("".join(text.text or "" for text in item.iter(f"{SHEET_NS}t")))
+            item.clear()
+    return strings
+
+
+def _column_index(reference: str) -> int:
+    """
+    Zero-based column index of a cell reference, e.g. "C12" -> 2
+    """
+    index = 0
+    for letter in CELL_COLUMN_PATTERN.match(reference).group():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _cell_value(cell, shared_strings: List[str]):
+    """
+    Value of a cell element. Numbers are returned as text and converted per column by _apply_dtypes.
+    """
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        return "".join(text.text or "" for text in cell.iter(f"{SHEET_NS}t"))
+
+    value = cell.findtext(f"{SHEET_NS}v")
+    if value is None:
+        return None
+    if cell_type == "s":
+        return shared_strings[int(value)]
+    return value
+
+
+def _iter_row_elements(sheet: BinaryIO) -> Iterator[etree._Element]:
+    """
+    Iterate over the sheet's row elements, parsing the sheet XML incrementally. Each row is freed once the caller moves
+    on to the next one, so memory use does not grow with the size of the sheet.
+    """
+    for _, row in etree.iterparse(sheet, tag=f"{SHEET_NS}row"):
+        yield row
+        row.clear()
+        # Also drop the root's references to the rows already read
+        while row.getprevious() is not None:
+            del row.getparent()[0]
+
+
+def _iter_cells(row: etree._Element) -> Iterator[Tuple[int, etree._Element]]:
+    """
+    Iterate over a row's cells as (zero-based column index, cell element). Empty cells are usually left out of the
+    XML, so the column comes from the cell reference rather than the cell's position in the row.
+    """
+    column = -1
+    for cell in row.iterchildren(f"{SHEET_NS}c"):
+        reference = cell.get("r")
+        column = _column_index(reference) if reference else column + 1
+        yield column, cell
+
+
+def _apply_dtypes(data: pd.DataFrame,
+                  dtype: Dict[str, Any],
+                  na_values: List[str]) -> pd.DataFrame:
+    """
+    Convert columns to the types read_excel would produce with OES_XLSX_PARAMS, column by column
+    """
+    for name in data.columns:
+        column_type = dtype.get(name)
+        if column_type is None:
+            continue
+
+        column = data[name].mask(data[name].isin(na_values))
+        if column_type is str:
+            data[name] = column.where(column.isna(), column.astype(str).str.strip())
+        elif column_type is int:
+            data[name] = pd.to_numeric(column, errors="coerce").round().astype("Int64")
+        else:
+            data[name] = pd.to_numeric(column, errors="coerce").astype(column_type)
+
+    return data
@@ -0,0 +1,40 @@
+"""
+Wage distributions of the OES data as fixed-width arrays: the 10th, 25th, 50th, 75th and 90th percentile wages
+(OES_WAGE_PERCENTILES) of an area and SOC code, packed into 20 bytes as little-endian 32-bit floats, with NaN where
+BLS did not publish a percentile. jobs.fields.WagePercentilesField reads them back.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from data.bls.utils.constants import OES_XLSX_PARAMS, OES_WAGE_PERCENTILES
+from data.bls.utils.dtype_conversion import to_numeric_flagged
+
+WAGE_PERCENTILES_DTYPE = np.dtype("<f4")
+
+
+def pack_wage_percentiles(percentiles: List[pd.Series]) -> pd.Series:
+    """
+    Pack percentile wage columns, as read from the workbook, into one array per row
+
+    :param percentiles: One column per OES_WAGE_PERCENTILES percentile, in order, e.g. OES_HOURLY_PERCENTILE_COLUMNS.
+        Footnote markers (e.g. # for wages above the top of the reported range) become NaN.
+    :return: bytes of len(OES_WAGE_PERCENTILES) floats per row
+    """
+    if len(percentiles) != len(OES_WAGE_PERCENTILES):
+        raise ValueError(f"Expected {len(OES_WAGE_PERCENTILES)} percentile columns, got {len(percentiles)}")
+
+    markers = OES_XLSX_PARAMS["na_values"]
+    values = np.column_stack([to_numeric_flagged(column, markers)[0].to_numpy()
+                              for column in percentiles]).astype(WAGE_PERCENTILES_DTYPE)
+    return pd.Series([row.tobytes() for row in values], index=percentiles[0].index, dtype=object)
+
+
+def unpack_wage_percentiles(packed: pd.Series) -> np.ndarray:
+    """
+    Arrays packed by pack_wage_percentiles, as a (rows, percentiles) float32 array
+    """
+    if packed.empty:
+        return np.empty((0, len(OES_WAGE_PERCENTILES)), dtype=WAGE_PERCENTILES_DTYPE)
+    return np.frombuffer(b"".join(packed), dtype=WAGE_PERCENTILES_DTYPE).reshape(len(packed), -1)
@@ -0,0 +1,279 @@
+"""
+Per-stage metrics for the data loaders (wall time, CPU time, rows, bytes read, peak RSS), collected into a report that
+is written as JSON and summarized as a table at the end of a run
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+
+log = logging.getLogger()
+
+REPORT_DIR = Path(os.getenv("LOAD_REPORT_DIR", Path(__file__).parent / "reports"))
+
+# ru_maxrss is in kilobytes on Linux, and bytes on macOS
+_MAXRSS_BYTES = 1 if sys.platform == "darwin" else 1024
+
+SUMMARY_COLUMNS = [
+    ("stage", "stage"),
+    ("wall_seconds", "wall s"),
+    ("cpu_seconds", "cpu s"),
+    ("rows_in", "rows in"),
+    ("rows_out", "rows out"),
+    ("bytes_read", "MB read"),
+    ("peak_rss_bytes", "peak RSS MB"),
+    ("wall_change", "wall vs last"),
+]
+
+
+class StageMetrics(object):
+    """
+    Metrics for one stage. Timing and memory are measured by measure_stage; the stage itself sets rows_in, rows_out
+    and bytes_read, where they apply.
+
+    cpu_seconds is CPU time of the thread that ran the stage, plus that of the worker processes whose stages it
+    recorded (see collect_stages), so stages running in parallel threads are not charged for each other's work.
+    peak_rss_bytes is the process's peak resident memory when the stage ended: a stage that raised it is the one that
+    needed the memory.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes_read = None
+        self.peak_rss_bytes = None
+        self.error = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"stage": self.name, **{key: value for key, value in vars(self).items() if key != "name"}}
+
+
+class WorkerStages(list):
+    """
+    Stage metrics collected in a worker process, and the CPU time the worker used while collecting them
+    """
+    cpu_seconds = 0.0
+
+
+class LoadReport(object):
+    """
+    Metrics for the stages of one load, in the order they completed. Stages may be recorded from several threads.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = []  # type: List[Dict[str, Any]]
+        self._lock = threading.Lock()
+
+    def add(self, stages: Iterable[Dict[str, Any]]):
+        """
+        Add stage metrics recorded elsewhere, e.g. in a worker process (see collect_stages)
+        """
+        with self._lock:
+            self.stages.extend(stages)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": (datetime.now(timezone.utc) - self.started_at).total_seconds(),
+            "stages": list(self.stages),
+        }
+
+    def write(self, directory: Optional[Path] = None) -> Path:
+        """
+        Write the report as <name>-<start time>.json in directory (REPORT_DIR by default)
+
+        :return: Path to the report
+        """
+        directory = Path(directory or REPORT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.name}-{self.started_at:%Y%m%dT%H%M%SZ}.json"
+        path.write_text(json.dumps(self.as_dict(), indent=2))
+        return path
+
+    def summary(self, previous: Optional[Dict[str, Any]] = None) -> str:
+        """
+        The stages as a text table. With the report of a previous run, each stage's wall time is compared to the same
+        stage in that run, to show which stages regressed.
+        """
+        previous_seconds = {stage["stage"]: stage["wall_seconds"] for stage in (previous or {}).get("stages", [])}
+        rows = [[_format_metric(key, stage, previous_seconds) for key, title in SUMMARY_COLUMNS]
+                for stage in self.stages]
+        header = [title for key, title in SUMMARY_COLUMNS]
+        widths = [max(len(cell) for cell in column) for column in zip(header, *rows)]
+        lines = ["  ".join(cell.ljust(width) if i == 0 else cell.rjust(width)
+                           for i, (cell, width) in enumerate(zip(line, widths)))
+                 for line in [header, *rows]]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+        return "\n".join(lines)
+
+
+def _format_metric(key: str, stage: Dict[str, Any], previous_seconds: Dict[str, float]) -> str:
+    if key == "stage":
+        return stage["stage"] + (" (failed)" if stage.get("error") else "")
+    if key == "wall_change":
+        before = previous_seconds.get(stage["stage"])
+        if not before or stage["wall_seconds"] is None:
+            return ""
+        return f"{(stage['wall_seconds'] - before) / before:+.0%}"
+
+    value = stage.get(key)
+    if value is None:
+        return ""
+    if key in ("bytes_read", "peak_rss_bytes"):
+        return f"{value / 2 ** 20:.1f}"
+    if key.endswith("_seconds"):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def latest_report(name: str, directory: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """
+    The most recent report written for loads with this name, if any
+    """
+    paths = sorted(Path(directory or REPORT_DIR).glob(f"{name}-*.json"))
+    if not paths:
+        return None
+    try:
+        return json.loads(paths[-1].read_text())
+    except ValueError as e:
+        log.warning(f"Ignoring unreadable load report {paths[-1]} | {e}")
+        return None
+
+
+_active_report = None  # type: Optional[LoadReport]
+_active_lock = threading.Lock()
+
+# Per thread, the CPU time of worker processes recorded during each stage the thread is running, innermost last
+_worker_cpu = threading.local()
+
+
+@contextmanager
+def load_report(name: str, directory: Optional[Path] = None):
+    """
+    Record the stages measured (by measure_stage) while in this context, in any thread, into a report. On exit the
+    report is written to directory (REPORT_DIR by default) and its summary is logged, compared to the previous report
+    of the same name.
+
+    Nested reports are merged into the outermost one, so a loader that opens its own report can also run as part of
+    a larger load.
+    """
+    global _active_report
+    with _active_lock:
+        outer = _active_report
+        if outer is None:
+            _active_report = LoadReport(name)
+        report = _active_report
+    if outer is not None:
+        yield report
+        return
+
+    try:
+        yield report
+    finally:
+        with _active_lock:
+            _active_report = None
+        previous = latest_report(name, directory)
+        path = report.write(directory)
+        log.info(f"Load report written to {path}\n{report.summary(previous)}")
+
+
+@contextmanager
+def collect_stages():
+    """
+    Collect the stages measured in this context into a list, e.g. in a worker process, whose stages the parent then
+    adds to its report with record_stages. The list also carries the CPU time the process used in this context, which
+    record_stages charges to the parent's running stage.
+    """
+    global _active_report
+    report = LoadReport("worker")
+    report.stages = WorkerStages()
+    with _active_lock:
+        outer, _active_report = _active_report, report
+    started_cpu = _process_cpu_seconds()
+    try:
+        yield report.stages
+    finally:
+        report.stages.cpu_seconds = _process_cpu_seconds() - started_cpu
+        with _active_lock:
+            _active_report = outer
+
+
+def record_stages(stages: Iterable[Dict[str, Any]]):
+    """
+    Add stage metrics to the active report, if there is one. The CPU time of a worker's stages (see collect_stages)
+    is added to the stages running in this thread.
+    """
+    cpu_seconds = getattr(stages, "cpu_seconds", 0.0)
+    for running in getattr(_worker_cpu, "stages", []):
+        running[0] += cpu_seconds
+    if _active_report is not None:
+        _active_report.add(stages)
+
+
+@contextmanager
+def measure_stage(name: str, rows_in: Optional[int] = None, bytes_read: Optional[int] = None):
+    """
+    Measure a stage of a load, and add it to the active report (see load_report), if any. The stage can fill in the
+    StageMetrics it is given, e.g.
+
+        with measure_stage("oes_2019.clean", rows_in=len(df)) as stage:
+            df = clean(df)
+            stage.rows_out = len(df)
+
+    A stage that raises is recorded with its error.
+    """
+    stage = StageMetrics(name)
+    stage.rows_in = rows_in
+    stage.bytes_read = bytes_read
+
+    worker_cpu = [0.0]
+    running = _worker_cpu.__dict__.setdefault("stages", [])
+    running.append(worker_cpu)
+    started = time.perf_counter()
+    started_cpu = time.thread_time()
+    try:
+        yield stage
+    except Exception as e:
+        stage.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        stage.wall_seconds = time.perf_counter() - started
+        stage.cpu_seconds = time.thread_time() - started_cpu + worker_cpu[0]
+        running.pop()
+        stage.peak_rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_BYTES
+        log.info(f"Stage {name}: {stage.wall_seconds:.2f} s wall, {stage.cpu_seconds:.2f} s CPU, "
+                 f"rows {_or_dash(stage.rows_in)} -> {_or_dash(stage.rows_out)}, "
+                 f"peak RSS {stage.peak_rss_bytes / 2 ** 20:.0f} MB")
+        record_stages([stage.as_dict()])
+
+
+def _or_dash(value) -> str:
+    return "-" if value is None else str(value)
+
+
+def _process_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def file_size(path) -> Optional[int]:
+    """
+    Size of a file in bytes, for bytes_read, or None if it does not exist
+    """
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
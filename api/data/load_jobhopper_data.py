@@ -1,16 +1,26 @@
 from data.scripts.sql_loader import (
     load_bls_oes_to_sql,
     load_occupation_transitions_to_sql,
+    rollback_data_release,
 )
+from data.instrumentation import load_report
 from pathlib import Path
+import sys
 from dotenv import load_dotenv
 
 
-def run():
+def run(incremental: bool = False):
     """
     Load BLS OES wage/employment data and job transitions data into a locally configured postgres database.
     Refer to the jobhopper README for notes on installing and configuring postgres.
 
+    With incremental=True, only rows that changed since the last load are inserted, updated or deleted (e.g. to apply a
+    new BLS release) instead of replacing the tables. Otherwise, each table is loaded into a shadow copy and swapped in
+    once complete; run with --rollback to put the previous release back.
+
+    Each step of the load is measured, and the metrics are written to a JSON report in data/reports, with a summary in
+    the log (see data.instrumentation).
+
     Expected output:
 
     jobhopperdatabase=# SELECT * FROM bls_oes_data LIMIT 5;
@@ -32,10 +42,14 @@ def run():
      11-1011 | 19-4031 |   1425400 |  0.00004537824000000001 |    0.14635982
     """
     path = Path(__file__).parent / "occupation_transitions_public_data_set.csv"
-    load_occupation_transitions_to_sql(path)
-    load_bls_oes_to_sql()
+    with load_report("load_jobhopper_data"):
+        load_occupation_transitions_to_sql(path, incremental=incremental)
+        load_bls_oes_to_sql(incremental=incremental)
 
 
 if __name__ == "__main__":
     load_dotenv(dotenv_path=Path('.') / ".env")
-    run()
+    if "--rollback" in sys.argv[1:]:
+        rollback_data_release()
+    else:
+        run(incremental="--incremental" in sys.argv[1:])
@@ -0,0 +1,102 @@
+"""
+Run data loading stages as a dependency graph, running independent stages in parallel
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, List, Optional, Set
+import logging
+import time
+
+log = logging.getLogger()
+
+# run is called with no arguments; depends_on names the stages that must be complete before this one starts
+Stage = namedtuple("Stage", ["name", "run", "depends_on"])
+
+
+class StageFailed(Exception):
+    """
+    A stage raised an exception. Stages that had already started were allowed to finish, and stages that completed
+    were recorded, so the run can be resumed.
+    """
+
+
+def select_stages(stages: List[Stage], names: Optional[Iterable[str]] = None) -> List[Stage]:
+    """
+    The named stages and everything they depend on, in the original order. None selects every stage.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    unknown = [name for name in names or [] if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown stages {unknown}; stages are {list(by_name)}")
+
+    selected = set()
+    to_visit = list(by_name if names is None else names)
+    while to_visit:
+        name = to_visit.pop()
+        if name not in selected:
+            selected.add(name)
+            to_visit.extend(by_name[name].depends_on)
+    return [stage for stage in stages if stage.name in selected]
+
+
+def run_stages(stages: List[Stage],
+               done: Set[str],
+               on_complete: Callable[[str, float], None] = lambda name, seconds: None,
+               max_workers: int = 4) -> List[str]:
+    """
+    Run stages once their dependencies are done, up to max_workers at a time.
+
+    :param stages: Stages to run
+    :param done: Names of stages to treat as already complete: stages completed in an earlier run (to resume it), or
+        skipped ones. Stages in done are not run.
+    :param on_complete: Called with each stage's name and duration in seconds as soon as it completes, e.g. to record
+        it for resuming
+    :param max_workers: Stages to run at a time
+    :return: Names of the stages run, in order of completion
+    """
+    done = set(done)
+    pending = {stage.name: stage for stage in stages if stage.name not in done}
+    known = done | set(pending)
+    for stage in pending.values():
+        missing = [name for name in stage.depends_on if name not in known]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on {missing}, which are neither selected nor complete")
+
+    completed = []
+    failures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as threadpool:
+        running = {}
+        while pending or running:
+            if not failures:
+                for name, stage in list(pending.items()):
+                    if all(dependency in done for dependency in stage.depends_on):
+                        log.info(f"Starting stage {name}")
+                        running[threadpool.submit(_timed, stage.run)] = name
+                        del pending[name]
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    log.exception(f"Stage {name} failed")
+                    failures.append((name, e))
+                    continue
+                log.info(f"Completed stage {name} in {seconds:.1f} s")
+                done.add(name)
+                completed.append(name)
+                on_complete(name, seconds)
+
+    if failures:
+        raise StageFailed(f"Stages failed: {', '.join(name for name, e in failures)}; "
+                          f"not started: {', '.join(pending) or 'none'}") from failures[0][1]
+    return completed
+
+
+def _timed(run: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
@@ -0,0 +1,550 @@
+"""
+Bulk load DataFrames into Postgres with COPY FROM STDIN, and release them by swapping tables
+"""
+import itertools
+import logging
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from pandas.api import types
+from django.apps import apps
+from django.db.backends.postgresql.base import DatabaseWrapper
+from psycopg2.errors import LockNotAvailable
+
+log = logging.getLogger()
+
+# Text written for missing values; COPY reads it back as NULL
+COPY_NULL = "\\N"
+# Bytes sent to the server per COPY message
+COPY_BUFFER_SIZE = 2 ** 20
+
+# How long a table swap waits for readers to release the table before giving up (and retrying), so that a long query
+# cannot make the swap queue every other reader behind it
+SWAP_LOCK_TIMEOUT = "5s"
+SWAP_ATTEMPTS = 3
+
+# Columns of the cleaned BLS OES data that are not BlsOes fields: the suppressed flags from
+# OESDataDownloader._clean_oes_data, kept when a loader creates the table itself (e.g. bls_oes)
+BLS_OES_EXTRA_COLUMNS = {
+    "hourly_mean_wage_suppressed": "boolean",
+    "annual_mean_wage_suppressed": "boolean",
+    "total_employment_suppressed": "boolean",
+}
+
+# Raw transitions data, keyed by "index" like DataFrame.to_sql, since migration 0009 adds its own id column
+OCCUPATION_TRANSITION_COLUMNS = {
+    "index": "bigint",
+    "soc1": "varchar(7)",
+    "soc2": "varchar(7)",
+    "total_obs": "numeric",
+    "transition_share": "numeric",
+    "soc1_name": "text",
+    "soc2_name": "text",
+}
+
+
+def model_column_types(model_name: str, extra_columns: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Postgres column types for a jobs model's table, as its migrations create them, plus extra_columns that are loaded
+    alongside the model's fields, for the loaders to create tables with (e.g. jobs_blsoes outside of Django, or
+    bls_oes for sql_loader's own tables)
+    """
+    postgres = DatabaseWrapper({})
+    column_types = {field.column: field.db_type(postgres) for field in apps.get_model("jobs", model_name)._meta.fields}
+    return {**column_types, **(extra_columns or {})}
+
+
+def frame_column_types(frame: pd.DataFrame) -> Dict[str, str]:
+    """
+    Postgres column types for a DataFrame's columns, by dtype, as to_sql creates them on other databases: booleans are
+    boolean, integers bigint, floats double precision, datetimes timestamp and anything else text. For tables without a
+    jobs model (see model_column_types), e.g. the O*NET tables.
+    """
+    def column_type(dtype) -> str:
+        if types.is_bool_dtype(dtype):
+            return "boolean"
+        if types.is_integer_dtype(dtype):
+            return "bigint"
+        if types.is_float_dtype(dtype):
+            return "double precision"
+        if types.is_datetime64_any_dtype(dtype):
+            return "timestamp"
+        return "text"
+
+    return {column: column_type(dtype) for column, dtype in frame.dtypes.items()}
+
+
+# Data for the loaders: a DataFrame, or DataFrames with the same columns to load one after another (e.g. a generator)
+Frames = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+class DataFrameCsvStream(object):
+    """
+    File-like view of a DataFrame (or DataFrames, one after another) as CSV, for cursor.copy_expert. Rows are
+    formatted chunk_rows at a time as COPY reads them, so the whole CSV is never held in memory, and DataFrames from a
+    generator are only made as they are reached. Columns of bytes (e.g. packed wage percentiles) are written in the hex
+    format COPY reads into bytea columns. rows counts the rows formatted so far.
+    """
+
+    def __init__(self,
+                 frame: Frames,
+                 columns: List[str],
+                 chunk_rows: int = 50000):
+        self.rows = 0
+        self._chunks = (self._format(chunk, columns) for chunk in _row_chunks(frame, chunk_rows))
+        self._buffer = ""
+        self._position = 0
+
+    def read(self, size: int = -1) -> str:
+        # Only fetch (and copy) when the unread part of the buffer runs short, so reads stay linear in the data size
+        while size < 0 or len(self._buffer) - self._position < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer = self._buffer[self._position:] + chunk
+            self._position = 0
+
+        end = len(self._buffer) if size < 0 else self._position + size
+        data = self._buffer[self._position:end]
+        self._position += len(data)
+        return data
+
+    def readline(self, size: int = -1) -> str:
+        return self.read(size)
+
+    def _format(self, chunk: pd.DataFrame, columns: List[str]) -> str:
+        self.rows += len(chunk)
+        binary_columns = [column for column in columns if _is_binary(chunk[column])]
+        if binary_columns:
+            chunk = chunk.assign(**{column: chunk[column].map(lambda value: None if value is None
+                                                              else f"\\x{value.hex()}")
+                                    for column in binary_columns})
+        return chunk.to_csv(header=False, index=False, columns=columns, na_rep=COPY_NULL)
+
+
+def _row_chunks(frame: Frames, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for part in [frame] if isinstance(frame, pd.DataFrame) else frame:
+        for start in range(0, len(part), chunk_rows):
+            yield part.iloc[start:start + chunk_rows]
+
+
+def _frame_columns(frame: Frames, column_types: Dict[str, str]) -> Tuple[List[str], Frames]:
+    """
+    Columns of the data, and the data to load: a generator's first DataFrame is read to find its columns, and put back
+    in front of the rest
+    """
+    if isinstance(frame, pd.DataFrame):
+        return list(frame.columns), frame
+    frames = iter(frame)
+    first = next(frames, None)
+    if first is None:
+        return list(column_types), []
+    return list(first.columns), itertools.chain([first], frames)
+
+
+def _is_binary(column: pd.Series) -> bool:
+    values = column.dropna()
+    return column.dtype == object and not values.empty and isinstance(values.iloc[0], bytes)
+
+
+def _table_exists(cursor, table_name: str) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [table_name])
+    return cursor.fetchone()[0]
+
+
+def _table_columns(cursor, table_name: str) -> List[str]:
+    cursor.execute("SELECT attname FROM pg_attribute "
+                   "WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped "
+                   "ORDER BY attnum",
+                   [table_name])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _drop_constraints_and_indexes(cursor, table_name: str) -> List[str]:
+    """
+    Drop a table's primary key, unique and check constraints and its indexes, so that COPY does not maintain them row
+    by row. Foreign keys are left alone, since other tables may depend on them.
+
+    :return: Statements that recreate what was dropped, constraints first
+    """
+    cursor.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                   "WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'c')",
+                   [table_name])
+    constraints = cursor.fetchall()
+
+    # Indexes that back constraints are dropped (and recreated) with their constraint
+    cursor.execute("SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) FROM pg_index "
+                   "WHERE indrelid = to_regclass(%s) "
+                   "AND indexrelid NOT IN (SELECT conindid FROM pg_constraint WHERE conrelid = to_regclass(%s))",
+                   [table_name, table_name])
+    indexes = cursor.fetchall()
+
+    for index_name, definition in indexes:
+        cursor.execute(f"DROP INDEX {index_name}")
+    for constraint_name, definition in constraints:
+        cursor.execute(f'ALTER TABLE {table_name} DROP CONSTRAINT "{constraint_name}"')
+
+    return ([f'ALTER TABLE {table_name} ADD CONSTRAINT "{name}" {definition}' for name, definition in constraints]
+            + [definition for name, definition in indexes])
+
+
+def copy_dataframe(engine,
+                   frame: Frames,
+                   table_name: str,
+                   column_types: Dict[str, str],
+                   index_label: Optional[str] = None,
+                   indexes: Optional[List[str]] = None) -> int:
+    """
+    Replace the contents of a table with a DataFrame, loaded with COPY in one transaction.
+
+    If the table exists (e.g. a table created by a Django migration), it keeps its definition: its constraints and
+    indexes are dropped, the table is truncated and loaded, and they are recreated once all rows are in. Only columns
+    that exist in both the DataFrame and the table are loaded. Otherwise, the table is created with column_types and
+    the given indexes are built after the load. Either way, the table is analyzed so the planner sees the new data.
+
+    :param engine: SQLAlchemy engine for the Postgres database
+    :param frame: Data to load, or DataFrames with the same columns (e.g. from a generator) to load one at a time
+    :param table_name: Table to replace
+    :param column_types: Postgres types for the columns, used when the table has to be created
+    :param index_label: Load the DataFrame's index as this column, like DataFrame.to_sql(index_label=...). The indexes
+        of several DataFrames must not overlap.
+    :param indexes: Columns to index when the table is created
+    :return: Rows loaded
+    """
+    if index_label and isinstance(frame, pd.DataFrame):
+        frame = frame.rename_axis(index_label).reset_index()
+    elif index_label:
+        frame = (part.rename_axis(index_label).reset_index() for part in frame)
+    frame_columns, frame = _frame_columns(frame, column_types)
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            if _table_exists(cursor, table_name):
+                table_columns = _table_columns(cursor, table_name)
+                recreate = _drop_constraints_and_indexes(cursor, table_name)
+                cursor.execute(f"TRUNCATE {table_name}")
+            else:
+                table_columns = list(column_types)
+                cursor.execute(f"CREATE TABLE {table_name} ("
+                               + ", ".join(f'"{name}" {column_type}' for name, column_type in column_types.items())
+                               + ")")
+                recreate = [f'CREATE INDEX ON {table_name} ("{column}")' for column in indexes or []]
+
+            columns = [column for column in frame_columns if column in table_columns]
+            skipped = [column for column in frame_columns if column not in table_columns]
+            if skipped:
+                log.info(f"Columns {skipped} are not in {table_name}; they will not be loaded")
+
+            log.info(f"Copying rows into {table_name}")
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            stream = DataFrameCsvStream(frame, columns)
+            cursor.copy_expert(f"COPY {table_name} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                               stream,
+                               size=COPY_BUFFER_SIZE)
+
+            for statement in recreate:
+                cursor.execute(statement)
+
+            # Rows were loaded with explicit ids, so move the id sequence (if any) past them
+            if "id" in columns:
+                cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table_name])
+                sequence = cursor.fetchone()[0]
+                if sequence:
+                    cursor.execute(f"SELECT setval(%s, COALESCE(MAX(id), 0) + 1, false) FROM {table_name}",
+                                   [sequence])
+            cursor.execute(f"ANALYZE {table_name}")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    log.info(f"Loaded {stream.rows} rows into {table_name}")
+    return stream.rows
+
+
+def _column_has_default(cursor, table_name: str, column: str) -> bool:
+    cursor.execute("SELECT atthasdef FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = %s",
+                   [table_name, column])
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def _key_match(key_columns: List[str], left: str, right: str) -> str:
+    """
+    Join condition on the key columns that also matches NULL keys (e.g. transitions with no soc2). Keys are compared
+    as COALESCE(...) = COALESCE(...) rather than IS NOT DISTINCT FROM, so that Postgres can still use a hash join.
+    """
+    return " AND ".join(f"COALESCE({left}.\"{column}\"::text, '') = COALESCE({right}.\"{column}\"::text, '')"
+                        for column in key_columns)
+
+
+def apply_dataframe_diff(engine,
+                         frame: pd.DataFrame,
+                         table_name: str,
+                         key_columns: List[str],
+                         column_types: Dict[str, str],
+                         scope_columns: Optional[List[str]] = None,
+                         id_column: Optional[str] = None,
+                         indexes: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Bring a table in line with a DataFrame by applying only the row-level differences, in one transaction.
+
+    The DataFrame is copied into a temporary staging table with the target's column types, and compared to the target
+    on key_columns: rows whose key is missing from the DataFrame are deleted, rows whose values changed are updated,
+    and rows with new keys are inserted. Unchanged rows are not touched, so they keep their ids, and comparisons use
+    the stored types (e.g. wages rounded to cents), so float noise does not count as a change. If the table does not
+    exist yet, it is created and loaded with copy_dataframe.
+
+    :param engine: SQLAlchemy engine for the Postgres database
+    :param frame: New data. Rows with duplicate keys are dropped, keeping the first.
+    :param table_name: Table to update
+    :param key_columns: Columns that identify a row, e.g. ["area_title", "soc_code", "file_year"]
+    :param column_types: Postgres types for the columns, used when the table has to be created
+    :param scope_columns: Only delete rows whose values in these columns appear in the DataFrame, e.g. ["file_year"]
+        so that loading some years leaves the other years alone. None considers every row of the table.
+    :param id_column: Surrogate key of the table, which is not compared. New rows get the column default, or the next
+        values after the current maximum if it has none. Also used as index_label when the table is created.
+    :param indexes: Columns to index when the table is created
+    :return: Number of rows inserted, updated and deleted
+    """
+    duplicates = frame.duplicated(subset=key_columns)
+    if duplicates.any():
+        log.warning(f"Dropping {int(duplicates.sum())} rows with duplicate {key_columns} keys for {table_name}")
+        frame = frame[~duplicates]
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            if not _table_exists(cursor, table_name):
+                connection.rollback()
+                copy_dataframe(engine,
+                               frame.reset_index(drop=True),
+                               table_name,
+                               column_types,
+                               index_label=id_column,
+                               indexes=indexes)
+                return {"inserted": len(frame), "updated": 0, "deleted": 0}
+
+            table_columns = _table_columns(cursor, table_name)
+            columns = [column for column in frame.columns if column in table_columns and column != id_column]
+            missing_keys = [column for column in key_columns if column not in columns]
+            if missing_keys:
+                raise ValueError(f"Key columns {missing_keys} are not in both the data and {table_name}")
+            value_columns = [column for column in columns if column not in key_columns]
+            column_list = ", ".join(f'"{column}"' for column in columns)
+
+            # Staging table with the target's column types, dropped at the end of the transaction
+            staging_table = f"{table_name}__staging"
+            cursor.execute(f"CREATE TEMPORARY TABLE {staging_table} ON COMMIT DROP AS "
+                           f"SELECT {column_list} FROM {table_name} WITH NO DATA")
+            cursor.copy_expert(f"COPY {staging_table} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                               DataFrameCsvStream(frame, columns),
+                               size=COPY_BUFFER_SIZE)
+            cursor.execute(f"ANALYZE {staging_table}")
+
+            scope = ""
+            if scope_columns:
+                scope_list = ", ".join(f'target."{column}"' for column in scope_columns)
+                staged_scope_list = ", ".join(f'"{column}"' for column in scope_columns)
+                scope = f"({scope_list}) IN (SELECT DISTINCT {staged_scope_list} FROM {staging_table}) AND "
+            cursor.execute(f"DELETE FROM {table_name} AS target WHERE {scope}NOT EXISTS ("
+                           f"SELECT 1 FROM {staging_table} AS staged "
+                           f"WHERE {_key_match(key_columns, 'target', 'staged')})")
+            deleted = cursor.rowcount
+
+            updated = 0
+            if value_columns:
+                assignments = ", ".join(f'"{column}" = staged."{column}"' for column in value_columns)
+                changed = " OR ".join(f'target."{column}" IS DISTINCT FROM staged."{column}"'
+                                      for column in value_columns)
+                cursor.execute(f"UPDATE {table_name} AS target SET {assignments} FROM {staging_table} AS staged "
+                               f"WHERE {_key_match(key_columns, 'target', 'staged')} AND ({changed})")
+                updated = cursor.rowcount
+
+            insert_columns, select_columns = column_list, ", ".join(f'staged."{column}"' for column in columns)
+            if id_column and id_column in table_columns and not _column_has_default(cursor, table_name, id_column):
+                insert_columns += f', "{id_column}"'
+                select_columns += (f', (SELECT COALESCE(MAX("{id_column}"), 0) FROM {table_name}) '
+                                   f'+ row_number() OVER ()')
+            cursor.execute(f"INSERT INTO {table_name} ({insert_columns}) SELECT {select_columns} "
+                           f"FROM {staging_table} AS staged WHERE NOT EXISTS ("
+                           f"SELECT 1 FROM {table_name} AS target "
+                           f"WHERE {_key_match(key_columns, 'target', 'staged')})")
+            inserted = cursor.rowcount
+
+            if inserted or updated or deleted:
+                cursor.execute(f"ANALYZE {table_name}")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    log.info(f"Applied changes to {table_name}: {inserted} inserted, {updated} updated, {deleted} deleted")
+    return {"inserted": inserted, "updated": updated, "deleted": deleted}
+
+
+def _table_indexes(cursor, table_name: str) -> List[Tuple[str, str]]:
+    cursor.execute("SELECT index_class.relname, pg_get_indexdef(pg_index.indexrelid) FROM pg_index "
+                   "JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid "
+                   "WHERE pg_index.indrelid = to_regclass(%s) ORDER BY index_class.relname",
+                   [table_name])
+    return cursor.fetchall()
+
+
+def _index_signature(definition: str) -> Tuple[bool, str]:
+    """
+    What an index covers, without its name or table, e.g. (True, " USING btree (id)") for a primary key
+    """
+    return " UNIQUE INDEX " in definition, definition[definition.index(" USING "):]
+
+
+def _rename_table(cursor, table_name: str, new_name: str, index_names: Optional[Dict[Tuple[bool, str], str]] = None):
+    """
+    Rename a table along with its indexes (and so its primary key and unique constraints), since index names must be
+    unique across the schema.
+
+    :param index_names: Names to give indexes, by _index_signature. Other indexes are named after the new table name.
+    """
+    index_names = dict(index_names or {})
+    indexes = _table_indexes(cursor, table_name)
+    cursor.execute(f"ALTER TABLE {table_name} RENAME TO {new_name}")
+    for position, (name, definition) in enumerate(indexes):
+        target = index_names.pop(_index_signature(definition), f"{new_name}_idx{position}")
+        if target != name:
+            cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{target}"')
+
+
+def _replace_table(cursor, table_name: str, incoming: str, outgoing: str):
+    """
+    Put the incoming table in place of table_name, which is kept as outgoing (replacing any table of that name). The
+    incoming table's indexes take the names the replaced table's indexes had, so migrations that refer to indexes by
+    name keep working. Sequences behind serial columns are moved to the table now in place and advanced past its ids.
+    """
+    cursor.execute(f"DROP TABLE IF EXISTS {outgoing}")
+
+    index_names = {}
+    if _table_exists(cursor, table_name):
+        index_names = {_index_signature(definition): name for name, definition in _table_indexes(cursor, table_name)}
+        _rename_table(cursor, table_name, outgoing)
+    _rename_table(cursor, incoming, table_name, index_names=index_names)
+
+    if not _table_exists(cursor, outgoing):
+        return
+    outgoing_columns = _table_columns(cursor, outgoing)
+    for column in [column for column in _table_columns(cursor, table_name) if column in outgoing_columns]:
+        cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [outgoing, column])
+        sequence = cursor.fetchone()[0]
+        if sequence:
+            cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table_name}."{column}"')
+            cursor.execute(f'SELECT setval(%s, COALESCE(MAX("{column}"), 0) + 1, false) FROM {table_name}',
+                           [sequence])
+
+
+def _run_swap(engine, swap):
+    """
+    Run swap(cursor) in a transaction with SWAP_LOCK_TIMEOUT, retrying up to SWAP_ATTEMPTS times if the tables stay
+    locked by readers. Renames need an exclusive lock, but only for as long as the swap transaction itself.
+    """
+    for attempt in range(1, SWAP_ATTEMPTS + 1):
+        connection = engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL lock_timeout = %s", [SWAP_LOCK_TIMEOUT])
+                swap(cursor)
+            connection.commit()
+            return
+        except LockNotAvailable:
+            connection.rollback()
+            if attempt == SWAP_ATTEMPTS:
+                raise
+            log.warning(f"Tables are busy; retrying the swap ({attempt}/{SWAP_ATTEMPTS})")
+            time.sleep(attempt)
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+
+def swap_in_dataframe(engine,
+                      frame: Frames,
+                      table_name: str,
+                      column_types: Dict[str, str],
+                      index_label: Optional[str] = None,
+                      indexes: Optional[List[str]] = None,
+                      min_row_ratio: float = 0.5) -> int:
+    """
+    Replace a table with a DataFrame without interrupting readers (blue/green release).
+
+    The data is loaded with copy_dataframe into a shadow table, <table_name>__shadow, created like the live table
+    (same columns, defaults, constraints and indexes) or from column_types if there is no live table yet. The API keeps
+    reading the live table in the meantime. Once the shadow table is indexed and analyzed, it is validated and
+    renamed into place in one short transaction; the replaced table is kept as <table_name>__previous for
+    rollback_table_release. Readers see either the old release or the new one, never a partial load.
+
+    :param engine: SQLAlchemy engine for the Postgres database
+    :param frame: Data to load, or DataFrames to load one at a time (see copy_dataframe)
+    :param table_name: Table to replace
+    :param column_types: Postgres types for the columns, used when the table has to be created
+    :param index_label: Load the DataFrame's index as this column, like DataFrame.to_sql(index_label=...)
+    :param indexes: Columns to index when the table is created
+    :param min_row_ratio: Refuse the release if it has fewer rows than this share of the live table, e.g. after a
+        truncated download. The shadow table is left in place for inspection.
+    :return: Rows released
+    """
+    shadow_table = f"{table_name}__shadow"
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+            if _table_exists(cursor, table_name):
+                cursor.execute(f"CREATE TABLE {shadow_table} (LIKE {table_name} INCLUDING ALL)")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    rows = copy_dataframe(engine, frame, shadow_table, column_types, index_label=index_label, indexes=indexes)
+
+    def swap(cursor):
+        cursor.execute(f"SELECT COUNT(*) FROM {shadow_table}")
+        shadow_rows = cursor.fetchone()[0]
+        live_rows = 0
+        if _table_exists(cursor, table_name):
+            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+            live_rows = cursor.fetchone()[0]
+        if shadow_rows == 0 or shadow_rows < min_row_ratio * live_rows:
+            raise ValueError(f"Not releasing {shadow_table}: {shadow_rows} rows, against {live_rows} in {table_name}")
+
+        _replace_table(cursor, table_name, incoming=shadow_table, outgoing=f"{table_name}__previous")
+
+    _run_swap(engine, swap)
+    log.info(f"Released {rows} rows into {table_name}; the previous release is in {table_name}__previous")
+    return rows
+
+
+def rollback_table_release(engine, table_name: str):
+    """
+    Swap a table with the release it replaced (<table_name>__previous), e.g. after a bad data release. Rolling back
+    twice restores the newer release.
+    """
+    previous_table = f"{table_name}__previous"
+    rollback_table = f"{table_name}__rollback"
+
+    def swap(cursor):
+        if not _table_exists(cursor, previous_table):
+            raise ValueError(f"No previous release of {table_name} to roll back to")
+        _replace_table(cursor, table_name, incoming=previous_table, outgoing=rollback_table)
+        _rename_table(cursor, rollback_table, previous_table)
+
+    _run_swap(engine, swap)
+    log.info(f"Rolled {table_name} back to its previous release")
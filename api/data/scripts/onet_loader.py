@@ -0,0 +1,276 @@
+import logging
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Union, Iterator, List, Tuple, Optional, Dict
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from data.scripts.bulk_copy import frame_column_types, swap_in_dataframe
+
+log = logging.getLogger()
+
+ONET_DIR = Path(__file__).resolve().parent.parent / "onet"
+
+PHRASE_COLUMNS = ["soc_code", "onet_soc_code", "phrase", "category", "source"]
+
+# Column identifiers in the dumps: [O*NET-SOC Code] or Task
+IDENTIFIER_PATTERN = re.compile(r"\[([^\]]+)\]|([A-Za-z_][A-Za-z0-9_]*)")
+# Values in an INSERT: a quoted string (with '' for a quote), NULL, or a number
+VALUE_PATTERN = re.compile(r"'((?:[^']|'')*)'|(NULL)|(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)")
+
+
+def snake_case(identifier: str) -> str:
+    """
+    Normalize an O*NET column name, e.g. "O*NET-SOC Code" -> "onet_soc_code", "Write-in Total" -> "write_in_total"
+    """
+    identifier = identifier.lower().replace("o*net", "onet")
+    return re.sub(r"[^a-z0-9]+", "_", identifier).strip("_")
+
+
+def _iter_statements(path: Path) -> Iterator[str]:
+    """
+    Split a dump into SQL statements, reading it line by line. A statement ends at a line ending with ";" outside a
+    quoted string; quotes are tracked by counting them per line, since '' (an escaped quote) does not change whether
+    a line ends inside a string.
+    """
+    lines = []
+    in_string = False
+    with open(path, encoding="utf-8") as dump:
+        for line in dump:
+            if not lines and not in_string and (line.startswith("--") or not line.strip()):
+                continue
+            lines.append(line)
+            if line.count("'") % 2:
+                in_string = not in_string
+            if not in_string and line.rstrip().endswith(";"):
+                yield "".join(lines)
+                lines = []
+
+
+def _parse_identifiers(text: str) -> List[str]:
+    return [bracketed or bare for bracketed, bare in IDENTIFIER_PATTERN.findall(text)]
+
+
+def _parse_value(match):
+    string, null, number = match.groups()
+    if string is not None:
+        return string.replace("''", "'")
+    if null:
+        return None
+    return float(number) if any(character in number for character in ".eE") else int(number)
+
+
+def parse_onet_dump(path: Union[str, Path]) -> Tuple[str, List[str], Iterator[tuple]]:
+    """
+    Parse one of the O*NET SQLiteStudio dumps in data/onet as a stream, without executing it.
+
+    Each dump creates one table (CREATE TABLE with bracketed identifiers) and inserts one row per INSERT statement;
+    PRAGMA, transaction and DROP statements are skipped.
+
+    :param path: Path to the .sql dump
+    :return: Table name, column names as in the dump (e.g. "O*NET-SOC Code"), and an iterator over the rows
+    """
+    statements = _iter_statements(Path(path))
+    for statement in statements:
+        if statement.startswith("CREATE TABLE"):
+            table_name = statement.split()[2]
+            columns = _parse_identifiers(statement[statement.index("(") + 1:statement.rindex(")")])
+            break
+    else:
+        raise ValueError(f"No CREATE TABLE statement in {path}")
+
+    def rows():
+        for statement in statements:
+            if not statement.startswith("INSERT INTO"):
+                continue
+            values_at = statement.index("VALUES")
+            row_columns = _parse_identifiers(statement[statement.index("(") + 1:statement.rindex(")", 0, values_at)])
+            row = dict(zip(row_columns, (_parse_value(match)
+                                         for match in VALUE_PATTERN.finditer(statement, values_at + len("VALUES")))))
+            yield tuple(row.get(column) for column in columns)
+
+    return table_name, columns, rows()
+
+
+def read_onet_dump(path: Union[str, Path], table_name: str) -> pd.DataFrame:
+    """
+    Read a table from one of the O*NET SQLiteStudio dumps in data/onet
+
+    :param path: Path to the .sql dump
+    :param table_name: Table created by the dump, e.g. onet_tools_used
+    :return: Table contents, with the dump's column names (e.g. "O*NET-SOC Code")
+    """
+    dump_table_name, columns, rows = parse_onet_dump(path)
+    if dump_table_name != table_name:
+        raise ValueError(f"{path} creates {dump_table_name}, not {table_name}")
+    return pd.DataFrame.from_records(list(rows), columns=columns)
+
+
+def _expand_packed_tools(tools: pd.DataFrame) -> pd.DataFrame:
+    """
+    The last INSERT in the Tools Used dump carries the rest of the table as tab-separated text in its Example column,
+    leaving the row's other columns empty. Those records are split back out into rows.
+    """
+    columns = ["onet_soc_code", "example", "commodity_code", "commodity_title"]
+    packed = tools["example"].str.contains("\t", regex=False)
+    records = []
+    for row in tools[packed].itertuples(index=False):
+        lines = [line for line in row.example.split("\n") if line.strip()]
+        # The first line continues the INSERT's own row: example, commodity code and commodity title
+        records.append([row.onet_soc_code] + lines[0].split("\t"))
+        records.extend(line.split("\t") for line in lines[1:])
+
+    log.info(f"Expanded {len(records)} packed O*NET tools records")
+    return pd.concat([tools[~packed], pd.DataFrame(records, columns=columns)], ignore_index=True)
+
+
+# Corrections for tables whose dumps need more than parsing
+ONET_TABLE_FIXES = {
+    "onet_tools_used": _expand_packed_tools,
+}
+
+
+def read_onet_table(path: Union[str, Path]) -> Tuple[str, pd.DataFrame]:
+    """
+    Read an O*NET dump into a normalized table: snake_case column names, any fixes in ONET_TABLE_FIXES applied, and,
+    for occupation tables, a soc_code column with the O*NET-SOC code truncated to the SOC code used by the rest of the
+    app (11-3051.02 -> 11-3051)
+
+    :param path: Path to the .sql dump
+    :return: Table name and contents
+    """
+    table_name, columns, rows = parse_onet_dump(path)
+    table = pd.DataFrame.from_records(list(rows), columns=[snake_case(column) for column in columns])
+
+    fix = ONET_TABLE_FIXES.get(table_name)
+    if fix is not None:
+        table = fix(table)
+    if "onet_soc_code" in table.columns:
+        table.insert(0, "soc_code", table["onet_soc_code"].str[:7])
+    return table_name, table
+
+
+def read_onet_tools(path: Union[str, Path] = ONET_DIR / "onet_tools_used.sql") -> pd.DataFrame:
+    """
+    Read the O*NET Tools Used table, with the packed records expanded (see _expand_packed_tools)
+
+    :param path: Path to onet_tools_used.sql
+    :return: DataFrame with columns onet_soc_code, example, commodity_code, commodity_title
+    """
+    return read_onet_table(path)[1][["onet_soc_code", "example", "commodity_code", "commodity_title"]]
+
+
+def read_onet_emerging_tasks(path: Union[str, Path] = ONET_DIR / "onet_emerging_tasks.sql") -> pd.DataFrame:
+    """
+    Read the O*NET Emerging Tasks table
+
+    :param path: Path to onet_emerging_tasks.sql
+    :return: DataFrame with columns onet_soc_code, task, category
+    """
+    return read_onet_table(path)[1][["onet_soc_code", "task", "category"]]
+
+
+def read_onet_occupation_phrases(onet_dir: Union[str, Path] = ONET_DIR) -> pd.DataFrame:
+    """
+    Collect the tool, technology and task phrases that O*NET associates with each occupation, for full-text search
+    (see jobs.search.OnetPhraseSearch).
+
+    O*NET-SOC codes are truncated to the SOC code used by the transitions data (11-3051.02 -> 11-3051), so several
+    O*NET occupations can map to the same SOC. Duplicate phrases within a SOC are dropped.
+
+    :param onet_dir: Directory with the O*NET dumps
+    :return: DataFrame with columns soc_code, onet_soc_code, phrase, category, source ("tool" or "emerging_task")
+    """
+    onet_dir = Path(onet_dir)
+
+    tools = read_onet_tools(onet_dir / "onet_tools_used.sql")
+    tools = tools.rename(columns={"example": "phrase", "commodity_title": "category"})
+    tools["source"] = "tool"
+
+    tasks = read_onet_emerging_tasks(onet_dir / "onet_emerging_tasks.sql")
+    # Emerging task categories ("New", "Revision") describe the task's status, not its content
+    tasks = tasks.rename(columns={"task": "phrase"}).assign(category="", source="emerging_task")
+
+    phrases = pd.concat([tools, tasks], ignore_index=True)
+    phrases["phrase"] = phrases["phrase"].str.strip()
+    phrases["category"] = phrases["category"].fillna("").str.strip()
+    phrases["soc_code"] = phrases["onet_soc_code"].str[:7]
+
+    phrases = phrases[phrases["phrase"] != ""].drop_duplicates(subset=["soc_code", "phrase", "source"])
+    log.info(f"Read {len(phrases)} O*NET occupation phrases from {onet_dir}")
+    return phrases[PHRASE_COLUMNS].reset_index(drop=True)
+
+
+def _load_onet_table(engine, table_name: str, table: pd.DataFrame):
+    """
+    Load one normalized O*NET table, indexed on soc_code if it has one. Postgres tables are bulk-loaded with COPY and
+    swapped in (see swap_in_dataframe), with column types from the table's dtypes; other databases (e.g. a SQLite
+    database file) are loaded with to_sql, which types the columns the same way.
+    """
+    indexes = ["soc_code"] if "soc_code" in table.columns else []
+    if engine.dialect.name == "postgresql":
+        swap_in_dataframe(engine,
+                          table,
+                          table_name,
+                          column_types=frame_column_types(table),
+                          indexes=indexes)
+        return
+
+    with engine.begin() as connection:
+        table.to_sql(table_name, connection, if_exists="replace", index=False)
+        for column in indexes:
+            connection.execute(f"CREATE INDEX {table_name}_{column}_idx ON {table_name} ({column})")
+
+
+def load_onet_tables(engine,
+                     onet_dir: Union[str, Path] = ONET_DIR,
+                     max_workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Load every O*NET dump in onet_dir into the database, as tables named after the dumps (e.g. onet_job_zones) with
+    normalized columns (see read_onet_table).
+
+    Dumps are parsed in parallel worker processes, since parsing is CPU-bound. The workers are spawned rather than
+    forked, since load_data calls this from a thread (see cache_multi_year_oes). Tables are then loaded in parallel on
+    Postgres, where each load runs on its own connection; SQLite allows one writer at a time, so they are loaded one
+    after the other there.
+
+    :param engine: SQLAlchemy engine for the target database
+    :param onet_dir: Directory with the O*NET dumps
+    :param max_workers: Worker processes and threads; defaults to the number of CPUs
+    :return: Number of rows loaded, by table
+    """
+    started = time.perf_counter()
+    paths = sorted(Path(onet_dir).glob("onet_*.sql"))
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as processpool:
+        tables = list(processpool.map(read_onet_table, paths))
+    log.info(f"Parsed {len(tables)} O*NET dumps in {time.perf_counter() - started:.1f} s")
+
+    if engine.dialect.name == "postgresql":
+        with ThreadPoolExecutor(max_workers=max_workers) as threadpool:
+            list(threadpool.map(lambda named_table: _load_onet_table(engine, *named_table), tables))
+    else:
+        for table_name, table in tables:
+            _load_onet_table(engine, table_name, table)
+
+    log.info(f"Loaded {len(tables)} O*NET tables in {time.perf_counter() - started:.1f} s")
+    return {table_name: len(table) for table_name, table in tables}
+
+
+if __name__ == "__main__":
+    """
+    Load the O*NET dumps into Postgres (configured as for sql_loader), or into a SQLite database file given as the
+    first argument:
+
+        python -m data.scripts.onet_loader [path/to/database.sqlite3]
+    """
+    import sys
+    from data.scripts.sql_loader import create_sqlalchemyengine
+
+    logging.basicConfig(format="%(asctime)s %(message)s", level=logging.INFO)
+    target = create_engine(f"sqlite:///{sys.argv[1]}") if len(sys.argv) > 1 else create_sqlalchemyengine()
+    for name, rows in load_onet_tables(target).items():
+        log.info(f"{name}: {rows} rows")
@@ -4,11 +4,22 @@
 import logging
 import os
 
+import django
 import pandas as pd
-
-from sqlalchemy.types import Integer, Numeric, String
 from sqlalchemy import create_engine
-from data.bls.oes_data_downloader import download_multi_year_oes
+from data.bls.oes_data_downloader import combine_multi_year_oes, latest_oes_years, download_multi_year_oes_industries
+from data.bls.utils.oes_areas import oes_area_table
+from data.bls.utils.oes_history import oes_history_table
+from data.instrumentation import load_report, measure_stage
+from data.scripts.transitions_reader import read_occupation_transitions
+from data.scripts.bulk_copy import (
+    apply_dataframe_diff,
+    swap_in_dataframe,
+    rollback_table_release,
+    model_column_types,
+    BLS_OES_EXTRA_COLUMNS,
+    OCCUPATION_TRANSITION_COLUMNS,
+)
 
 logging.basicConfig(format="%(asctime)s %(message)s")
 log = logging.getLogger()
@@ -52,6 +63,10 @@ def load_bls_oes_to_sql(
     table_name: str = "bls_oes",
     soc_table_name: str = "soc_list",
     transitions_file_path: str = "../occupation_transitions_public_data_set.csv",
+    incremental: bool = False,
+    engine=None,
+    area_table_name: str = "",
+    history_table_name: str = "",
 ):
     """
     Load BLS OES data from 2019 to the specified table_name. If no table_name is specified, return a dict.
@@ -65,111 +80,314 @@ def load_bls_oes_to_sql(
     :param soc_table_name: Table for unique SOC codes/descriptions that are in transitions data
     :param transitions_file_path: Used to load transitions data to only include BLS SOC codes that are in the transitions
         dataset
+    :param incremental: Apply only the rows that changed (see apply_dataframe_diff), keyed on (area_code, soc_code,
+        file_year), soc_code and area_code, instead of replacing the tables. Years outside start_year-end_year are
+        left alone.
+    :param engine: SQLAlchemy engine to use instead of connecting to db, e.g. for the Django database
+    :param area_table_name: Table for the areas in the data (see oes_area_table), if any
+    :param history_table_name: Table for every year's wages and employment of each area and SOC code (see
+        oes_history_table), if any. The history covers start_year-end_year, whether or not the load is incremental.
     """
     log.info("Loading BLS wage and employment data to Postgres if a table_name is specified")
-    engine = create_sqlalchemyengine(db=db)
+    own_engine = engine is None
+    engine = engine or create_sqlalchemyengine(db=db)
 
-    bls_oes_data = download_multi_year_oes(start_year=start_year,
-                                           end_year=end_year)
+    all_years = combine_multi_year_oes(start_year=start_year, end_year=end_year)
+    bls_oes_data = latest_oes_years(all_years)
 
     if table_name:
         log.info("Successfully read OES data. Writing to the {} table".format(table_name))
-        bls_oes_data.to_sql(
-            table_name,
-            engine,
-            if_exists="replace",
-            index=True,
-            index_label="id",
-            dtype={
-                "soc_decimal_code": String(),
-                "hourly_mean_wage": Numeric(),
-                "annual_mean_wage": Numeric(),
-                "total_employment": Integer(),
-                "soc_code": String(),
-                "soc_title": String(),
-                "file_year": Integer()
-            }
-        )
+        with measure_stage(f"{table_name}.write", rows_in=len(bls_oes_data)) as stage:
+            if incremental:
+                changes = apply_dataframe_diff(engine,
+                                               bls_oes_data,
+                                               table_name,
+                                               key_columns=["area_code", "soc_code", "file_year"],
+                                               column_types=model_column_types("BlsOes", BLS_OES_EXTRA_COLUMNS),
+                                               scope_columns=["file_year"],
+                                               id_column="id",
+                                               indexes=["id"])
+                stage.rows_out = sum(changes.values())
+            else:
+                swap_in_dataframe(engine,
+                                  bls_oes_data,
+                                  table_name,
+                                  column_types=model_column_types("BlsOes", BLS_OES_EXTRA_COLUMNS),
+                                  index_label="id",
+                                  indexes=["id"])
+                stage.rows_out = len(bls_oes_data)
         log.info("Successfully loaded BLS data to Postgres!")
 
+    if area_table_name:
+        with measure_stage(f"{area_table_name}.dedupe", rows_in=len(bls_oes_data)) as stage:
+            areas = oes_area_table(bls_oes_data)
+            stage.rows_out = len(areas)
+
+        with measure_stage(f"{area_table_name}.write", rows_in=len(areas)) as stage:
+            if incremental:
+                changes = apply_dataframe_diff(engine,
+                                               areas,
+                                               area_table_name,
+                                               key_columns=["area_code"],
+                                               column_types=model_column_types("Area"),
+                                               indexes=["area_code"])
+                stage.rows_out = sum(changes.values())
+            else:
+                swap_in_dataframe(engine,
+                                  areas,
+                                  area_table_name,
+                                  column_types=model_column_types("Area"),
+                                  indexes=["area_code"])
+                stage.rows_out = len(areas)
+        log.info(f"Saved {len(areas)} areas to {area_table_name}")
+
+    if history_table_name:
+        with measure_stage(f"{history_table_name}.pack", rows_in=len(all_years)) as stage:
+            history = oes_history_table(all_years)
+            stage.rows_out = len(history)
+
+        with measure_stage(f"{history_table_name}.write", rows_in=len(history)) as stage:
+            if incremental:
+                changes = apply_dataframe_diff(engine,
+                                               history,
+                                               history_table_name,
+                                               key_columns=["area_code", "soc_code"],
+                                               column_types=model_column_types("BlsOesHistory"),
+                                               id_column="id",
+                                               indexes=["id"])
+                stage.rows_out = sum(changes.values())
+            else:
+                swap_in_dataframe(engine,
+                                  history,
+                                  history_table_name,
+                                  column_types=model_column_types("BlsOesHistory"),
+                                  index_label="id",
+                                  indexes=["id"])
+                stage.rows_out = len(history)
+        log.info(f"Saved the history of {len(history)} areas and SOC codes to {history_table_name}")
+    # Only the latest years are needed from here on
+    del all_years
+
     # Unique SOC-codes --> occupation descriptions
     if soc_table_name:
         log.info("Saving unique SOC codes/descriptions to {}".format(soc_table_name))
-        socs_in_transitions = pd.read_csv(transitions_file_path)
-        valid_source_socs = set(socs_in_transitions["soc1"])
-
-        unique_soc_codes = (
-            bls_oes_data[["soc_code", "soc_title"]]
-            .drop_duplicates(subset=["soc_code"]))
-
-        log.info("Filtering SOC codes to only include those in the source SOC for transitions data")
-        unique_soc_codes = unique_soc_codes[unique_soc_codes["soc_code"].apply(
-            lambda soc: soc in valid_source_socs)]
-        unique_soc_codes = unique_soc_codes.reset_index(drop = True)
-
-        unique_soc_codes.to_sql(
-            soc_table_name,
-            engine,
-            if_exists="replace",
-            index=True,
-            index_label="id",
-            dtype={
-                "soc_code": String(),
-                "soc_title": String()
-            }
-        )
+        transitions_data = read_occupation_transitions(transitions_file_path)
+        valid_source_socs = transitions_data.source_socs
+
+        with measure_stage(f"{soc_table_name}.dedupe", rows_in=len(bls_oes_data)) as stage:
+            unique_soc_codes = (
+                bls_oes_data[["soc_code", "soc_title"]]
+                .drop_duplicates(subset=["soc_code"]))
+
+            log.info("Filtering SOC codes to only include those in the source SOC for transitions data")
+            unique_soc_codes = unique_soc_codes[unique_soc_codes["soc_code"].isin(valid_source_socs)]
+            unique_soc_codes = unique_soc_codes.reset_index(drop = True)
+            # Filled in before the table is released, so the live table never has codes without their totals
+            unique_soc_codes["total_transition_obs"] = (
+                unique_soc_codes["soc_code"].map(transitions_data.total_obs.to_dict()).astype(float))
+            stage.rows_out = len(unique_soc_codes)
+
+        with measure_stage(f"{soc_table_name}.write", rows_in=len(unique_soc_codes)) as stage:
+            if incremental:
+                changes = apply_dataframe_diff(engine,
+                                               unique_soc_codes,
+                                               soc_table_name,
+                                               key_columns=["soc_code"],
+                                               column_types=model_column_types("SocDescription"),
+                                               id_column="id",
+                                               indexes=["id"])
+                stage.rows_out = sum(changes.values())
+            else:
+                swap_in_dataframe(engine,
+                                  unique_soc_codes,
+                                  soc_table_name,
+                                  column_types=model_column_types("SocDescription"),
+                                  index_label="id",
+                                  indexes=["id"])
+                stage.rows_out = len(unique_soc_codes)
         log.info("Unique SOC codes/descriptions saved!")
 
-    engine.dispose()
+    if own_engine:
+        engine.dispose()
     return bls_oes_data
 
 
+def load_bls_oes_industries_to_sql(
+    start_year: int = 2017,
+    end_year: int = 2019,
+    db: str = "",
+    table_name: str = "bls_oes_industry",
+    industry_table_name: str = "industry",
+    engine=None,
+):
+    """
+    Load industry-specific (NAICS) BLS OES data (see download_multi_year_oes_industries) to table_name, and the
+    industries to industry_table_name. Both tables are replaced with swap_in_dataframe.
+
+    The workbooks are streamed and partitioned on disk, so parsing them does not hold every industry's rows in memory,
+    and the years are combined and copied into table_name one NAICS sector at a time, so loading them does not either.
+
+    :param engine: SQLAlchemy engine to use instead of connecting to db, e.g. for the Django database
+    :return: Industry-specific estimates loaded
+    """
+    log.info("Loading industry-specific BLS wage and employment data to Postgres")
+    own_engine = engine is None
+    engine = engine or create_sqlalchemyengine(db=db)
+
+    estimates, industries = download_multi_year_oes_industries(start_year=start_year, end_year=end_year)
+
+    if industry_table_name:
+        with measure_stage(f"{industry_table_name}.write", rows_in=len(industries)) as stage:
+            swap_in_dataframe(engine,
+                              industries,
+                              industry_table_name,
+                              column_types=model_column_types("Industry"),
+                              indexes=["naics_code"])
+            stage.rows_out = len(industries)
+        log.info(f"Saved {len(industries)} industries to {industry_table_name}")
+
+    rows = 0
+    if table_name:
+        with measure_stage(f"{table_name}.write") as stage:
+            rows = swap_in_dataframe(engine,
+                                     estimates,
+                                     table_name,
+                                     column_types=model_column_types("BlsOesIndustry"),
+                                     index_label="id",
+                                     indexes=["id"])
+            stage.rows_out = rows
+        log.info(f"Saved {rows} industry-specific estimates to {table_name}")
+
+    if own_engine:
+        engine.dispose()
+    return rows
+
+
 def load_occupation_transitions_to_sql(
     file_path: str = "../occupation_transitions_public_data_set.csv",
     db: str = "",
-    table_name: str = "occupation_transition"
+    table_name: str = "occupation_transition",
+    incremental: bool = False,
+    engine=None,
+    model_table_name: str = "",
 ):
     """
     Load the occupation transitions data to SQL from the CSV file in jobhopper.data
+
+    :param incremental: Apply only the rows that changed (see apply_dataframe_diff), keyed on (soc1, soc2), instead of
+        replacing the table, then refresh total_transition_obs where it differs (see refresh_total_transition_obs)
+    :param engine: SQLAlchemy engine to use instead of connecting to db, e.g. for the Django database
+    :param model_table_name: Table for the transitions as jobs.models.OccupationTransitions stores them (see
+        occupation_transitions_model_table), if any. It is loaded like table_name, replaced or updated incrementally.
     """
     log.info("Loading occupation transitions (Burning Glass) data to Postgres")
-    engine = create_sqlalchemyengine(db=db)
-    # total_obs is weighted by age, so is a float instead of int
-    occupation_transitions = pd.read_csv(
-        file_path,
-        na_values=["NA"],
-        usecols=["soc1", "soc2", "total_obs", "transition_share", "soc1_name", "soc2_name"],
-        dtype={
-            "soc1": str,
-            "soc2": str,
-            "total_obs": float,
-            "transition_share": float,
-            "soc1_name": str,
-            "soc2_name": str
-        },
-    )
+    own_engine = engine is None
+    engine = engine or create_sqlalchemyengine(db=db)
+    occupation_transitions = read_occupation_transitions(file_path).transitions
 
-    if table_name:
-        occupation_transitions.to_sql(
-            table_name,
-            engine,
-            if_exists="replace",
-            index=True,
-            dtype={
-                "soc1": String(),
-                "soc2": String(),
-                "total_obs": Numeric(),
-                "transition_share": Numeric(),
-                "soc1_name": String(),
-                "soc2_name": String()
-            },
-        )
+    if table_name and incremental:
+        with measure_stage(f"{table_name}.write", rows_in=len(occupation_transitions)) as stage:
+            changes = apply_dataframe_diff(engine,
+                                           occupation_transitions,
+                                           table_name,
+                                           key_columns=["soc1", "soc2"],
+                                           column_types=OCCUPATION_TRANSITION_COLUMNS,
+                                           id_column="index",
+                                           indexes=["index"])
+            stage.rows_out = sum(changes.values())
+        if any(changes.values()):
+            refresh_total_transition_obs(engine, table_name)
+    elif table_name:
+        with measure_stage(f"{table_name}.write", rows_in=len(occupation_transitions)) as stage:
+            swap_in_dataframe(engine,
+                              occupation_transitions,
+                              table_name,
+                              column_types=OCCUPATION_TRANSITION_COLUMNS,
+                              index_label="index",
+                              indexes=["index"])
+            stage.rows_out = len(occupation_transitions)
 
-    engine.dispose()
+    if model_table_name:
+        model_transitions = occupation_transitions_model_table(occupation_transitions)
+        with measure_stage(f"{model_table_name}.write", rows_in=len(model_transitions)) as stage:
+            if incremental:
+                changes = apply_dataframe_diff(engine,
+                                               model_transitions,
+                                               model_table_name,
+                                               key_columns=["soc1", "soc2"],
+                                               column_types=model_column_types("OccupationTransitions"),
+                                               id_column="id",
+                                               indexes=["id"])
+                stage.rows_out = sum(changes.values())
+            else:
+                swap_in_dataframe(engine,
+                                  model_transitions,
+                                  model_table_name,
+                                  column_types=model_column_types("OccupationTransitions"),
+                                  index_label="id",
+                                  indexes=["id"])
+                stage.rows_out = len(model_transitions)
+        log.info(f"Saved {len(model_transitions)} transitions to {model_table_name}")
+
+    if own_engine:
+        engine.dispose()
 
     return occupation_transitions
 
 
+def occupation_transitions_model_table(occupation_transitions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Transitions as jobs.models.OccupationTransitions stores them, as migration 0009 copies them from the raw table:
+    soc2 is blank rather than null, pi is the transition share, and total_transition_obs is already filled in (as
+    migration 0015 does), so the table is complete when it is released. Indexed by id, from 1.
+    """
+    model_transitions = pd.DataFrame({
+        "soc1": occupation_transitions["soc1"].astype(object),
+        "soc2": occupation_transitions["soc2"].astype(object).fillna(""),
+        "pi": occupation_transitions["transition_share"],
+        "total_transition_obs": occupation_transitions["total_obs"],
+    })
+    model_transitions.index = pd.RangeIndex(1, len(model_transitions) + 1)
+    return model_transitions
+
+
+def refresh_total_transition_obs(engine, table_name: str = "occupation_transition"):
+    """
+    Copy total_obs from the raw transitions table to the total_transition_obs fields, as migration 0015 does, but only
+    for rows whose value differs, so an incremental load does not rewrite every row
+    """
+    with engine.begin() as connection:
+        if not connection.execute("SELECT to_regclass('jobs_occupationtransitions') IS NOT NULL").scalar():
+            return
+
+        transitions = connection.execute(
+            "UPDATE jobs_occupationtransitions AS jobs "
+            "SET total_transition_obs = original.total_obs "
+            f"FROM {table_name} AS original "
+            "WHERE original.soc1 = jobs.soc1 "
+            "  AND original.soc2 = jobs.soc2 "
+            "  AND jobs.total_transition_obs IS DISTINCT FROM original.total_obs")
+        socs = connection.execute(
+            "UPDATE jobs_socdescription AS jobs "
+            "SET total_transition_obs = original.total_obs "
+            "FROM (SELECT DISTINCT soc1, total_obs "
+            f"      FROM {table_name}) AS original "
+            "WHERE original.soc1 = jobs.soc_code "
+            "  AND jobs.total_transition_obs IS DISTINCT FROM original.total_obs")
+    log.info(f"Refreshed total_transition_obs for {transitions.rowcount} transitions and {socs.rowcount} SOC codes")
+
+
+def rollback_data_release(db: str = "",
+                          table_names=("bls_oes", "soc_list", "occupation_transition")):
+    """
+    Put back the previous release of each table (see swap_in_dataframe), e.g. after loading bad data
+    """
+    engine = create_sqlalchemyengine(db=db)
+    for table_name in table_names:
+        rollback_table_release(engine, table_name)
+    engine.dispose()
+
+
 if __name__ == "__main__":
     """
     Expected results in postgres table:
@@ -193,5 +411,10 @@ if __name__ == "__main__":
      13-2011 | 13-2051 |  390865.6 |            0.0489697 | Accountants and auditors | Financial analysts
     """
 
-    load_bls_oes_to_sql(table_name="bls_oes", soc_table_name="soc_list")
-    load_occupation_transitions_to_sql(table_name="occupation_transition")
+    # Column types come from the jobs models
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jobhopper.settings")
+    django.setup()
+
+    with load_report("sql_loader"):
+        load_bls_oes_to_sql(table_name="bls_oes", soc_table_name="soc_list")
+        load_occupation_transitions_to_sql(table_name="occupation_transition")
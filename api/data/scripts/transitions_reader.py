@@ -0,0 +1,86 @@
+"""
+Single-pass, chunked reader for the occupation transitions CSV (occupation_transitions_public_data_set.csv)
+"""
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Union
+import logging
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from data.instrumentation import measure_stage, file_size
+
+log = logging.getLogger()
+
+# total_obs is weighted by age, so is a float instead of int. SOC codes and names repeat for every transition, so
+# they are read as categoricals: each distinct string is stored once, with small integer codes per row.
+TRANSITIONS_CSV_DTYPES = {
+    "soc1": "category",
+    "soc2": "category",
+    "total_obs": float,
+    "transition_share": float,
+    "soc1_name": "category",
+    "soc2_name": "category",
+}
+TRANSITIONS_CHUNK_ROWS = 100000
+
+OccupationTransitionsData = namedtuple("OccupationTransitionsData", ["transitions", "source_socs", "total_obs"])
+OccupationTransitionsData.__doc__ = """
+Contents of the transitions CSV.
+
+transitions: DataFrame of transitions, with categorical SOC codes and names
+source_socs: Set of source SOC codes (soc1)
+total_obs: Series of total observations for each source SOC code, indexed by soc1
+"""
+
+
+def read_occupation_transitions(file_path: Union[str, Path],
+                                chunk_rows: int = TRANSITIONS_CHUNK_ROWS) -> OccupationTransitionsData:
+    """
+    Read the transitions CSV in chunks of chunk_rows, so only one chunk's raw strings are in memory at a time. Each
+    chunk's SOC codes and names are dictionary-encoded as it is read, and the per-SOC totals are collected along the
+    way, so the file is read once for everything the loaders need.
+
+    The result is memoized per file (and modification time), so loading transitions and then OES data in one process
+    does not read the file twice.
+    """
+    path = Path(file_path).resolve()
+    return _read_occupation_transitions(path, path.stat().st_mtime_ns, chunk_rows)
+
+
+@lru_cache(maxsize=1)
+def _read_occupation_transitions(path: Path, modified_ns: int, chunk_rows: int) -> OccupationTransitionsData:
+    log.info(f"Reading occupation transitions from {path}")
+    with measure_stage("transitions.parse", bytes_read=file_size(path)) as stage:
+        chunks = []
+        total_obs = {}
+        for chunk in pd.read_csv(path,
+                                 na_values=["NA"],
+                                 usecols=list(TRANSITIONS_CSV_DTYPES),
+                                 dtype=TRANSITIONS_CSV_DTYPES,
+                                 chunksize=chunk_rows):
+            # total_obs is the same on every row for a source SOC code
+            chunk_totals = chunk.groupby("soc1", observed=True)["total_obs"].first()
+            total_obs.update(chunk_totals.to_dict())
+            chunks.append(chunk)
+
+        if not chunks:
+            transitions = pd.DataFrame({name: pd.Series(dtype=dtype)
+                                        for name, dtype in TRANSITIONS_CSV_DTYPES.items()})
+        else:
+            # Categories differ from chunk to chunk; union_categoricals merges them and recodes each chunk once
+            transitions = pd.DataFrame({
+                name: (union_categoricals([chunk[name] for chunk in chunks], ignore_order=True)
+                       if dtype == "category" else
+                       pd.concat([chunk[name] for chunk in chunks], ignore_index=True))
+                for name, dtype in TRANSITIONS_CSV_DTYPES.items()
+            })
+        stage.rows_out = len(transitions)
+
+    total_obs = pd.Series(total_obs, name="total_obs", dtype=float).rename_axis("soc1")
+    log.info(f"Read {len(transitions)} transitions from {len(total_obs)} source SOC codes")
+    return OccupationTransitionsData(transitions=transitions,
+                                     source_socs=set(total_obs.index),
+                                     total_obs=total_obs)
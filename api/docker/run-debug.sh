@@ -3,5 +3,6 @@
 set -ex
 env
 python manage.py migrate
+python manage.py createcachetable
 
 python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
@@ -3,10 +3,14 @@
 set -ex
 env
 python manage.py migrate
+python manage.py createcachetable
 
+# Async views (e.g. /soc-smart-list-async/) are served over ASGI on port 8001; everything else through uWSGI. The uWSGI
+# master supervises uvicorn as a daemon: it runs as the uwsgi user and is restarted if it dies.
 uwsgi \
   --socket :8000 \
   --module jobhopper.wsgi \
   --uid uwsgi \
   --master \
-  --enable-threads
\ No newline at end of file
+  --enable-threads \
+  --attach-daemon "uvicorn jobhopper.asgi:application --host 0.0.0.0 --port 8001 --workers 2"
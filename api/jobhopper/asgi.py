@@ -3,6 +3,9 @@ ASGI config for jobhopper project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+HTTP requests go to Django. WebSocket connections are routed by path to the handlers in WEBSOCKET_ROUTES, since Django
+does not handle WebSockets itself.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 """
@@ -13,4 +16,24 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jobhopper.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, since the handlers use the models
+from jobs.consumers import SocSearchConsumer  # noqa: E402
+
+WEBSOCKET_ROUTES = {
+    "/api/v1/jobs/ws/soc-search/": SocSearchConsumer,
+}
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        consumer = WEBSOCKET_ROUTES.get(scope["path"])
+        if consumer is None:
+            # Close the handshake: the first message on a WebSocket connection is always websocket.connect
+            await receive()
+            await send({"type": "websocket.close", "code": 4404})
+            return
+        await consumer(scope, receive, send).run()
+    else:
+        await django_application(scope, receive, send)
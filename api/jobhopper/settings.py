@@ -117,6 +117,30 @@ DATABASES = {
     }
 }
 
+# Source data is loaded with `python manage.py load_data` (jobs/management/commands/load_data.py), so that migrate only
+# changes the schema. Set LOAD_DATA_IN_MIGRATIONS to "True" to have migrations 0009-0017 load the data themselves, as
+# they used to.
+LOAD_DATA_IN_MIGRATIONS = os.getenv("LOAD_DATA_IN_MIGRATIONS", "") == "True"
+
+# Caches
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# The onet cache holds O*NET keyword search results. It is database-backed by default so that every uWSGI worker
+# shares it; create the table with `python manage.py createcachetable`.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "onet": {
+        "BACKEND": os.getenv("ONET_CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": os.getenv("ONET_CACHE_LOCATION", "jobhopper_onet_cache"),
+        "TIMEOUT": int(os.getenv("ONET_CACHE_TIMEOUT", 60 * 60 * 24)),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("ONET_CACHE_MAX_ENTRIES", 5000)),
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -2,7 +2,11 @@ from django.shortcuts import render
 from django.http import HttpResponse, JsonResponse
 from django.template import loader
 from datetime import datetime
+from jobs.cache import OnetKeywordCache
 from . import views
+import logging
+
+log = logging.getLogger()
 
 
 def index(request):
@@ -28,7 +32,13 @@ def health(request):
     """
     Provide a static health output that should work and return 200
     Just pasted a random uuid4 into the output. No particular meaning.
+    Also reports hit/miss counters for the shared O*NET keyword cache, as counted by the worker process that answered.
     """
+    try:
+        onet_cache = {"status": "pass", **OnetKeywordCache().stats()}
+    except Exception as e:
+        log.warning(f"Unable to read O*NET cache metrics | {e}")
+        onet_cache = {"status": "warn"}
 
     data = {
         "status": "pass",
@@ -45,7 +55,13 @@ def health(request):
                     "status": "pass",
                     "time": f"{datetime.now().utcnow().strftime('%Y-%M-%dT%H:%M:%S.%mZ')}",
                 }
-            ]
+            ],
+            "onet:cache": [
+                {
+                    "componentType": "cache",
+                    **onet_cache,
+                }
+            ],
         },
     }
     return JsonResponse(data)
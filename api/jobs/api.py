@@ -1,24 +1,39 @@
-from .models import Socs, BlsOes, StateAbbPairs, OccupationTransitions, SocDescription
+from .models import (Socs, BlsOes, BlsOesHistory, StateAbbPairs, OccupationTransitions, SocDescription, Area, Industry,
+                     BlsOesIndustry)
+from django.db.models import OuterRef, Q, Subquery
 from rest_framework import viewsets, permissions, generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.throttling import AnonRateThrottle
 from rest_framework.response import Response
 from django.forms.models import model_to_dict
-from collections import namedtuple
 import django_filters
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.pagination import LimitOffsetPagination
-import requests
-from requests.auth import HTTPBasicAuth
-from typing import Dict, Any
+from typing import Dict, Any, List, Mapping
+from collections import namedtuple
 from decouple import config
-from rapidfuzz import fuzz
+import math
+from .cache import OnetKeywordCache
+from .search import (
+    soc_title_corpus,
+    soc_prefix_index,
+    combine_smart_search,
+    fuzzy_search_source,
+    TrigramSocSearch,
+    OnetPhraseSearch,
+)
+from .onet import get_onet_client, parse_onet_soc_codes, CircuitBreakerOpen
 from .serializers import (
     BlsOesSerializer,
     StateNamesSerializer,
+    AreaSerializer,
+    IndustrySerializer,
+    BlsOesIndustrySerializer,
     SocListSerializer,
     OccupationTransitionsSerializer,
     BlsTransitionsSerializer,
+    BlsOesHistorySerializer,
 )
 import logging
 
@@ -34,15 +49,43 @@ class BlsOesFilter(django_filters.FilterSet):
     """
     socs = django_filters.BaseInFilter(field_name='soc_code', lookup_expr='in')
     areas = django_filters.BaseInFilter(field_name='area_title', lookup_expr='in')
+    area_codes = django_filters.BaseInFilter(field_name='area_code', lookup_expr='in')
+    area_type = django_filters.NumberFilter(field_name='area_type')
 
     class Meta:
         model = BlsOes
-        fields = ['socs', 'areas']
+        fields = ['socs', 'areas', 'area_codes', 'area_type']
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+class IndustryWageFilter(django_filters.FilterSet):
+    """
+    Create a filter to use with the BlsOesIndustry model, with the same parameters as BlsOesFilter plus industry, a
+    comma-separated list of NAICS codes
+    """
+    industry = NumberInFilter(field_name="industry_id", lookup_expr="in")
+    socs = django_filters.BaseInFilter(method="filter_socs")
+    areas = django_filters.BaseInFilter(field_name="area__area_title", lookup_expr="in")
+    area_codes = django_filters.BaseInFilter(field_name="area_id", lookup_expr="in")
+    area_type = django_filters.NumberFilter(field_name="area__area_type")
+
+    class Meta:
+        model = BlsOesIndustry
+        fields = ["industry", "socs", "areas", "area_codes", "area_type"]
+
+    def filter_socs(self, queryset, name, value):
+        # SOC codes are stored as integers, e.g. 11-1011 as 111011
+        digits = [soc_code.replace("-", "") for soc_code in value]
+        return queryset.filter(soc__in=[int(soc) for soc in digits if len(soc) == 6 and soc.isdigit()])
 
 
 class BlsOesViewSet(viewsets.ReadOnlyModelViewSet):
     """
-    ViewSet for wage/employment data by location, SOC code, and year
+    ViewSet for wage/employment data by location, SOC code, and year. With the industry parameter, e.g.
+    /?industry=622100&socs=29-1141, wages are for those NAICS industries rather than across industries.
     """
     queryset = BlsOes.objects.all()
     permission_classes = [permissions.AllowAny]
@@ -52,6 +95,9 @@ class BlsOesViewSet(viewsets.ReadOnlyModelViewSet):
     filter_class = BlsOesFilter
 
     def list(self, request, *args, **kwargs):
+        if "industry" in request.query_params:
+            return self.list_industry_wages(request)
+
         queryset = self.filter_queryset(self.get_queryset())
 
         page = self.paginate_queryset(queryset)
@@ -62,6 +108,24 @@ class BlsOesViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    def list_industry_wages(self, request):
+        """
+        Industry-specific wages from BlsOesIndustry, filtered with IndustryWageFilter. Rows are ordered as the
+        (industry, soc, area) index is, so the lookup and the ordering come from one index scan.
+        """
+        filterset = IndustryWageFilter(request.query_params,
+                                       queryset=(BlsOesIndustry.objects
+                                                 .select_related("area", "industry")
+                                                 .order_by("industry_id", "soc", "area_id")),
+                                       request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        page = self.paginate_queryset(filterset.qs)
+        if page is not None:
+            return self.get_paginated_response(BlsOesIndustrySerializer(page, many=True).data)
+        return Response(BlsOesIndustrySerializer(filterset.qs, many=True).data)
+
 
 class SocListFilter(django_filters.FilterSet):
     """
@@ -89,7 +153,60 @@ class SocListSimpleViewSet(viewsets.ReadOnlyModelViewSet):
     filter_class = SocListFilter
 
 
-class SocListSmartViewSet(viewsets.ReadOnlyModelViewSet):
+SocSearchParams = namedtuple("SocSearchParams", ["keyword", "limit", "obs_limit"])
+
+
+class SocSearchParamsMixin(object):
+    """
+    Query parameters shared by the SOC search views: a keyword, a capped limit to the number of results and a minimum
+    number of observed transitions. Views name the keyword and limit parameters with KEYWORD_PARAM and LIMIT_PARAM.
+    """
+    KEYWORD_PARAM = "q"
+    LIMIT_PARAM = "limit"
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+    DEFAULT_OBS_LIMIT = 1000
+
+    @classmethod
+    def parse_params(cls, params: Mapping[str, Any]) -> SocSearchParams:
+        """
+        Parse the search parameters, from a request's query parameters or a WebSocket query. Limits above MAX_LIMIT
+        are capped.
+
+        :param params: User-input parameters, identified by their openapi.Parameter name
+        :return: Keyword (stripped, "" if missing), limit and minimum (weighted) observed transitions
+        :raises ValidationError: If a parameter is not of the right type
+        """
+        keyword = params.get(cls.KEYWORD_PARAM) or ""
+        if not isinstance(keyword, str):
+            raise ValidationError({cls.KEYWORD_PARAM: "Must be text"})
+
+        try:
+            limit = int(params.get(cls.LIMIT_PARAM) or cls.DEFAULT_LIMIT)
+        except (ValueError, TypeError):
+            raise ValidationError({cls.LIMIT_PARAM: "Must be an integer"})
+        if limit < 1:
+            raise ValidationError({cls.LIMIT_PARAM: "Must be at least 1"})
+
+        try:
+            obs_limit = float(params.get("min_weighted_obs") or cls.DEFAULT_OBS_LIMIT)
+        except (ValueError, TypeError):
+            raise ValidationError({"min_weighted_obs": "Must be a number"})
+        if not math.isfinite(obs_limit):
+            raise ValidationError({"min_weighted_obs": "Must be a number"})
+
+        return SocSearchParams(keyword=keyword.strip(), limit=min(limit, cls.MAX_LIMIT), obs_limit=obs_limit)
+
+    def _set_params(self, request):
+        """
+        Set parameters based on the request (see parse_params)
+
+        :param request: User-input parameters
+        """
+        self.keyword, self.limit, self.obs_limit = self.parse_params(request.query_params)
+
+
+class SocListSmartViewSet(SocSearchParamsMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for finding SOC codes matching a user's requested keyword
     """
@@ -97,13 +214,16 @@ class SocListSmartViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
     throttle_classes = [AnonRateThrottle]
 
-    # Default API parameters for O*NET observations and (weighted) minimum number of transitions observed
-    DEFAULT_ONET_LIMIT = 10
-    MAX_ONET_LIMIT = 50
-    DEFAULT_OBS_LIMIT = 1000
+    # The limit is to the number of O*NET results; see SocSearchParamsMixin for the defaults
+    KEYWORD_PARAM = "keyword_search"
+    LIMIT_PARAM = "onet_limit"
 
     # Fuzz.partial_ratio score limit for tiered exact match on SOC title/code and keyword
     FUZZ_LIMIT = 90
+    # Trigram similarity (0-100) limit when fuzzy matching runs in Postgres; see TrigramSocSearch
+    TRIGRAM_LIMIT = 60
+    # Where fuzzy matching runs: "corpus" (in-memory SocTitleCorpus) or "trigram" (Postgres pg_trgm indexes)
+    FUZZY_BACKEND = config("SMART_SEARCH_FUZZY_BACKEND", default="corpus")
 
     # Include a manual parameter that can be included in the request query (+ swagger_auto_schema decorator)
     KEYWORD_PARAMETER = openapi.Parameter("keyword_search",
@@ -120,22 +240,6 @@ class SocListSmartViewSet(viewsets.ReadOnlyModelViewSet):
                                         description="Minimum (weighted) observed transitions from source SOC",
                                         type=openapi.TYPE_NUMBER)
 
-    def _set_params(self, request):
-        """
-        Set parameters based on the request. Custom parameters are identified by their openapi.Parameter name
-
-        :param request: User-input parameters
-        :return: Relevant parameters from the request
-        """
-        self.keyword_search = request.query_params.get("keyword_search")
-        self.onet_limit = request.query_params.get("onet_limit")
-        self.obs_limit = request.query_params.get("min_weighted_obs")
-
-        if not self.onet_limit or int(self.onet_limit) > self.MAX_ONET_LIMIT:
-            self.onet_limit = self.DEFAULT_ONET_LIMIT
-        if not self.obs_limit:
-            self.obs_limit = self.DEFAULT_OBS_LIMIT
-
     def get_queryset(self):
         """
         Custom queryset used that is a combination of querysets from a couple models. Overwriting to prevent
@@ -147,7 +251,8 @@ class SocListSmartViewSet(viewsets.ReadOnlyModelViewSet):
     def search_onet_keyword(keyword: str,
                             limit: int = 20) -> Dict[str, Any]:
         """
-        Search for a keyword that will be matched to SOC codes via the O*Net API
+        Search for a keyword that will be matched to SOC codes via the O*Net API. Returns None if O*NET is unavailable,
+        including while the O*NET client's circuit breaker is open, so the request falls back to fuzzy matching.
 
         :param keyword: Keyword that's requested (user search)
         :param limit: Limit to number of results (should expose this as a parameter)
@@ -158,21 +263,53 @@ class SocListSmartViewSet(viewsets.ReadOnlyModelViewSet):
                                                'tags': {'bright_outlook': ...},
                                      ...]}
         """
-        headers = {"Accept": "application/json"}
-        username = config("ONET_USERNAME")
-        password = config("ONET_PASSWORD")
         try:
-            response = requests.get(f"https://services.onetcenter.org/ws/mnm/search?keyword={keyword}",
-                                    headers=headers,
-                                    params={'end': limit},
-                                    auth=HTTPBasicAuth(username, password))
-
-            return response.json()
+            return get_onet_client().search_keyword(keyword=keyword,
+                                                    limit=limit)
 
+        except CircuitBreakerOpen as e:
+            log.info(e)
+            return None
         except Exception as e:
             log.warning(e)
             return None
 
+    def search_onet_soc_codes(self,
+                              keyword: str,
+                              limit: int) -> List[str]:
+        """
+        Find the SOC codes O*NET matches to a keyword, in O*NET's order. Results are served from the shared O*NET
+        keyword cache when possible, so that popular keywords do not trigger a new O*NET request every time.
+
+        :param keyword: Keyword that's requested (user search)
+        :param limit: Limit to number of results
+        :return: SOC codes without the O*NET detail suffix, e.g. ['29-1216', '29-1229', ...]
+        """
+        onet_cache = OnetKeywordCache()
+        onet_soc_codes = onet_cache.get(keyword=keyword, limit=limit)
+        if onet_soc_codes is not None:
+            log.debug(f"Smart search SOC codes for keyword {keyword} served from cache")
+            return onet_soc_codes
+
+        onet_socs = self.search_onet_keyword(keyword=keyword,
+                                             limit=limit)
+        log.debug(f"Smart search results: {onet_socs}")
+        onet_soc_codes = parse_onet_soc_codes(onet_socs)
+
+        onet_cache.set(keyword=keyword, limit=limit, soc_codes=onet_soc_codes)
+        return onet_soc_codes
+
+    @classmethod
+    def fuzzy_search(cls):
+        """
+        Get the configured fuzzy matching implementation (FUZZY_BACKEND) and its score cutoff
+
+        :return: (SocTitleCorpus or TrigramSocSearch, score cutoff)
+        """
+        source = fuzzy_search_source(cls.FUZZY_BACKEND)
+        score_cutoff = cls.TRIGRAM_LIMIT if isinstance(source, TrigramSocSearch) else cls.FUZZ_LIMIT
+        return source, score_cutoff
+
     @swagger_auto_schema(manual_parameters=[KEYWORD_PARAMETER, ONET_LIMIT_PARAMETER, OBS_LIMIT_PARAM])
     def list(self, request):
         """
@@ -183,7 +320,7 @@ class SocListSmartViewSet(viewsets.ReadOnlyModelViewSet):
         Query parameters:
         ------------------------
         * keyword_search: User-input keyword search for related professions
-        * onet_limit: Limit to the number of results pulled back from O*NET; capped by MAX_ONET_LIMIT. Responses will
+        * onet_limit: Limit to the number of results pulled back from O*NET; capped by MAX_LIMIT. Responses will
            only include smart-search SOCs with transitions data available. If no response is found from O*NET, all
            available SOC codes are returned.
         * min_weighted_obs: Minimum number of observed transitions (weighted) for a response to be included
@@ -191,68 +328,129 @@ class SocListSmartViewSet(viewsets.ReadOnlyModelViewSet):
         # Parameters are pulled from request query, as defined by openapi.Parameter
         self._set_params(request=request)
 
-        # Django QuerySet with all objects in the SocDescription model
-        # model_to_dict serializes each object in the model into a JSON/dict
-        available_socs = (SocDescription
-                          .objects
-                          .filter(total_transition_obs__gte=self.obs_limit))
-        available_socs = [model_to_dict(item)
-                          for item in available_socs]
-        # Transform list of dicts into a lookup dict {soc_code: {soc_code: , soc_title: , total_transition_obs: }}
-        available_soc_codes = {soc.get("soc_code"): soc for soc in available_socs}
-
-        # Query for O*NET Socs if there is a keyword
-        onet_soc_codes = None
-        if self.keyword_search:
-            try:
-                onet_socs = self.search_onet_keyword(keyword=self.keyword_search,
-                                                     limit=self.onet_limit)
-                log.debug(f"Smart search results: {onet_socs}")
-                onet_soc_codes = onet_socs.get("career")
-                onet_soc_codes = [soc.get("code", "") for soc in onet_soc_codes]
-                onet_soc_codes = [soc.split(".")[0] for soc in onet_soc_codes]
-                log.info(f"Smart search SOC codes: {onet_soc_codes}")
-            except Exception as e:
-                log.info(f"Unable to find search results from O*NET for keyword {self.keyword_search} | {e}")
-                onet_soc_codes = []
-
-        # Default response when there is not yet a keyword typed
-        if not self.keyword_search:
-            return Response(available_socs)
+        # Default response when there is not yet a keyword typed. The precomputed corpus of the SocDescription model
+        # is rebuilt when the data changes.
+        if not self.keyword:
+            return Response(soc_title_corpus.get().available(min_obs=self.obs_limit))
+
+        # Query for O*NET Socs
+        try:
+            onet_soc_codes = self.search_onet_soc_codes(keyword=self.keyword,
+                                                        limit=self.limit)
+            log.info(f"Smart search SOC codes: {onet_soc_codes}")
+        except Exception as e:
+            log.info(f"Unable to find search results from O*NET for keyword {self.keyword} | {e}")
+            onet_soc_codes = []
 
         # SOC codes in transitions data that are close to an exact match to the keyword - tiered matching, since O*NET
-        # does not include older SOC codes that exist in the transitions data
-        for soc_entry in available_socs:
-            soc_string = soc_entry.get("soc_title").lower() + soc_entry.get("soc_code")
-            soc_entry["input_match_score"] = fuzz.partial_ratio(self.keyword_search.lower(),
-                                                                soc_string)
+        # does not include older SOC codes that exist in the transitions data. Matches are ordered best-worst score.
+        fuzzy_source, score_cutoff = self.fuzzy_search()
+        fuzz_matches = fuzzy_source.match(keyword=self.keyword,
+                                          min_obs=self.obs_limit,
+                                          score_cutoff=score_cutoff)
+
+        smart_socs = combine_smart_search(source=fuzzy_source,
+                                          keyword=self.keyword,
+                                          min_obs=self.obs_limit,
+                                          fuzz_matches=fuzz_matches,
+                                          onet_soc_codes=onet_soc_codes)
+
+        return Response(smart_socs)
 
-        fuzz_soc_codes = [soc.get("soc_code") for soc in available_socs
-                          if soc.get("input_match_score") >= self.FUZZ_LIMIT]
 
-        fuzz_soc_codes = set(fuzz_soc_codes)
-        log.info(f"SOC codes/titles that are a close exact match to the keyword search {fuzz_soc_codes}")
+class SocAutocompleteViewSet(SocSearchParamsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for autocompleting occupations from a partially typed SOC title or code
+    """
+    serializer_class = SocListSerializer
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [AnonRateThrottle]
 
-        # SOC codes in both O*NET and transitions data, + SOC codes whose title closely matches the search parameter
-        available_onet_codes = [soc for soc in onet_soc_codes if soc in available_soc_codes]
-        available_fuzz_codes = [available_soc_codes.get(soc)
-                                for soc in fuzz_soc_codes
-                                if soc not in onet_soc_codes]
+    PREFIX_PARAMETER = openapi.Parameter("q",
+                                         openapi.IN_QUERY,
+                                         description="Partially typed SOC title or code",
+                                         type=openapi.TYPE_STRING)
+    LIMIT_PARAMETER = openapi.Parameter("limit",
+                                        openapi.IN_QUERY,
+                                        description="Maximum number of suggestions",
+                                        type=openapi.TYPE_INTEGER)
+    OBS_LIMIT_PARAM = SocListSmartViewSet.OBS_LIMIT_PARAM
 
-        # Order fuzzy-match occupations by the highest fuzzy match score
-        available_fuzz_codes = sorted(available_fuzz_codes,
-                                      key=lambda k: k.get("input_match_score"),
-                                      reverse=True)
-        available_fuzz_codes = [soc.get('soc_code') for soc in available_fuzz_codes]
+    def get_queryset(self):
+        """
+        Suggestions are served from an in-memory index rather than a queryset. Overwriting to prevent schema generation
+        warning.
+        """
+        pass
+
+    @swagger_auto_schema(manual_parameters=[PREFIX_PARAMETER, LIMIT_PARAMETER, OBS_LIMIT_PARAM])
+    def list(self, request):
+        """
+        Suggest occupations as the user types. Unlike the smart search, this does not query O*NET or fuzzy match, so it
+        is cheap enough to call on every keystroke.
+
+        Query parameters:
+        ------------------------
+        * q: Partially typed SOC title (from its start or from any word in it) or SOC code
+        * limit: Maximum number of suggestions; capped by MAX_LIMIT
+        * min_weighted_obs: Minimum number of observed transitions (weighted) for a suggestion to be included
 
-        # Return the fuzzy-matched occupations in best-worst score order and O*NET codes in their original order
-        smart_soc_codes = available_fuzz_codes + available_onet_codes
-        log.info(f'Combined SOC codes: {smart_soc_codes}')
+        Suggestions whose title or SOC code starts with q come first, then those with a later word in the title
+        starting with q. Within each group, occupations with more observed transitions rank higher.
+        """
+        self._set_params(request=request)
 
-        # Get actual metadata
-        smart_socs = [available_soc_codes.get(soc) for soc in smart_soc_codes]
+        suggestions = soc_prefix_index.get().suggest(prefix=self.keyword,
+                                                     limit=self.limit,
+                                                     min_obs=self.obs_limit)
 
-        return Response(smart_socs)
+        return Response(suggestions)
+
+
+class SocToolSearchViewSet(SocSearchParamsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for finding occupations by the tools, technology or tasks they involve
+    """
+    serializer_class = SocListSerializer
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [AnonRateThrottle]
+
+    KEYWORD_PARAMETER = openapi.Parameter("q",
+                                          openapi.IN_QUERY,
+                                          description="Tool, technology or task, e.g. forklift",
+                                          type=openapi.TYPE_STRING)
+    LIMIT_PARAMETER = SocAutocompleteViewSet.LIMIT_PARAMETER
+    OBS_LIMIT_PARAM = SocListSmartViewSet.OBS_LIMIT_PARAM
+
+    def get_queryset(self):
+        """
+        Results are ranked by the full-text index rather than read from a queryset. Overwriting to prevent schema
+        generation warning.
+        """
+        pass
+
+    @swagger_auto_schema(manual_parameters=[KEYWORD_PARAMETER, LIMIT_PARAMETER, OBS_LIMIT_PARAM])
+    def list(self, request):
+        """
+        Find occupations by the tools, technology and emerging tasks O*NET lists for them, e.g. "forklift" or
+        "spreadsheet software". Only occupations with transitions data are returned.
+
+        Query parameters:
+        ------------------------
+        * q: Tool, technology or task phrase. Every word must match; the last letters of a word may be left off.
+        * limit: Maximum number of occupations; capped by MAX_LIMIT
+        * min_weighted_obs: Minimum number of observed transitions (weighted) for an occupation to be included
+
+        Occupations are ordered by their best matching phrase. Each includes a relevance rank (higher is better) and
+        its best matching phrases.
+        """
+        self._set_params(request=request)
+
+        socs = OnetPhraseSearch().search(keyword=self.keyword,
+                                         min_obs=self.obs_limit,
+                                         limit=self.limit)
+
+        return Response(socs)
 
 
 class StateViewSet(viewsets.ReadOnlyModelViewSet):
@@ -265,6 +463,52 @@ class StateViewSet(viewsets.ReadOnlyModelViewSet):
     throttle_classes = [AnonRateThrottle]
 
 
+class AreaFilter(django_filters.FilterSet):
+    """
+    Create a filter to use with the Area model, e.g. for the metropolitan areas in a state:
+    /?area_type=4&state=25
+    """
+    state = django_filters.CharFilter(field_name="state_id")
+
+    class Meta:
+        model = Area
+        fields = ["area_type", "state"]
+
+
+class AreaViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for OES areas: the U.S., states and territories, metropolitan and nonmetropolitan areas
+    """
+    queryset = Area.objects.order_by("area_type", "area_title")
+    permission_classes = [permissions.AllowAny]
+    serializer_class = AreaSerializer
+    throttle_classes = [AnonRateThrottle]
+    filter_class = AreaFilter
+
+
+class IndustryFilter(django_filters.FilterSet):
+    """
+    Create a filter to use with the Industry model. When multiple options are chosen in these filters, there must be
+    no space between comma-separated values
+    """
+    naics_codes = NumberInFilter(field_name="naics_code", lookup_expr="in")
+
+    class Meta:
+        model = Industry
+        fields = ["naics_codes", "industry_group"]
+
+
+class IndustryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for the NAICS industries with industry-specific wage/employment data
+    """
+    queryset = Industry.objects.order_by("naics_code")
+    permission_classes = [permissions.AllowAny]
+    serializer_class = IndustrySerializer
+    throttle_classes = [AnonRateThrottle]
+    filter_class = IndustryFilter
+
+
 class OccupationTransitionsFilter(django_filters.FilterSet):
     """
     Create a filter to use with the OccupationTransitions model in the Occupation Transitions viewset
@@ -303,9 +547,6 @@ class BlsTransitionsViewSet(viewsets.ReadOnlyModelViewSet):
     throttle_classes = [AnonRateThrottle]
     # swagger_schema = None         # Exclude from swagger schema.
 
-    # Use a named tuple to pass data from multiple models to the response
-    BLS_TRANSITIONS = namedtuple("BlsTransitions", ("bls", "transitions"))
-
     DEFAULT_AREA = "U.S."
     DEFAULT_SOC = "35-3031"  # 35-3031 is waiters and waitresses
     DEFAULT_TRANSITION_PROBABILITY = 0.01
@@ -317,6 +558,11 @@ class BlsTransitionsViewSet(viewsets.ReadOnlyModelViewSet):
                                            openapi.IN_QUERY,
                                            description="Location",
                                            type=openapi.TYPE_STRING)
+    AREA_CODE_SWAGGER_PARAM = openapi.Parameter("area_code",
+                                                openapi.IN_QUERY,
+                                                description="Location, by OES area code (see /areas/); takes "
+                                                            "precedence over area_title",
+                                                type=openapi.TYPE_STRING)
     PI_SWAGGER_PARAM = openapi.Parameter("min_transition_probability",
                                          openapi.IN_QUERY,
                                          description="Minimum transition probability",
@@ -338,6 +584,7 @@ class BlsTransitionsViewSet(viewsets.ReadOnlyModelViewSet):
         :return: Relevant parameters from the request
         """
         area_title = request.query_params.get("area_title")
+        self.area_code_filter = request.query_params.get("area_code")
         source_soc = request.query_params.get("soc")
         min_transition_probability = request.query_params.get("min_transition_probability")
 
@@ -354,7 +601,8 @@ class BlsTransitionsViewSet(viewsets.ReadOnlyModelViewSet):
         else:
             self.min_transition_probability = min_transition_probability
 
-    @swagger_auto_schema(manual_parameters=[SOC_SWAGGER_PARAM, PI_SWAGGER_PARAM, AREA_SWAGGER_PARAM])
+    @swagger_auto_schema(manual_parameters=[SOC_SWAGGER_PARAM, PI_SWAGGER_PARAM, AREA_SWAGGER_PARAM,
+                                            AREA_CODE_SWAGGER_PARAM])
     def list(self, request):
         """
         Query parameters:
@@ -362,12 +610,15 @@ class BlsTransitionsViewSet(viewsets.ReadOnlyModelViewSet):
         * area_title: Specify an area_title to return wages/employment for that location only
         States should be fully spelled out, consistent with the area_title field in the
         BlsOes model. The default is specified by DEFAULT_AREA
+        * area_code: Specify an area by its OES area code instead (e.g. 14460 for the Boston MSA; see /areas/)
         * soc: Specify a source SOC code to return transitions data for people moving from this
         occupation to other occupations. The default is specified by DEFAULT_SOC
         * min_transition_probability: Specify the minimum transitions probability. Do not return any
         transitions records that have a probability of moving from SOC1 to SOC2 that is lower
         than this value.
         Multiple selections are not supported for this endpoint. The default response is displayed.
+        Wage percentiles are the 10th, 25th, 50th, 75th and 90th, null where BLS did not publish them (e.g. above
+        the top of the reported range).
         Sample endpoint query:
         ------------------------
         * /?area_title=Massachusetts&soc=11-1011&min_transitions_probability=0.01
@@ -382,7 +633,9 @@ class BlsTransitionsViewSet(viewsets.ReadOnlyModelViewSet):
             "source_soc_annual_mean_wage": 79520,
             "source_soc_total_employment": 1280700,
             "source_soc_soc_decimal_code": "13-2011.00",
-            "source_soc_file_year": 2019
+            "source_soc_file_year": 2019,
+            "source_soc_hourly_wage_percentiles": [22.6, 28.65, 35.48, 44.93, 56.84],
+            "source_soc_annual_wage_percentiles": [47020, 59590, 73800, 93450, 118230]
           },
         "transition_rows": [
             {
@@ -399,26 +652,27 @@ class BlsTransitionsViewSet(viewsets.ReadOnlyModelViewSet):
               "soc2_annual_mean_wage": 147530,
               "soc2_total_employment": 654790,
               "soc2_soc_decimal_code": "11-3031.00",
-              "soc2_file_year": 2019
+              "soc2_file_year": 2019,
+              "soc2_hourly_wage_percentiles": [34.22, 46.54, 62.45, 84.81, null],
+              "soc2_annual_wage_percentiles": [71170, 96790, 129890, 176410, null]
             },
         """
         self._set_params(request)
 
-        bls_transitions = self.BLS_TRANSITIONS(
-            bls=(BlsOes.objects
-                 .filter(area_title=self.area_title_filter)),
-            transitions=(OccupationTransitions.objects
-                         .filter(soc1=self.source_soc)
-                         .filter(pi__gte=self.min_transition_probability)
-                         ),
-        )
-
-        # Convert bls_transitions QuerySet to dicts & join the results
-        # List of dicts, each containing metadata on SOCs and transitions
-        bls = [model_to_dict(item)
-               for item in bls_transitions[0]]
         transitions = [model_to_dict(item, exclude=["occleaveshare", "total_soc"])
-                       for item in bls_transitions[1]]
+                       for item in (OccupationTransitions.objects
+                                    .filter(soc1=self.source_soc)
+                                    .filter(pi__gte=self.min_transition_probability))]
+
+        # Only the wages of the source and destination SOC codes are needed, so look them up by (area, soc) through
+        # the composite index rather than reading every row for the area
+        if self.area_code_filter:
+            area = {"area_code": self.area_code_filter}
+        else:
+            area = {"area_title": self.area_title_filter}
+        soc_codes = {self.source_soc} | {item.get("soc2") for item in transitions}
+        bls = [model_to_dict(item)
+               for item in BlsOes.objects.filter(**area, soc_code__in=soc_codes)]
 
         source_soc_info = [item
                            for item in bls
@@ -453,10 +707,100 @@ class BlsTransitionsViewSet(viewsets.ReadOnlyModelViewSet):
                 
                 transition.update(destination_metadata)
 
-        # Alternative for simple response that just lists the results from each model:
-        #   serializer = BlsTransitionsSerializer(bls_transitions)
-        #   return Response(serializer.data)
         return Response({
             "source_soc": source_soc_info,
             "transition_rows": transitions,
         })
+
+
+class WageTrendsViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for wage and employment trends: every loaded year of BLS OES data for a SOC code, and optionally for the
+    SOC codes it transitions to, in one area.
+    /wage-trends/{id}/ is not supported.
+    Sample endpoint query:
+    ------------------------
+    /?soc=35-3031&area_code=25&transitions=true&min_transition_probability=0.01
+    """
+    serializer_class = BlsOesHistorySerializer
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [AnonRateThrottle]
+
+    DEFAULT_AREA = BlsTransitionsViewSet.DEFAULT_AREA
+    DEFAULT_SOC = BlsTransitionsViewSet.DEFAULT_SOC
+    DEFAULT_TRANSITION_PROBABILITY = BlsTransitionsViewSet.DEFAULT_TRANSITION_PROBABILITY
+    TRANSITIONS_SWAGGER_PARAM = openapi.Parameter("transitions",
+                                                  openapi.IN_QUERY,
+                                                  description="Also return the trends of the SOC codes that the "
+                                                              "source SOC code transitions to",
+                                                  type=openapi.TYPE_BOOLEAN)
+
+    def get_queryset(self):
+        """
+        The trends are looked up in list. Overwriting to prevent schema generation warning.
+        """
+        pass
+
+    @swagger_auto_schema(manual_parameters=[BlsTransitionsViewSet.SOC_SWAGGER_PARAM,
+                                            BlsTransitionsViewSet.AREA_SWAGGER_PARAM,
+                                            BlsTransitionsViewSet.AREA_CODE_SWAGGER_PARAM,
+                                            TRANSITIONS_SWAGGER_PARAM,
+                                            BlsTransitionsViewSet.PI_SWAGGER_PARAM])
+    def list(self, request):
+        """
+        Query parameters:
+        ------------------------
+        * soc: Source SOC code. The default is specified by DEFAULT_SOC
+        * area_title or area_code: Location, as in /transitions-extended/. The default is specified by DEFAULT_AREA
+        * transitions: true to also return the trends of the SOC codes the source SOC code transitions to
+        * min_transition_probability: Only return destination SOC codes with at least this transition probability
+        Response format:
+        ------------------------
+        {"source_soc": {
+            "area_code": "99",
+            "area_title": "U.S.",
+            "soc_code": "35-3031",
+            "soc_title": "Waiters and Waitresses",
+            "years": [2017, 2018, 2019],
+            "hourly_mean_wages": [12.48, 12.87, 13.34],
+            "annual_mean_wages": [25960, 26770, 27750],
+            "total_employment": [2564610, 2582410, 2579020],
+            "pi": null
+          },
+        "transition_rows": [{..., "soc_code": "41-2031", ..., "pi": 0.0517}, ...]}
+
+        Series are oldest year first, with null where a year's value is not available. Destinations are ordered by
+        transition probability, highest first.
+        """
+        source_soc = request.query_params.get("soc") or self.DEFAULT_SOC
+        include_transitions = request.query_params.get("transitions", "").lower() in ("true", "1")
+        try:
+            min_transition_probability = float(request.query_params.get("min_transition_probability")
+                                               or self.DEFAULT_TRANSITION_PROBABILITY)
+        except ValueError:
+            raise ValidationError({"min_transition_probability": "Must be a number"})
+
+        if request.query_params.get("area_code"):
+            area = Q(area_code=request.query_params["area_code"])
+        else:
+            area = Q(area_title=request.query_params.get("area_title") or self.DEFAULT_AREA)
+
+        # One query: the destinations are a subquery, so every SOC code's series comes from one lookup through the
+        # (area, soc_code) index
+        transitions = OccupationTransitions.objects.filter(soc1=source_soc).exclude(soc2=source_soc)
+        socs = Q(soc_code=source_soc)
+        if include_transitions:
+            socs |= Q(soc_code__in=transitions.filter(pi__gte=min_transition_probability).values("soc2"))
+        history = (BlsOesHistory.objects
+                   .filter(area & socs)
+                   .annotate(pi=Subquery(transitions.filter(soc2=OuterRef("soc_code")).values("pi")[:1])))
+
+        series = self.get_serializer(history, many=True).data
+        source = [row for row in series if row["soc_code"] == source_soc]
+        destinations = sorted((row for row in series if row["soc_code"] != source_soc),
+                              key=lambda row: row["pi"],
+                              reverse=True)
+        return Response({
+            "source_soc": source[0] if source else {},
+            "transition_rows": destinations,
+        })
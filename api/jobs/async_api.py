@@ -0,0 +1,160 @@
+from django.db import close_old_connections
+from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import AnonRateThrottle
+from decouple import config
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any
+import asyncio
+import time
+import logging
+
+from .api import SocListSmartViewSet
+from .cache import OnetKeywordCache
+from .onet import parse_onet_soc_codes
+from .search import soc_title_corpus, combine_smart_search
+
+log = logging.getLogger()
+
+# Async views, served concurrently when the app runs under ASGI (see jobhopper/asgi.py). Under WSGI they still work,
+# but each request gets its own event loop.
+
+# O*NET requests run on a process-wide pool rather than the event loop's default executor, so a request that missed
+# its deadline keeps running in the background without holding up the response (or the shutdown of a per-request loop)
+onet_executor = ThreadPoolExecutor(max_workers=config("ONET_ASYNC_WORKERS", default=10, cast=int),
+                                   thread_name_prefix="onet")
+
+# Overall time budget for a smart search, in seconds. O*NET results that arrive later are left out of the response.
+SMART_SEARCH_DEADLINE = config("SMART_SEARCH_DEADLINE", default=1.5, cast=float)
+
+
+def json_response(data, status: int = 200) -> HttpResponse:
+    """
+    Render data the way the DRF views do (e.g. decimals as numbers rather than strings), so the async views answer
+    with the same bodies as their sync equivalents
+    """
+    renderer = JSONRenderer()
+    return HttpResponse(renderer.render(data), content_type=renderer.media_type, status=status)
+
+
+def fetch_onet_soc_codes(keyword: str, limit: int) -> List[str]:
+    """
+    Query O*NET for a keyword and cache the SOC codes it matches. Runs on onet_executor, so the result is cached even
+    if the search that asked for it stopped waiting, e.g. because O*NET missed the deadline: those slow keywords are
+    the ones the cache helps most.
+
+    :param keyword: Keyword that's requested (user search)
+    :param limit: Limit to number of results
+    :return: SOC codes in O*NET order, or [] if O*NET was unavailable
+    """
+    try:
+        onet_socs = SocListSmartViewSet.search_onet_keyword(keyword=keyword, limit=limit)
+        try:
+            onet_soc_codes = parse_onet_soc_codes(onet_socs)
+        except Exception as e:
+            log.info(f"Unable to find search results from O*NET for keyword {keyword} | {e}")
+            return []
+
+        try:
+            OnetKeywordCache().set(keyword=keyword, limit=limit, soc_codes=onet_soc_codes)
+        except Exception as e:
+            log.warning(f"Unable to cache O*NET results for keyword {keyword} | {e}")
+        return onet_soc_codes
+    finally:
+        # The pool's threads outlive requests, so release their database connections as a request would
+        close_old_connections()
+
+
+async def search_onet_soc_codes(keyword: str, limit: int) -> List[str]:
+    """
+    Async version of SocListSmartViewSet.search_onet_soc_codes. The cache read runs on the thread that owns the
+    request's database connection. The O*NET request and cache write run on onet_executor (see fetch_onet_soc_codes),
+    so they do not block the event loop, and they finish even if this coroutine is cancelled.
+
+    :param keyword: Keyword that's requested (user search)
+    :param limit: Limit to number of results
+    :return: SOC codes in O*NET order, or [] if O*NET was unavailable
+    """
+    onet_cache = OnetKeywordCache()
+    onet_soc_codes = await sync_to_async(onet_cache.get, thread_sensitive=True)(keyword=keyword, limit=limit)
+    if onet_soc_codes is not None:
+        return onet_soc_codes
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(onet_executor, partial(fetch_onet_soc_codes, keyword=keyword, limit=limit))
+
+
+async def smart_search(keyword: str,
+                       onet_limit: int,
+                       min_obs: float,
+                       deadline: float) -> List[Dict[str, Any]]:
+    """
+    Run the smart search with the O*NET lookup overlapping the local corpus fetch and fuzzy scoring
+
+    :param keyword: Keyword that's requested (user search)
+    :param onet_limit: Limit to the number of results pulled back from O*NET
+    :param min_obs: Minimum (weighted) observed transitions from the source SOC
+    :param deadline: Seconds allowed for the whole search. If O*NET has not answered by then, only the fuzzy matches
+        are returned.
+    :return: SOC records, fuzzy matches first, then O*NET matches, as in SocListSmartViewSet.list
+    """
+    started = time.monotonic()
+    onet_task = asyncio.ensure_future(search_onet_soc_codes(keyword=keyword, limit=onet_limit))
+
+    try:
+        fuzzy_source, score_cutoff = await sync_to_async(SocListSmartViewSet.fuzzy_search, thread_sensitive=True)()
+        # Scoring the in-memory corpus is CPU-bound and can run on any thread; trigram matching queries the database
+        fuzz_matches = await sync_to_async(fuzzy_source.match, thread_sensitive=fuzzy_source.USES_DATABASE)(
+            keyword=keyword,
+            min_obs=min_obs,
+            score_cutoff=score_cutoff)
+    except BaseException:
+        onet_task.cancel()
+        raise
+
+    # Shielded, so that missing the deadline stops the wait but not the lookup, whose result is still cached
+    remaining = max(deadline - (time.monotonic() - started), 0)
+    try:
+        onet_soc_codes = await asyncio.wait_for(asyncio.shield(onet_task), timeout=remaining)
+    except asyncio.TimeoutError:
+        log.info(f"O*NET missed the {deadline}s smart search deadline for keyword {keyword}; returning fuzzy matches")
+        onet_soc_codes = []
+
+    return await sync_to_async(combine_smart_search, thread_sensitive=fuzzy_source.USES_DATABASE)(
+        source=fuzzy_source,
+        keyword=keyword,
+        min_obs=min_obs,
+        fuzz_matches=fuzz_matches,
+        onet_soc_codes=onet_soc_codes)
+
+
+async def soc_smart_list(request):
+    """
+    Async equivalent of /soc-smart-list/ (SocListSmartViewSet.list), with the same query parameters and response.
+
+    The O*NET lookup runs concurrently with fuzzy matching, and the whole search is bounded by
+    SMART_SEARCH_DEADLINE seconds. If O*NET misses the deadline, the fuzzy matches are returned on their own, so
+    latency is bounded by the slowest source that is still useful rather than by the sum of all of them.
+    """
+    throttle = AnonRateThrottle()
+    if not await sync_to_async(throttle.allow_request, thread_sensitive=True)(request, None):
+        return json_response({"detail": "Request was throttled."}, status=429)
+
+    try:
+        params = SocListSmartViewSet.parse_params(request.GET)
+    except ValidationError as e:
+        return json_response(e.detail, status=400)
+
+    if not params.keyword:
+        corpus = await sync_to_async(soc_title_corpus.get, thread_sensitive=True)()
+        return json_response(corpus.available(min_obs=params.obs_limit))
+
+    smart_socs = await smart_search(keyword=params.keyword,
+                                    onet_limit=params.limit,
+                                    min_obs=params.obs_limit,
+                                    deadline=SMART_SEARCH_DEADLINE)
+
+    return json_response(smart_socs)
@@ -0,0 +1,116 @@
+from collections import Counter
+from django.core.cache import caches
+from typing import List, Optional
+import hashlib
+import logging
+import os
+import threading
+
+log = logging.getLogger()
+
+
+class OnetKeywordCache(object):
+    """
+    Cache of O*NET keyword searches, shared across workers through the Django cache configured as "onet" in settings.
+
+    Entries map a normalized keyword to the list of SOC codes O*NET returned for it, along with the limit used for the
+    request. The cache backend is bounded (MAX_ENTRIES) and entries expire after TIMEOUT seconds. A cached result that
+    was requested with a larger limit can answer requests for a smaller limit, since O*NET returns results in rank
+    order: the first n results of a search with end=50 are the results of the same search with end=n.
+
+    Hits and misses are counted per process, in memory. Counting them in the cache would add a write to every lookup,
+    which is a database round trip with the database backend, and its incr is a get then a set, so concurrent workers
+    would lose counts.
+    """
+    CACHE_ALIAS = "onet"
+    KEY_PREFIX = "onet:keyword"
+
+    # Hit and miss counts of this process, by cache alias
+    _counts = Counter()
+    _counts_lock = threading.Lock()
+
+    def __init__(self, alias: str = CACHE_ALIAS):
+        self.alias = alias
+        self.cache = caches[alias]
+
+    @staticmethod
+    def normalize_keyword(keyword: str) -> str:
+        """
+        Normalize a keyword so that "Nurse", "nurse " and "NURSE" share a cache entry
+
+        :param keyword: Keyword that's requested (user search)
+        :return: Lowercased keyword with whitespace collapsed
+        """
+        return " ".join(keyword.lower().split())
+
+    def _key(self, keyword: str) -> str:
+        """
+        Hash the normalized keyword so that user input is always a valid cache key, regardless of the backend
+        """
+        digest = hashlib.sha1(self.normalize_keyword(keyword).encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{digest}"
+
+    def _increment(self, counter: str):
+        """
+        Count a hit or miss for this process (see stats)
+        """
+        with self._counts_lock:
+            self._counts[(self.alias, counter)] += 1
+
+    def get(self, keyword: str, limit: int) -> Optional[List[str]]:
+        """
+        Look up the SOC codes for a keyword
+
+        :param keyword: Keyword that's requested (user search)
+        :param limit: Limit to the number of O*NET results
+        :return: SOC codes in O*NET order, or None if the keyword/limit pair is not cached
+        """
+        entry = self.cache.get(self._key(keyword))
+
+        # A result with fewer codes than its limit is the complete result set for the keyword
+        if entry and (entry["limit"] >= limit or len(entry["soc_codes"]) < entry["limit"]):
+            self._increment("hits")
+            return entry["soc_codes"][:limit]
+
+        self._increment("misses")
+        return None
+
+    def set(self, keyword: str, limit: int, soc_codes: List[str]):
+        """
+        Cache the SOC codes for a keyword. An existing entry with a larger limit is kept, since it answers more
+        requests.
+
+        :param keyword: Keyword that's requested (user search)
+        :param limit: Limit to the number of O*NET results used for the request
+        :param soc_codes: SOC codes parsed from the O*NET response, in O*NET order
+        """
+        key = self._key(keyword)
+        entry = self.cache.get(key)
+        if entry and entry["limit"] > limit:
+            return
+
+        self.cache.set(key, {"limit": limit, "soc_codes": list(soc_codes)})
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters of this worker process since it started (or since reset_stats)
+        """
+        with self._counts_lock:
+            hits = self._counts[(self.alias, "hits")]
+            misses = self._counts[(self.alias, "misses")]
+        lookups = hits + misses
+
+        return {
+            "pid": os.getpid(),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
+
+    def reset_stats(self):
+        """
+        Reset this process's hit/miss counters
+        """
+        with self._counts_lock:
+            self._counts[(self.alias, "hits")] = 0
+            self._counts[(self.alias, "misses")] = 0
@@ -0,0 +1,191 @@
+from asgiref.sync import sync_to_async
+from collections import deque
+from decouple import config
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from rest_framework.exceptions import ValidationError
+from typing import Callable, Dict, Any
+import asyncio
+import json
+import time
+import logging
+
+from .api import SocListSmartViewSet
+from . import async_api
+from .async_api import search_onet_soc_codes
+from .search import combine_smart_search
+
+log = logging.getLogger()
+
+
+def database_sync_to_async(func: Callable) -> Callable:
+    """
+    sync_to_async for ORM work. Connections that are broken or older than CONN_MAX_AGE are closed before and after
+    the work, as Django does around each HTTP request; a socket can stay open for hours, so its queries would otherwise
+    keep using the same connection.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=True)
+
+
+class SocSearchConsumer(object):
+    """
+    ASGI WebSocket handler for search-as-you-type over the smart search (see jobhopper/asgi.py for routing).
+
+    The client sends one JSON message per query, e.g. {"id": 3, "keyword_search": "nur", "onet_limit": 10,
+    "min_weighted_obs": 1000}. For each query the server sends up to two messages, each echoing the query's id:
+
+    * {"id": 3, "stage": "local", "results": [...]}: fuzzy matches from the transitions data
+    * {"id": 3, "stage": "onet", "results": [...]}: the full smart search response, including O*NET matches. Sent
+      once O*NET answers (or misses the smart search deadline, in which case the results match the local stage).
+
+    A connection runs one query at a time. A new query cancels the outstanding one, so its results are never sent and
+    the server stops working on it as soon as possible. Its O*NET lookup still finishes, so that the result is cached.
+
+    Like the AnonRateThrottle of the HTTP views, each connection is rate limited: queries beyond RATE_LIMIT in
+    RATE_PERIOD seconds are answered with an error rather than searched.
+    """
+    # Longest keyword accepted; longer queries are rejected rather than scored
+    MAX_KEYWORD_LENGTH = 200
+    # Queries accepted per connection in each RATE_PERIOD seconds. Typing sends a query per keystroke.
+    RATE_LIMIT = config("SOC_SEARCH_SOCKET_RATE_LIMIT", default=10, cast=int)
+    RATE_PERIOD = 1.0
+
+    def __init__(self, scope, receive, send):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.search_task = None
+        self.query_times = deque()
+
+    async def run(self):
+        """
+        Handle the connection until the client disconnects
+        """
+        while True:
+            message = await self.receive()
+
+            if message["type"] == "websocket.connect":
+                await self.send({"type": "websocket.accept"})
+            elif message["type"] == "websocket.receive":
+                await self.handle_query(message.get("text") or (message.get("bytes") or b"").decode("utf-8"))
+            elif message["type"] == "websocket.disconnect":
+                self.cancel_search()
+                return
+
+    def cancel_search(self):
+        if self.search_task is not None and not self.search_task.done():
+            self.search_task.cancel()
+        self.search_task = None
+
+    def throttled(self) -> bool:
+        """
+        Whether a new query would exceed the connection's rate limit. Queries that are not throttled are counted.
+        """
+        now = time.monotonic()
+        while self.query_times and self.query_times[0] <= now - self.RATE_PERIOD:
+            self.query_times.popleft()
+        if len(self.query_times) >= self.RATE_LIMIT:
+            return True
+        self.query_times.append(now)
+        return False
+
+    async def send_json(self, content: Dict[str, Any]):
+        await self.send({"type": "websocket.send", "text": json.dumps(content, cls=DjangoJSONEncoder)})
+
+    async def handle_query(self, text: str):
+        """
+        Cancel the outstanding query, validate the new one and start searching for it. A throttled query leaves the
+        outstanding one running.
+        """
+        try:
+            query = json.loads(text)
+            if not isinstance(query, dict):
+                raise ValueError("Expected a JSON object")
+        except ValueError as e:
+            await self.send_json({"error": f"Invalid query: {e}"})
+            return
+
+        if self.throttled():
+            await self.send_json({"id": query.get("id"), "error": "Query was throttled."})
+            return
+
+        self.cancel_search()
+
+        try:
+            params = SocListSmartViewSet.parse_params(query)
+        except ValidationError as e:
+            await self.send_json({"id": query.get("id"), "error": e.detail})
+            return
+
+        if len(params.keyword) > self.MAX_KEYWORD_LENGTH:
+            await self.send_json({"id": query.get("id"), "error": "Keyword is too long"})
+            return
+
+        self.search_task = asyncio.ensure_future(self.search(query_id=query.get("id"),
+                                                             keyword=params.keyword,
+                                                             onet_limit=params.limit,
+                                                             min_obs=params.obs_limit))
+
+    async def search(self,
+                     query_id: Any,
+                     keyword: str,
+                     onet_limit: int,
+                     min_obs: float):
+        """
+        Stream local matches for a query, then the O*NET-enriched results. Runs as a task that is cancelled when a
+        newer query arrives. The O*NET lookup is shielded from that cancellation, and from the deadline, so that its
+        result still reaches the O*NET cache.
+        """
+        if not keyword:
+            await self.send_json({"id": query_id, "stage": "onet", "results": []})
+            return
+
+        started = time.monotonic()
+        onet_task = asyncio.ensure_future(search_onet_soc_codes(keyword=keyword, limit=onet_limit))
+        try:
+            fuzzy_source, score_cutoff = await database_sync_to_async(SocListSmartViewSet.fuzzy_search)()
+            # Scoring the in-memory corpus is CPU-bound and can run on any thread; trigram matching queries the database
+            if fuzzy_source.USES_DATABASE:
+                match = database_sync_to_async(fuzzy_source.match)
+                combine = database_sync_to_async(combine_smart_search)
+            else:
+                match = sync_to_async(fuzzy_source.match, thread_sensitive=False)
+                combine = sync_to_async(combine_smart_search, thread_sensitive=False)
+
+            fuzz_matches = await match(keyword=keyword,
+                                       min_obs=min_obs,
+                                       score_cutoff=score_cutoff)
+
+            local_socs = await combine(source=fuzzy_source,
+                                       keyword=keyword,
+                                       min_obs=min_obs,
+                                       fuzz_matches=fuzz_matches,
+                                       onet_soc_codes=[])
+            await self.send_json({"id": query_id, "stage": "local", "results": local_socs})
+
+            remaining = max(async_api.SMART_SEARCH_DEADLINE - (time.monotonic() - started), 0)
+            try:
+                onet_soc_codes = await asyncio.wait_for(asyncio.shield(onet_task), timeout=remaining)
+            except asyncio.TimeoutError:
+                log.info(f"O*NET missed the smart search deadline for keyword {keyword}; streaming local matches only")
+                onet_soc_codes = []
+
+            smart_socs = await combine(source=fuzzy_source,
+                                       keyword=keyword,
+                                       min_obs=min_obs,
+                                       fuzz_matches=fuzz_matches,
+                                       onet_soc_codes=onet_soc_codes)
+            await self.send_json({"id": query_id, "stage": "onet", "results": smart_socs})
+        except asyncio.CancelledError:
+            # CancelledError is an Exception on Python 3.7; let it through so that superseded queries stop quietly
+            raise
+        except Exception as e:
+            log.warning(f"Smart search failed for keyword {keyword} | {e}")
+            await self.send_json({"id": query_id, "error": "Search failed"})
@@ -0,0 +1,85 @@
+from django.db import models
+from typing import List, Optional
+import math
+import struct
+
+# Percentiles held by a WagePercentilesField, in order
+WAGE_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class PackedArrayField(models.BinaryField):
+    """
+    Array of numbers packed into bytes as little-endian values of one struct format character, e.g. "f" for 32-bit
+    floats or "h" for 16-bit integers. Floats are NaN where a value is missing. Arrays are stored in one column on
+    every database, so they are read along with the rest of the row.
+
+    Values are lists of numbers, with None for missing values. Floats are rounded to decimals places if given, and
+    decimals=0 reads them as integers.
+    """
+
+    def __init__(self, *args, element_format: str = "f", decimals: Optional[int] = None, **kwargs):
+        self.element_format = element_format
+        self.decimals = decimals
+        # Editable, unlike other binary fields, so that it is included in model_to_dict
+        kwargs.setdefault("editable", True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.editable:
+            del kwargs["editable"]
+        else:
+            kwargs["editable"] = False
+        if self.element_format != "f":
+            kwargs["element_format"] = self.element_format
+        if self.decimals is not None:
+            kwargs["decimals"] = self.decimals
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection) -> Optional[List]:
+        if value is None:
+            return None
+        value = bytes(value)
+        length = len(value) // struct.calcsize(f"<{self.element_format}")
+        return [self._element(element) for element in struct.unpack(f"<{length}{self.element_format}", value)]
+
+    def _element(self, value):
+        if not isinstance(value, float):
+            return value
+        if math.isnan(value):
+            return None
+        if self.decimals == 0:
+            return int(round(value))
+        return value if self.decimals is None else round(value, self.decimals)
+
+    def to_python(self, value):
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        return super().to_python(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, (list, tuple)):
+            value = struct.pack(f"<{len(value)}{self.element_format}",
+                                *(math.nan if element is None else element for element in value))
+        return super().get_prep_value(value)
+
+
+class WagePercentilesField(PackedArrayField):
+    """
+    Wages at the WAGE_PERCENTILES percentiles as a fixed-width array of 32-bit floats (packed by
+    data.bls.utils.wage_percentiles), read as a list of wages in dollars and cents with None where BLS did not publish
+    a percentile
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, element_format="f", decimals=2, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs["decimals"]
+        return name, path, args, kwargs
+
+    def get_prep_value(self, value):
+        if isinstance(value, (list, tuple)) and len(value) != len(WAGE_PERCENTILES):
+            raise ValueError(f"Expected {len(WAGE_PERCENTILES)} wage percentiles, got {len(value)}")
+        return super().get_prep_value(value)
@@ -0,0 +1,210 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from pathlib import Path
+from typing import List
+import logging
+
+from data.instrumentation import load_report, measure_stage
+from data.pipeline import Stage, StageFailed, select_stages, run_stages
+from data.bls.oes_data_downloader import cache_multi_year_oes
+from data.scripts.onet_loader import ONET_DIR, load_onet_tables, read_onet_occupation_phrases
+from data.scripts.sql_loader import (
+    create_sqlalchemyengine,
+    load_bls_oes_to_sql,
+    load_bls_oes_industries_to_sql,
+    load_occupation_transitions_to_sql,
+)
+from jobs.models import DataLoadStage, OnetOccupationPhrase
+from jobs.search import OnetPhraseSearch
+
+log = logging.getLogger()
+
+TRANSITIONS_FILE = Path(ONET_DIR).parent / "occupation_transitions_public_data_set.csv"
+
+
+def sqlalchemy_engine(django_connection):
+    """
+    SQLAlchemy engine for the database behind a Django connection, for the pandas-based loaders. The loaders
+    bulk-load and swap tables with Postgres features (COPY, to_regclass, lock_timeout), so other databases are
+    rejected up front rather than failing partway through a load.
+    """
+    if django_connection.vendor != "postgresql":
+        raise CommandError(f"load_data loads into Postgres, but the {django_connection.alias} database is "
+                           f"{django_connection.vendor}")
+    settings = django_connection.settings_dict
+    return create_sqlalchemyengine(username=settings["USER"],
+                                   password=settings["PASSWORD"],
+                                   host=settings["HOST"],
+                                   port=settings["PORT"],
+                                   db=settings["NAME"])
+
+
+def build_stages(engine, start_year: int, end_year: int, incremental: bool, industries: bool = False) -> List[Stage]:
+    """
+    Data loading stages, in dependency order. Stages without dependencies between them run in parallel.
+
+    :param industries: Also load the industry-specific (NAICS) estimates, which are most of each OES workbook
+    """
+    def download_oes():
+        # Downloads, cleans and caches each year, so the oes stage reads the cache
+        cache_multi_year_oes(start_year=start_year, end_year=end_year)
+
+    def load_oes():
+        load_bls_oes_to_sql(start_year=start_year,
+                            end_year=end_year,
+                            table_name="jobs_blsoes",
+                            soc_table_name="jobs_socdescription",
+                            area_table_name="jobs_area",
+                            history_table_name="jobs_blsoeshistory",
+                            transitions_file_path=TRANSITIONS_FILE,
+                            incremental=incremental,
+                            engine=engine)
+
+    def load_transitions():
+        # Both tables are released whole, with total_transition_obs filled in, so the API never reads a partial load
+        load_occupation_transitions_to_sql(TRANSITIONS_FILE,
+                                           table_name="occupation_transition",
+                                           model_table_name="jobs_occupationtransitions",
+                                           incremental=incremental,
+                                           engine=engine)
+
+    def load_onet():
+        load_onet_tables(engine)
+
+    def load_onet_phrases():
+        phrases = read_onet_occupation_phrases()
+        with transaction.atomic():
+            OnetOccupationPhrase.objects.all().delete()
+            OnetOccupationPhrase.objects.bulk_create(
+                (OnetOccupationPhrase(**record) for record in phrases.to_dict("records")),
+                batch_size=5000)
+        # The SQLite full-text table is a snapshot of the phrases, so rebuild it. The Postgres index is maintained
+        # along with the table.
+        if connection.vendor == "sqlite":
+            OnetPhraseSearch.drop_index(connection)
+            OnetPhraseSearch.build_index(connection)
+
+    def load_oes_industries():
+        load_bls_oes_industries_to_sql(start_year=start_year,
+                                       end_year=end_year,
+                                       table_name="jobs_blsoesindustry",
+                                       industry_table_name="jobs_industry",
+                                       engine=engine)
+
+    stages = [
+        Stage("oes_download", download_oes, ()),
+        Stage("transitions", load_transitions, ()),
+        Stage("onet", load_onet, ()),
+        Stage("onet_phrases", load_onet_phrases, ()),
+        Stage("oes", load_oes, ("oes_download",)),
+    ]
+    if industries:
+        # After oes_download, so the workbooks are downloaded once
+        stages.append(Stage("oes_industries", load_oes_industries, ("oes_download",)))
+    return stages
+
+
+def _instrumented(stage: Stage):
+    """
+    Measure a stage as a whole (see data.instrumentation), alongside the steps within it, and close the thread's
+    Django connections once it is done, since each stage runs in its own thread
+    """
+    def run_and_close():
+        try:
+            with measure_stage(stage.name):
+                stage.run()
+        finally:
+            connections.close_all()
+    return run_and_close
+
+
+class Command(BaseCommand):
+    help = ("Load the source data (BLS OES, occupation transitions, O*NET) into the database. Stages that completed "
+            "in an earlier run are skipped, so an interrupted load resumes where it stopped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("stages", nargs="*",
+                            help="Stages to run, along with the stages they depend on. Defaults to every stage.")
+        parser.add_argument("--skip", nargs="+", default=[], metavar="STAGE",
+                            help="Stages to skip, treating them as complete")
+        parser.add_argument("--force", action="store_true",
+                            help="Run the selected stages even if they completed before, along with the stages "
+                                 "that depend on them")
+        parser.add_argument("--incremental", action="store_true",
+                            help="Apply only changed rows to the BLS and transitions tables, rather than replacing "
+                                 "them")
+        parser.add_argument("--start-year", type=int, default=2017, help="First year of OES data")
+        parser.add_argument("--end-year", type=int, default=2019, help="Last year of OES data")
+        parser.add_argument("--with-industries", action="store_true",
+                            help="Also load the industry-specific (NAICS) OES estimates")
+        parser.add_argument("--workers", type=int, default=4, help="Stages to run at a time")
+        parser.add_argument("--list", action="store_true", help="List the stages and whether they are complete")
+
+    def get_stages(self, options) -> List[Stage]:
+        engine = sqlalchemy_engine(connection)
+        return build_stages(engine,
+                            start_year=options["start_year"],
+                            end_year=options["end_year"],
+                            incremental=options["incremental"],
+                            industries=options["with_industries"])
+
+    def handle(self, *args, **options):
+        stages = self.get_stages(options)
+        completed = {stage.name: stage.completed_at for stage in DataLoadStage.objects.all()}
+
+        if options["list"]:
+            for stage in stages:
+                status = f"completed {completed[stage.name]:%Y-%m-%d %H:%M}" if stage.name in completed else "pending"
+                depends_on = f" (after {', '.join(stage.depends_on)})" if stage.depends_on else ""
+                self.stdout.write(f"{stage.name}{depends_on}: {status}")
+            return
+
+        try:
+            selected = select_stages(stages, options["stages"] or None)
+            select_stages(stages, options["skip"])
+        except ValueError as e:
+            raise CommandError(e)
+
+        if options["force"]:
+            # Stages that depend on the forced ones would otherwise keep data derived from the old release
+            rerun = {stage.name for stage in selected} | self._dependents(stages, {stage.name for stage in selected})
+            DataLoadStage.objects.filter(name__in=rerun).delete()
+            selected = select_stages(stages, rerun)
+            done = {stage.name for stage in selected if stage.name in completed and stage.name not in rerun}
+        else:
+            done = {stage.name for stage in selected if stage.name in completed}
+        done |= set(options["skip"])
+
+        if done >= {stage.name for stage in selected}:
+            self.stdout.write("All selected stages are complete; use --force to run them again")
+            return
+
+        def record(name: str, seconds: float):
+            DataLoadStage.objects.update_or_create(name=name,
+                                                   defaults={"completed_at": timezone.now(), "seconds": seconds})
+
+        try:
+            with load_report("load_data"):
+                ran = run_stages([stage._replace(run=_instrumented(stage)) for stage in selected],
+                                 done=done,
+                                 on_complete=record,
+                                 max_workers=options["workers"])
+        except StageFailed as e:
+            raise CommandError(f"{e}. Run load_data again to resume.")
+        self.stdout.write(self.style.SUCCESS(f"Completed stages: {', '.join(ran)}"))
+
+    @staticmethod
+    def _dependents(stages: List[Stage], names: set) -> set:
+        """
+        Stages that depend, directly or not, on the named stages
+        """
+        dependents = set()
+        changed = True
+        while changed:
+            changed = False
+            for stage in stages:
+                if stage.name not in dependents and set(stage.depends_on) & (names | dependents):
+                    dependents.add(stage.name)
+                    changed = True
+        return dependents
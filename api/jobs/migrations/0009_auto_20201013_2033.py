@@ -1,5 +1,7 @@
 # Generated by Django 3.1 on 2020-10-14 00:33
-from django.db import migrations, models, connection
+from django.conf import settings
+from django.db import migrations, models
+from data.scripts.bulk_copy import OCCUPATION_TRANSITION_COLUMNS
 from data.scripts.sql_loader import (
     load_occupation_transitions_to_sql,
 )
@@ -19,12 +21,15 @@ class Migration(migrations.Migration):
     ]
 
     def forwards_source_data(apps, schema_editor):
-        with connection.schema_editor() as my_schema_editor:
-            log.info(f"0009 show db {my_schema_editor.connection.alias}")
+        if not settings.LOAD_DATA_IN_MIGRATIONS:
+            # The data is loaded by `manage.py load_data`; the operations below only need the table to exist
+            log.info("0009 Creating an empty occupation_transition table; load it with manage.py load_data")
+            columns = ", ".join(f'"{name}" {column_type}' for name, column_type in OCCUPATION_TRANSITION_COLUMNS.items())
+            schema_editor.execute(f"CREATE TABLE IF NOT EXISTS occupation_transition ({columns})")
+            return
+
         log.info("0009 Processing data from csv; This will take a few minutes.")
-        conn_info = str(schema_editor.connection.__dict__["connection"])
-        log.info(f"0009 Connection Info: {conn_info}")
-        db_name = conn_info.split("dbname=")[1].split(" ")[0]
+        db_name = schema_editor.connection.settings_dict["NAME"]
         log.info(f"0009 DB Name: {db_name}")
 
         load_occupation_transitions_to_sql(
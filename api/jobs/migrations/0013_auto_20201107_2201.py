@@ -1,5 +1,6 @@
 # Generated by Django 3.1 on 2020-10-24 21:45
 
+from django.conf import settings
 from django.db import migrations, models, connection
 from data.scripts.sql_loader import load_bls_oes_to_sql
 
@@ -17,10 +18,11 @@ class Migration(migrations.Migration):
     ]
 
     def forwards_source_data(apps, schema_editor):
-        conn_info = str(schema_editor.connection.__dict__["connection"])
-        log.info(f"0013 Connection info: {conn_info}")
+        if not settings.LOAD_DATA_IN_MIGRATIONS:
+            log.info("0013 Skipping the data load; run manage.py load_data")
+            return
 
-        db_name = conn_info.split("dbname=")[1].split(" ")[0]
+        db_name = schema_editor.connection.settings_dict["NAME"]
         log.info(f"0013 DB name: {db_name}")
 
         load_bls_oes_to_sql(
@@ -0,0 +1,37 @@
+# Generated by Django 3.1 on 2026-10-19
+
+from django.db import migrations
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Index SOC titles and codes for pg_trgm similarity search (see jobs.search.TrigramSocSearch). pg_trgm is a Postgres
+    extension, so other databases (e.g. SQLite) skip this and fuzzy matching falls back to the in-memory corpus.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    schema_editor.execute("CREATE INDEX IF NOT EXISTS jobs_socdescription_soc_title_trgm "
+                          "ON jobs_socdescription USING gin (soc_title gin_trgm_ops);")
+    schema_editor.execute("CREATE INDEX IF NOT EXISTS jobs_socdescription_soc_code_trgm "
+                          "ON jobs_socdescription USING gin (soc_code gin_trgm_ops);")
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS jobs_socdescription_soc_title_trgm;")
+    schema_editor.execute("DROP INDEX IF EXISTS jobs_socdescription_soc_code_trgm;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_socdescription_fill_total_transition_obs'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.1 on 2026-10-19
+
+from django.conf import settings
+from django.db import migrations, models
+from data.scripts.onet_loader import read_onet_occupation_phrases
+
+import logging
+
+log = logging.getLogger()
+
+
+def load_onet_phrases(apps, schema_editor):
+    """
+    Load O*NET tool and emerging task phrases from the dumps in data/onet (if LOAD_DATA_IN_MIGRATIONS; otherwise
+    manage.py load_data does), then build the full-text index over them (see jobs.search.OnetPhraseSearch)
+    """
+    from jobs.search import OnetPhraseSearch
+
+    if settings.LOAD_DATA_IN_MIGRATIONS:
+        OnetOccupationPhrase = apps.get_model("jobs", "OnetOccupationPhrase")
+        db_alias = schema_editor.connection.alias
+
+        phrases = read_onet_occupation_phrases()
+        OnetOccupationPhrase.objects.using(db_alias).bulk_create(
+            (OnetOccupationPhrase(**record) for record in phrases.to_dict("records")),
+            batch_size=5000)
+        log.info(f"0017 Loaded {len(phrases)} O*NET occupation phrases")
+    else:
+        log.info("0017 Skipping the O*NET phrases; run manage.py load_data")
+
+    OnetPhraseSearch.build_index(schema_editor.connection)
+
+
+def drop_onet_phrases(apps, schema_editor):
+    from jobs.search import OnetPhraseSearch
+
+    OnetPhraseSearch.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_socdescription_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OnetOccupationPhrase',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('soc_code', models.CharField(db_index=True, max_length=10)),
+                ('onet_soc_code', models.CharField(max_length=10)),
+                ('phrase', models.CharField(max_length=255)),
+                ('category', models.CharField(blank=True, default='', max_length=255)),
+                ('source', models.CharField(max_length=20)),
+            ],
+        ),
+        migrations.RunPython(load_onet_phrases, drop_onet_phrases),
+    ]
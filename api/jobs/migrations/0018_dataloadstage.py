@@ -0,0 +1,22 @@
+# Generated by Django 3.1 on 2026-10-19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_onetoccupationphrase'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataLoadStage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('completed_at', models.DateTimeField()),
+                ('seconds', models.FloatField(null=True)),
+            ],
+        ),
+    ]
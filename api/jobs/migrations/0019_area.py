@@ -0,0 +1,45 @@
+# Generated by Django 3.1 on 2026-10-19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_dataloadstage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blsoes',
+            name='area_code',
+            field=models.CharField(max_length=7, null=True),
+        ),
+        migrations.AddField(
+            model_name='blsoes',
+            name='area_type',
+            field=models.SmallIntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='blsoes',
+            index=models.Index(fields=['area_code', 'soc_code'], name='jobs_blsoes_area_code_soc'),
+        ),
+        migrations.AddIndex(
+            model_name='blsoes',
+            index=models.Index(fields=['area_title', 'soc_code'], name='jobs_blsoes_area_title_soc'),
+        ),
+        migrations.CreateModel(
+            name='Area',
+            fields=[
+                ('area_code', models.CharField(max_length=7, primary_key=True, serialize=False)),
+                ('area_title', models.CharField(max_length=255)),
+                ('area_type', models.SmallIntegerField(choices=[(1, 'U.S.'), (2, 'State'), (3, 'U.S. territory'), (4, 'Metropolitan statistical area'), (6, 'Nonmetropolitan area')])),
+                ('state', models.ForeignKey(blank=True, db_column='state_code', db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='areas', to='jobs.area')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='area',
+            index=models.Index(fields=['area_type', 'state'], name='jobs_area_type_state'),
+        ),
+    ]
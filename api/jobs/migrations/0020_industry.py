@@ -0,0 +1,43 @@
+# Generated by Django 3.1 on 2026-10-19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_area'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Industry',
+            fields=[
+                ('naics_code', models.IntegerField(primary_key=True, serialize=False)),
+                ('naics_title', models.CharField(max_length=255)),
+                ('industry_group', models.CharField(blank=True, default='', max_length=50)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BlsOesIndustry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('soc', models.IntegerField()),
+                ('hourly_mean_wage', models.FloatField(null=True)),
+                ('annual_mean_wage', models.FloatField(null=True)),
+                ('total_employment', models.BigIntegerField(null=True)),
+                ('file_year', models.SmallIntegerField()),
+                ('area', models.ForeignKey(db_column='area_code', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='industry_estimates', to='jobs.area')),
+                ('industry', models.ForeignKey(db_column='naics_code', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='estimates', to='jobs.industry')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='blsoesindustry',
+            index=models.Index(fields=['industry', 'soc', 'area'], name='jobs_oesindustry_naics_soc'),
+        ),
+        migrations.AddIndex(
+            model_name='blsoesindustry',
+            index=models.Index(fields=['soc', 'industry'], name='jobs_oesindustry_soc_naics'),
+        ),
+    ]
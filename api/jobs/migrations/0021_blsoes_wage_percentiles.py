@@ -0,0 +1,24 @@
+# Generated by Django 3.1 on 2026-10-19
+
+from django.db import migrations
+import jobs.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0020_industry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blsoes',
+            name='annual_wage_percentiles',
+            field=jobs.fields.WagePercentilesField(null=True),
+        ),
+        migrations.AddField(
+            model_name='blsoes',
+            name='hourly_wage_percentiles',
+            field=jobs.fields.WagePercentilesField(null=True),
+        ),
+    ]
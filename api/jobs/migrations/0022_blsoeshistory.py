@@ -0,0 +1,36 @@
+# Generated by Django 3.1 on 2026-10-19
+
+from django.db import migrations, models
+import jobs.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0021_blsoes_wage_percentiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlsOesHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('area_code', models.CharField(max_length=7)),
+                ('area_title', models.CharField(max_length=255)),
+                ('soc_code', models.CharField(max_length=10)),
+                ('soc_title', models.CharField(max_length=255)),
+                ('years', jobs.fields.PackedArrayField(element_format='h')),
+                ('hourly_mean_wages', jobs.fields.PackedArrayField(decimals=2)),
+                ('annual_mean_wages', jobs.fields.PackedArrayField(decimals=2)),
+                ('total_employment', jobs.fields.PackedArrayField(decimals=0, element_format='d')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='blsoeshistory',
+            index=models.Index(fields=['area_code', 'soc_code'], name='jobs_blsoeshistory_area_soc'),
+        ),
+        migrations.AddIndex(
+            model_name='blsoeshistory',
+            index=models.Index(fields=['area_title', 'soc_code'], name='jobs_blsoeshistory_title_soc'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .fields import PackedArrayField, WagePercentilesField
+
 # Create your models here.
 class JobClass(models.Model):
     jobcode = models.IntegerField(default=0)
@@ -40,9 +42,14 @@ class BlsOesFakes(models.Model):
     soc_decimal_code = models.CharField(max_length=200)
 
 
+# Wages and employment by area and SOC code. Rows are loaded in (area_code, soc_code) order, and looked up through the
+# composite indexes, so a lookup for an area and SOC codes costs the same however many areas (e.g. MSAs) are loaded.
+# The wage distribution of each row is a fixed-width array of percentiles (see WagePercentilesField).
 class BlsOes(models.Model):
     id = models.AutoField(auto_created=True, primary_key=True, serialize=False)
     area_title = models.CharField(max_length=255, null=True)
+    area_code = models.CharField(max_length=7, null=True)
+    area_type = models.SmallIntegerField(null=True)
     soc_code = models.CharField(max_length=10, null=True)
     soc_title = models.CharField(max_length=255, null=True)
     hourly_mean_wage = models.DecimalField(decimal_places=2, max_digits=10, null=True)
@@ -50,6 +57,95 @@ class BlsOes(models.Model):
     total_employment = models.BigIntegerField(null=True)
     soc_decimal_code = models.CharField(max_length=10, null=True)
     file_year = models.IntegerField(null=True)
+    hourly_wage_percentiles = WagePercentilesField(null=True)
+    annual_wage_percentiles = WagePercentilesField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["area_code", "soc_code"], name="jobs_blsoes_area_code_soc"),
+            models.Index(fields=["area_title", "soc_code"], name="jobs_blsoes_area_title_soc"),
+        ]
+
+
+# Every loaded year of wages and employment for an area and SOC code, as arrays aligned with years (oldest first). One
+# row per (area, SOC code) rather than per year, so a trend for several SOC codes is one lookup through the composite
+# indexes. Titles are from the latest year.
+class BlsOesHistory(models.Model):
+    id = models.AutoField(auto_created=True, primary_key=True, serialize=False)
+    area_code = models.CharField(max_length=7)
+    area_title = models.CharField(max_length=255)
+    soc_code = models.CharField(max_length=10)
+    soc_title = models.CharField(max_length=255)
+    years = PackedArrayField(element_format="h")
+    hourly_mean_wages = PackedArrayField(element_format="f", decimals=2)
+    annual_mean_wages = PackedArrayField(element_format="f", decimals=2)
+    total_employment = PackedArrayField(element_format="d", decimals=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["area_code", "soc_code"], name="jobs_blsoeshistory_area_soc"),
+            models.Index(fields=["area_title", "soc_code"], name="jobs_blsoeshistory_title_soc"),
+        ]
+
+
+# OES areas: the U.S., states and territories, metropolitan (MSA) and nonmetropolitan areas. Metropolitan and
+# nonmetropolitan areas belong to a (primary) state. Loaded with BlsOes, so there is no database constraint on state.
+class Area(models.Model):
+    US = 1
+    STATE = 2
+    TERRITORY = 3
+    METROPOLITAN = 4
+    NONMETROPOLITAN = 6
+    AREA_TYPES = [
+        (US, "U.S."),
+        (STATE, "State"),
+        (TERRITORY, "U.S. territory"),
+        (METROPOLITAN, "Metropolitan statistical area"),
+        (NONMETROPOLITAN, "Nonmetropolitan area"),
+    ]
+
+    area_code = models.CharField(max_length=7, primary_key=True)
+    area_title = models.CharField(max_length=255)
+    area_type = models.SmallIntegerField(choices=AREA_TYPES)
+    state = models.ForeignKey("self",
+                              null=True,
+                              blank=True,
+                              db_column="state_code",
+                              db_constraint=False,
+                              on_delete=models.DO_NOTHING,
+                              related_name="areas")
+
+    class Meta:
+        indexes = [models.Index(fields=["area_type", "state"], name="jobs_area_type_state")]
+
+
+# NAICS industries of the industry-specific OES estimates
+class Industry(models.Model):
+    naics_code = models.IntegerField(primary_key=True)
+    naics_title = models.CharField(max_length=255)
+    industry_group = models.CharField(max_length=50, blank=True, default="")
+
+
+# Wages and employment by area, NAICS industry and SOC code. There are many more of these rows than BlsOes rows, so
+# the keys are integers (SOC 11-1011 is 111011) and rows are looked up through the composite indexes. Loaded with the
+# industries and areas, so there are no database constraints on them.
+class BlsOesIndustry(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    area = models.ForeignKey(Area, db_column="area_code", db_constraint=False, on_delete=models.DO_NOTHING,
+                             related_name="industry_estimates")
+    industry = models.ForeignKey(Industry, db_column="naics_code", db_constraint=False, on_delete=models.DO_NOTHING,
+                                 related_name="estimates")
+    soc = models.IntegerField()
+    hourly_mean_wage = models.FloatField(null=True)
+    annual_mean_wage = models.FloatField(null=True)
+    total_employment = models.BigIntegerField(null=True)
+    file_year = models.SmallIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["industry", "soc", "area"], name="jobs_oesindustry_naics_soc"),
+            models.Index(fields=["soc", "industry"], name="jobs_oesindustry_soc_naics"),
+        ]
 
 
 class SocDescription(models.Model):
@@ -62,3 +158,20 @@ class SocDescription(models.Model):
 class StateAbbPairs(models.Model):
     state_name = models.CharField(max_length=100)
     abbreviation = models.CharField(max_length=2, primary_key=True)
+
+
+# Tool, technology and emerging task phrases from the O*NET dumps in data/onet, for full-text search
+class OnetOccupationPhrase(models.Model):
+    id = models.AutoField(auto_created=True, primary_key=True, serialize=False)
+    soc_code = models.CharField(max_length=10, db_index=True)
+    onet_soc_code = models.CharField(max_length=10)
+    phrase = models.CharField(max_length=255)
+    category = models.CharField(max_length=255, default="", blank=True)
+    source = models.CharField(max_length=20)
+
+
+# Data loading stages completed by `manage.py load_data`, so that an interrupted load resumes where it stopped
+class DataLoadStage(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    completed_at = models.DateTimeField()
+    seconds = models.FloatField(null=True)
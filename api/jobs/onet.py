@@ -0,0 +1,227 @@
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+from decouple import config
+from typing import Dict, Any, List, Optional
+import threading
+import time
+import logging
+
+log = logging.getLogger()
+
+
+class CircuitBreakerOpen(Exception):
+    """
+    Raised instead of sending a request while the circuit breaker is open
+    """
+    pass
+
+
+class CircuitBreaker(object):
+    """
+    Stop calling a failing service for a while, rather than making every request wait out a timeout.
+
+    * closed: requests are sent; consecutive failures are counted
+    * open: after failure_threshold consecutive failures, requests are refused until reset_timeout seconds pass
+    * half-open: after reset_timeout, one trial request is sent. Success closes the breaker, failure re-opens it.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        """
+        :param failure_threshold: Consecutive failures before the breaker opens
+        :param reset_timeout: Seconds to wait while open before allowing a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent. Only one trial request is allowed through while half-open.
+        """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                if self.state == self.CLOSED:
+                    log.warning(f"Circuit breaker opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class OnetClient(object):
+    """
+    Client for the O*NET Web Services API (https://services.onetcenter.org/reference/).
+
+    Requests go through one pooled Session, so keep-alive connections (and their TLS handshakes) are reused across
+    requests. Every request has connect and read deadlines, so a slow O*NET cannot hold a worker indefinitely, and a
+    circuit breaker stops sending requests while O*NET is failing.
+    """
+    DEFAULT_BASE_URL = "https://services.onetcenter.org/ws/"
+
+    def __init__(self,
+                 username: str,
+                 password: str,
+                 base_url: str = DEFAULT_BASE_URL,
+                 connect_timeout: float = 1.0,
+                 read_timeout: float = 2.0,
+                 max_retries: int = 1,
+                 pool_maxsize: int = 10,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        """
+        :param username: O*NET Web Services username
+        :param password: O*NET Web Services password
+        :param base_url: API root; point this at a local stub server for testing
+        :param connect_timeout: Seconds to wait for a connection to O*NET
+        :param read_timeout: Seconds to wait between bytes of the response
+        :param max_retries: Retries for connection errors and 502/503/504 responses
+        :param pool_maxsize: Connections kept alive to O*NET (one per concurrent request in the worker)
+        :param circuit_breaker: Circuit breaker shared by the client's requests
+        """
+        self.base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.timeout = (connect_timeout, read_timeout)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+        retry = Retry(total=max_retries,
+                      connect=max_retries,
+                      read=0,
+                      backoff_factor=0.1,
+                      status_forcelist=[502, 503, 504],
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(username, password)
+        self.session.headers.update({"Accept": "application/json"})
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self,
+            path: str,
+            params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        GET an O*NET endpoint through the circuit breaker
+
+        :param path: Endpoint path relative to the API root, e.g. "mnm/search"
+        :param params: Query parameters
+        :return: JSON response
+        :raises CircuitBreakerOpen: if the breaker is open and the request was not sent
+        :raises requests.RequestException: if the request timed out, failed to connect or returned an error status
+        :raises ValueError: if the response is not JSON
+        """
+        if not self.circuit_breaker.allow_request():
+            raise CircuitBreakerOpen(f"O*NET circuit breaker is {self.circuit_breaker.state}; skipping {path}")
+
+        try:
+            response = self.session.get(f"{self.base_url}{path}",
+                                        params=params,
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            result = response.json()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            self.circuit_breaker.record_failure()
+            raise e
+        except requests.HTTPError as e:
+            # Client errors (e.g. bad credentials) do not mean O*NET is unavailable
+            if e.response is not None and e.response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            raise e
+        except Exception:
+            # Anything else, e.g. a truncated or non-JSON body, also counts as a failure, so that a half-open trial
+            # request always settles the breaker
+            self.circuit_breaker.record_failure()
+            raise
+
+        self.circuit_breaker.record_success()
+        return result
+
+    def search_keyword(self,
+                       keyword: str,
+                       limit: int = 20) -> Dict[str, Any]:
+        """
+        Search My Next Move occupations for a keyword
+
+        :param keyword: Keyword that's requested (user search)
+        :param limit: Limit to number of results
+        :return: JSON response, e.g. {'keyword': 'doctor', ...
+                                     'career': [{'href': '',
+                                               'code': '29-1216.00',
+                                               'title': 'General Internal Medicine Physicians',
+                                               'tags': {'bright_outlook': ...},
+                                     ...]}
+        """
+        return self.get("mnm/search", params={"keyword": keyword, "end": limit})
+
+
+def parse_onet_soc_codes(response: Dict[str, Any]) -> List[str]:
+    """
+    Parse SOC codes from an O*NET keyword search response, dropping the O*NET detail suffix (29-1216.00 -> 29-1216)
+
+    :param response: JSON response from OnetClient.search_keyword
+    :return: SOC codes in O*NET's order
+    :raises TypeError/AttributeError: if the response is missing or has no career list
+    """
+    onet_soc_codes = response.get("career")
+    onet_soc_codes = [soc.get("code", "") for soc in onet_soc_codes]
+    return [soc.split(".")[0] for soc in onet_soc_codes]
+
+
+_onet_client = None
+_onet_client_lock = threading.Lock()
+
+
+def get_onet_client() -> OnetClient:
+    """
+    Get the worker's O*NET client, creating it from environment settings on first use. Sharing one client per
+    process shares its connection pool and circuit breaker across requests.
+    """
+    global _onet_client
+    with _onet_client_lock:
+        if _onet_client is None:
+            _onet_client = OnetClient(
+                username=config("ONET_USERNAME"),
+                password=config("ONET_PASSWORD"),
+                base_url=config("ONET_BASE_URL", default=OnetClient.DEFAULT_BASE_URL),
+                connect_timeout=config("ONET_CONNECT_TIMEOUT", default=1.0, cast=float),
+                read_timeout=config("ONET_READ_TIMEOUT", default=2.0, cast=float),
+                circuit_breaker=CircuitBreaker(
+                    failure_threshold=config("ONET_BREAKER_FAILURES", default=5, cast=int),
+                    reset_timeout=config("ONET_BREAKER_RESET_SECONDS", default=30.0, cast=float)),
+            )
+    return _onet_client
@@ -0,0 +1,507 @@
+from django.db import connection, transaction
+from django.db.models import Count, Max, Sum, Q
+from rapidfuzz import fuzz, process
+from typing import List, Dict, Any, Tuple
+import numpy as np
+import bisect
+import heapq
+import os
+import re
+import threading
+import time
+import logging
+
+from .models import SocDescription, OnetOccupationPhrase
+
+log = logging.getLogger()
+
+
+def load_soc_descriptions() -> List[Dict[str, Any]]:
+    """
+    All SocDescription records as dicts, in database order
+    """
+    return list(SocDescription
+                .objects
+                .order_by("id")
+                .values("id", "soc_code", "soc_title", "total_transition_obs"))
+
+
+class SocTitleCorpus(object):
+    """
+    Precomputed search corpus over the SocDescription model.
+
+    The lowercased "<soc_title><soc_code>" strings used for fuzzy matching are built once per data version, and a
+    keyword is scored against all of them in one batched rapidfuzz call instead of one fuzz.partial_ratio call per row.
+    """
+    USES_DATABASE = False
+
+    # Scoring is spread across cores once the corpus is large enough for thread start-up to pay for itself
+    PARALLEL_THRESHOLD = 5000
+    CPU_COUNT = os.cpu_count() or 1
+
+    def __init__(self, socs: List[Dict[str, Any]]):
+        """
+        :param socs: SocDescription records, e.g. [{'id': 1, 'soc_code': '13-2011', 'soc_title': 'Accountants...',
+            'total_transition_obs': Decimal('390865.60000')}, ...]
+        """
+        self.socs = socs
+        self.soc_codes = {soc.get("soc_code"): index for index, soc in enumerate(socs)}
+        self.choices = [(soc.get("soc_title") or "").lower() + (soc.get("soc_code") or "") for soc in socs]
+        self.total_transition_obs = np.array([float(soc["total_transition_obs"])
+                                              if soc.get("total_transition_obs") is not None else np.nan
+                                              for soc in socs],
+                                             dtype=np.float64)
+
+    @classmethod
+    def from_database(cls) -> "SocTitleCorpus":
+        socs = load_soc_descriptions()
+        log.info(f"Built SOC title corpus with {len(socs)} occupations")
+        return cls(socs)
+
+    def _obs_mask(self, min_obs: float) -> np.ndarray:
+        # NaN observations compare False, matching the total_transition_obs__gte filter in SQL
+        with np.errstate(invalid="ignore"):
+            return self.total_transition_obs >= float(min_obs)
+
+    def available(self, min_obs: float) -> List[Dict[str, Any]]:
+        """
+        SOC records with at least min_obs (weighted) observed transitions, in database order
+
+        :param min_obs: Minimum (weighted) observed transitions from the source SOC
+        :return: Copies of the SOC records, safe for the caller to modify
+        """
+        return [dict(self.socs[index]) for index in np.flatnonzero(self._obs_mask(min_obs))]
+
+    def lookup(self, soc_codes: List[str], min_obs: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Copies of the SOC records for the given SOC codes that have at least min_obs (weighted) observed transitions
+        """
+        min_obs = float(min_obs)
+        return {soc_code: dict(self.socs[self.soc_codes[soc_code]])
+                for soc_code in soc_codes
+                if soc_code in self.soc_codes and self.total_transition_obs[self.soc_codes[soc_code]] >= min_obs}
+
+    def match(self,
+              keyword: str,
+              min_obs: float,
+              score_cutoff: float) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find SOCs whose lowercased title + code closely match the keyword (fuzz.partial_ratio)
+
+        :param keyword: Keyword that's requested (user search)
+        :param min_obs: Minimum (weighted) observed transitions from the source SOC
+        :param score_cutoff: Minimum fuzz.partial_ratio score
+        :return: (SOC record copy, score) pairs from best to worst score; ties keep database order
+        """
+        if not self.choices:
+            return []
+
+        # A single-query cdist reuses the preprocessed keyword for every row, which is fastest on one core. On a large
+        # corpus with cores to spare, scoring the corpus against the keyword lets rapidfuzz split the rows across
+        # workers instead. partial_ratio always slides the shorter string, so the scores are the same either way.
+        if len(self.choices) >= self.PARALLEL_THRESHOLD and self.CPU_COUNT > 2:
+            scores = process.cdist(self.choices,
+                                   [keyword.lower()],
+                                   scorer=fuzz.partial_ratio,
+                                   score_cutoff=score_cutoff,
+                                   dtype=np.float32,
+                                   workers=-1)[:, 0]
+        else:
+            scores = process.cdist([keyword.lower()],
+                                   self.choices,
+                                   scorer=fuzz.partial_ratio,
+                                   score_cutoff=score_cutoff,
+                                   dtype=np.float32)[0]
+
+        matches = np.flatnonzero((scores >= score_cutoff) & self._obs_mask(min_obs))
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+
+        return [(dict(self.socs[index]), float(scores[index])) for index in matches]
+
+
+class TrigramSocSearch(object):
+    """
+    Fuzzy SOC title matching inside Postgres, using the pg_trgm GIN indexes on jobs_socdescription.soc_title and
+    soc_code (migration 0016). Only the matching rows leave the database, so the cost of a search does not grow with
+    the number of occupations the way scoring every row in Python does.
+
+    Scores are pg_trgm word similarity between the keyword and the title (or similarity to the SOC code), scaled to
+    0-100 like fuzz.partial_ratio. They are not directly comparable to partial_ratio scores, so use a lower cutoff.
+    Only available on Postgres; see fuzzy_search_source for the fallback.
+    """
+    USES_DATABASE = True
+    MAX_MATCHES = 100
+
+    # <% and % are pg_trgm's word-similarity and similarity operators, which can use the GIN trigram indexes.
+    # Literal % signs are doubled because the query has parameters.
+    MATCH_SQL = """
+        SELECT id, soc_code, soc_title, total_transition_obs,
+               GREATEST(word_similarity(%s, soc_title), similarity(%s, soc_code)) AS score
+        FROM jobs_socdescription
+        WHERE (%s <%% soc_title OR %s %% soc_code)
+          AND total_transition_obs >= %s
+        ORDER BY score DESC, id
+        LIMIT %s
+    """
+
+    def match(self,
+              keyword: str,
+              min_obs: float,
+              score_cutoff: float) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find SOCs whose title or code is similar to the keyword
+
+        :param keyword: Keyword that's requested (user search)
+        :param min_obs: Minimum (weighted) observed transitions from the source SOC
+        :param score_cutoff: Minimum similarity, from 0-100
+        :return: (SOC record, score) pairs from best to worst score
+        """
+        threshold = str(score_cutoff / 100)
+        with transaction.atomic(), connection.cursor() as cursor:
+            # The <% and % operators compare against these settings rather than taking a threshold argument. They are
+            # set for this transaction only, so they do not leak into other queries on the pooled connection.
+            cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true), "
+                           "set_config('pg_trgm.similarity_threshold', %s, true)",
+                           [threshold, threshold])
+            cursor.execute(self.MATCH_SQL, [keyword, keyword, keyword, keyword, min_obs, self.MAX_MATCHES])
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        return [(row, round(float(row.pop("score")) * 100, 2)) for row in rows]
+
+    @staticmethod
+    def lookup(soc_codes: List[str], min_obs: float) -> Dict[str, Dict[str, Any]]:
+        """
+        SOC records for the given SOC codes that have at least min_obs (weighted) observed transitions
+        """
+        socs = (SocDescription
+                .objects
+                .filter(soc_code__in=set(soc_codes), total_transition_obs__gte=min_obs)
+                .values("id", "soc_code", "soc_title", "total_transition_obs"))
+        return {soc.get("soc_code"): soc for soc in socs}
+
+
+def fuzzy_search_source(backend: str):
+    """
+    Get the fuzzy matching implementation for a backend name
+
+    :param backend: "trigram" to match in Postgres with pg_trgm, or "corpus" to score the in-memory SocTitleCorpus.
+        The trigram backend falls back to the corpus on other databases (e.g. SQLite).
+    :return: TrigramSocSearch or SocTitleCorpus; both provide match() and lookup()
+    """
+    if backend == "trigram":
+        if connection.vendor == "postgresql":
+            return TrigramSocSearch()
+        log.warning(f"Trigram search requires Postgres; falling back to the SOC title corpus on {connection.vendor}")
+    return soc_title_corpus.get()
+
+
+def match_score(keyword: str, soc_entry: Dict[str, Any]) -> float:
+    """
+    fuzz.partial_ratio score between a keyword and a SOC record's lowercased title + code
+    """
+    return fuzz.partial_ratio(keyword.lower(),
+                              (soc_entry.get("soc_title") or "").lower() + (soc_entry.get("soc_code") or ""))
+
+
+def combine_smart_search(source,
+                         keyword: str,
+                         min_obs: float,
+                         fuzz_matches: List[Tuple[Dict[str, Any], float]],
+                         onet_soc_codes: List[str]) -> List[Dict[str, Any]]:
+    """
+    Combine fuzzy title matches and O*NET matches into the smart search response. Fuzzy-matched occupations come first
+    in best-worst score order, then O*NET occupations that have transitions data, in O*NET's order.
+
+    :param source: SocTitleCorpus or TrigramSocSearch used for the fuzzy matches
+    :param keyword: Keyword that's requested (user search)
+    :param min_obs: Minimum (weighted) observed transitions from the source SOC
+    :param fuzz_matches: Result of source.match for the keyword
+    :param onet_soc_codes: SOC codes O*NET matched to the keyword
+    :return: SOC records with their input_match_score
+    """
+    fuzz_socs = {soc_entry.get("soc_code"): (soc_entry, score) for soc_entry, score in fuzz_matches}
+    log.info(f"SOC codes/titles that are a close exact match to the keyword search {list(fuzz_socs)}")
+
+    # SOC codes in both O*NET and transitions data, + SOC codes whose title closely matches the search parameter
+    onet_socs = source.lookup(onet_soc_codes, min_obs) if onet_soc_codes else {}
+    available_onet_codes = [soc for soc in onet_soc_codes if soc in onet_socs]
+    available_fuzz_codes = [soc for soc in fuzz_socs if soc not in onet_soc_codes]
+
+    smart_soc_codes = available_fuzz_codes + available_onet_codes
+    log.info(f"Combined SOC codes: {smart_soc_codes}")
+
+    smart_socs = []
+    for soc in smart_soc_codes:
+        if soc in fuzz_socs:
+            soc_entry, score = fuzz_socs[soc]
+        else:
+            soc_entry = onet_socs[soc]
+            score = match_score(keyword, soc_entry)
+        smart_socs.append(dict(soc_entry, input_match_score=score))
+
+    return smart_socs
+
+
+class SocPrefixIndex(object):
+    """
+    In-memory prefix index over SOC titles and codes for occupation autocomplete.
+
+    Every SOC is indexed under its SOC code (with and without the dash), its lowercased title, and the remainder of its
+    title from each later word onwards ("nurses" and "practical nurses" for "Licensed Practical Nurses"). The keys are
+    kept in one sorted list, so the keys starting with a prefix are a contiguous range found with two binary searches.
+    """
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+    # Match kinds, best first: the title or code starts with the prefix, or a later word in the title does
+    LEADING_MATCH = 0
+    WORD_MATCH = 1
+
+    def __init__(self, socs: List[Dict[str, Any]]):
+        """
+        :param socs: SocDescription records, e.g. [{'id': 1, 'soc_code': '13-2011', 'soc_title': 'Accountants...',
+            'total_transition_obs': Decimal('390865.60000')}, ...]
+        """
+        self.socs = socs
+        self.total_transition_obs = [float(soc["total_transition_obs"])
+                                     if soc.get("total_transition_obs") is not None else float("-inf")
+                                     for soc in socs]
+
+        entries = set()
+        for index, soc in enumerate(socs):
+            soc_code = (soc.get("soc_code") or "").lower()
+            title = self.normalize(soc.get("soc_title") or "")
+            for key in (soc_code, soc_code.replace("-", ""), title):
+                if key:
+                    entries.add((key, self.LEADING_MATCH, index))
+
+            # Title from each later word onwards, so multi-word prefixes like "practical nu" also match mid-title
+            for word in list(self.TOKEN_PATTERN.finditer(title))[1:]:
+                entries.add((title[word.start():], self.WORD_MATCH, index))
+
+        entries = sorted(entries)
+        self.keys = [key for key, kind, index in entries]
+        self.entries = [(kind, index) for key, kind, index in entries]
+
+    @classmethod
+    def from_database(cls) -> "SocPrefixIndex":
+        socs = load_soc_descriptions()
+        log.info(f"Built SOC prefix index with {len(socs)} occupations")
+        return cls(socs)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def suggest(self,
+                prefix: str,
+                limit: int = 10,
+                min_obs: float = None) -> List[Dict[str, Any]]:
+        """
+        Suggest SOCs for a partially typed title or SOC code
+
+        :param prefix: Text typed so far
+        :param limit: Maximum number of suggestions
+        :param min_obs: Minimum (weighted) observed transitions from the source SOC
+        :return: Copies of SOC records. Title/code prefix matches come before mid-title word matches, and each group is
+            ordered by total_transition_obs, most observed first.
+        """
+        prefix = self.normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+
+        start = bisect.bisect_left(self.keys, prefix)
+        # Every key starting with the prefix sorts before the prefix followed by the highest code point
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo=start)
+
+        best_kind = {}
+        for kind, index in self.entries[start:end]:
+            if kind < best_kind.get(index, self.WORD_MATCH + 1):
+                best_kind[index] = kind
+
+        if min_obs is not None:
+            min_obs = float(min_obs)
+            best_kind = {index: kind for index, kind in best_kind.items()
+                         if self.total_transition_obs[index] >= min_obs}
+
+        ranked = heapq.nsmallest(limit,
+                                 best_kind.items(),
+                                 key=lambda item: (item[1], -self.total_transition_obs[item[0]], item[0]))
+
+        return [dict(self.socs[index]) for index, kind in ranked]
+
+
+class OnetPhraseSearch(object):
+    """
+    Full-text search for occupations by the tools, technology and emerging tasks O*NET associates with them
+    (OnetOccupationPhrase), e.g. "forklift" or "spreadsheet software".
+
+    Phrases are matched through a full-text index built by build_index (migration 0017): a GIN index on the English
+    tsvector of each phrase and its category on Postgres, or an FTS5 table with Porter stemming on SQLite. Other
+    databases fall back to unindexed substring matching. Every term in the keyword must match, and the last word of
+    each term may be partially typed.
+    """
+    TERM_PATTERN = re.compile(r"[^\W_]+")
+    MAX_TERMS = 8
+    # Phrase matches read from the index per search, before they are grouped by occupation
+    MAX_PHRASE_MATCHES = 1000
+    MAX_PHRASES_PER_SOC = 5
+
+    POSTGRES_INDEX = "jobs_onetoccupationphrase_search_gin"
+    SQLITE_FTS_TABLE = "jobs_onetoccupationphrase_fts"
+
+    # Postgres only uses the GIN index if the query repeats the indexed expression exactly
+    POSTGRES_DOCUMENT = "to_tsvector('english', phrase || ' ' || category)"
+
+    POSTGRES_MATCH_SQL = f"""
+        SELECT p.soc_code, p.phrase, ts_rank({POSTGRES_DOCUMENT}, q.query) AS rank
+        FROM jobs_onetoccupationphrase p
+        CROSS JOIN to_tsquery('english', %s) AS q(query)
+        WHERE {POSTGRES_DOCUMENT} @@ q.query
+          AND p.soc_code IN (SELECT soc_code FROM jobs_socdescription WHERE total_transition_obs >= %s)
+        ORDER BY rank DESC, p.id
+        LIMIT %s
+    """
+
+    # bm25() is lower for better matches. The SOC filter is a subquery rather than a join so that SQLite evaluates it
+    # once, instead of scanning jobs_socdescription (which has no index on soc_code) for every matching phrase.
+    SQLITE_MATCH_SQL = f"""
+        SELECT p.soc_code, p.phrase, -bm25({SQLITE_FTS_TABLE}) AS rank
+        FROM {SQLITE_FTS_TABLE}
+        JOIN jobs_onetoccupationphrase p ON p.id = {SQLITE_FTS_TABLE}.rowid
+        WHERE {SQLITE_FTS_TABLE} MATCH %s
+          AND p.soc_code IN (SELECT soc_code FROM jobs_socdescription WHERE total_transition_obs >= %s)
+        ORDER BY rank DESC, p.id
+        LIMIT %s
+    """
+
+    @classmethod
+    def build_index(cls, conn):
+        """
+        Build the full-text index for the database's vendor. On SQLite, the FTS5 table is a snapshot of
+        jobs_onetoccupationphrase, so rebuild it after reloading the phrases.
+
+        :param conn: Django database connection
+        """
+        with conn.cursor() as cursor:
+            if conn.vendor == "postgresql":
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {cls.POSTGRES_INDEX} "
+                               f"ON jobs_onetoccupationphrase USING gin ({cls.POSTGRES_DOCUMENT});")
+            elif conn.vendor == "sqlite":
+                cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.SQLITE_FTS_TABLE} "
+                               f"USING fts5(phrase, category, content='jobs_onetoccupationphrase', "
+                               f"content_rowid='id', tokenize='porter unicode61');")
+                cursor.execute(f"INSERT INTO {cls.SQLITE_FTS_TABLE}({cls.SQLITE_FTS_TABLE}) VALUES ('rebuild');")
+
+    @classmethod
+    def drop_index(cls, conn):
+        with conn.cursor() as cursor:
+            if conn.vendor == "postgresql":
+                cursor.execute(f"DROP INDEX IF EXISTS {cls.POSTGRES_INDEX};")
+            elif conn.vendor == "sqlite":
+                cursor.execute(f"DROP TABLE IF EXISTS {cls.SQLITE_FTS_TABLE};")
+
+    def _match_phrases(self,
+                       terms: List[str],
+                       min_obs: float) -> List[Tuple[str, str, float]]:
+        """
+        (soc_code, phrase, rank) for phrases matching every term, best first
+        """
+        if connection.vendor == "postgresql":
+            # Terms only contain letters and digits, so they cannot inject tsquery operators
+            sql, query = self.POSTGRES_MATCH_SQL, " & ".join(f"{term}:*" for term in terms)
+        elif connection.vendor == "sqlite":
+            sql, query = self.SQLITE_MATCH_SQL, " ".join(f'"{term}"*' for term in terms)
+        else:
+            phrases = OnetOccupationPhrase.objects.filter(
+                soc_code__in=SocDescription.objects.filter(total_transition_obs__gte=min_obs).values("soc_code"))
+            for term in terms:
+                phrases = phrases.filter(Q(phrase__icontains=term) | Q(category__icontains=term))
+            return [(soc_code, phrase, 1.0) for soc_code, phrase
+                    in phrases.order_by("id").values_list("soc_code", "phrase")[:self.MAX_PHRASE_MATCHES]]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [query, min_obs, self.MAX_PHRASE_MATCHES])
+            return cursor.fetchall()
+
+    def search(self,
+               keyword: str,
+               min_obs: float,
+               limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find occupations with tool, technology or task phrases matching the keyword
+
+        :param keyword: Keyword that's requested (user search)
+        :param min_obs: Minimum (weighted) observed transitions from the source SOC
+        :param limit: Maximum number of occupations
+        :return: SOC records ordered by their best matching phrase, each with its rank (higher is better; only
+            comparable within one response) and up to MAX_PHRASES_PER_SOC matching phrases, best first, e.g.
+            [{'id': 1, 'soc_code': '53-7051', 'soc_title': 'Industrial Truck and Tractor Operators',
+            'total_transition_obs': Decimal('...'), 'rank': 0.0608, 'matches': ['Forklifts', ...]}, ...]
+        """
+        terms = self.TERM_PATTERN.findall(keyword.lower())[:self.MAX_TERMS]
+        if not terms or limit <= 0:
+            return []
+
+        ranks, matches = {}, {}
+        for soc_code, phrase, rank in self._match_phrases(terms=terms, min_obs=min_obs):
+            if soc_code not in ranks:
+                if len(ranks) == limit:
+                    continue
+                ranks[soc_code] = float(rank)
+                matches[soc_code] = []
+            if len(matches[soc_code]) < self.MAX_PHRASES_PER_SOC and phrase not in matches[soc_code]:
+                matches[soc_code].append(phrase)
+
+        socs = TrigramSocSearch.lookup(soc_codes=list(ranks), min_obs=min_obs)
+        return [dict(socs[soc_code], rank=round(rank, 4), matches=matches[soc_code])
+                for soc_code, rank in ranks.items() if soc_code in socs]
+
+
+class SocCorpusCache(object):
+    """
+    Per-process cache of a structure built from the SocDescription model, rebuilt when the data changes.
+
+    The data version (row count, max id and total observations) is checked at most every VERSION_CHECK_SECONDS, so
+    most requests do not touch the database at all.
+    """
+    VERSION_CHECK_SECONDS = 60
+
+    def __init__(self, builder):
+        """
+        :param builder: Callable that builds the cached structure from the database
+        """
+        self.builder = builder
+        self.value = None
+        self.version = None
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def data_version() -> tuple:
+        version = SocDescription.objects.aggregate(rows=Count("id"),
+                                                   max_id=Max("id"),
+                                                   total_obs=Sum("total_transition_obs"))
+        return version["rows"], version["max_id"], version["total_obs"]
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.checked_at is None or now - self.checked_at >= self.VERSION_CHECK_SECONDS:
+                version = self.data_version()
+                if version != self.version or self.value is None:
+                    self.value = self.builder()
+                    self.version = version
+                self.checked_at = now
+
+            return self.value
+
+    def clear(self):
+        with self._lock:
+            self.value = None
+            self.version = None
+            self.checked_at = None
+
+
+soc_title_corpus = SocCorpusCache(SocTitleCorpus.from_database)
+soc_prefix_index = SocCorpusCache(SocPrefixIndex.from_database)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from jobs.models import Socs, BlsOes, StateAbbPairs, OccupationTransitions, SocDescription
+from jobs.models import (Socs, BlsOes, BlsOesHistory, StateAbbPairs, OccupationTransitions, SocDescription, Area,
+                         Industry, BlsOesIndustry)
 
 
 # Lead Serializer
@@ -10,16 +11,48 @@ class SocSerializer(serializers.ModelSerializer):
 
 
 class BlsOesSerializer(serializers.ModelSerializer):
+    # Wages at the 10th, 25th, 50th, 75th and 90th percentiles (WAGE_PERCENTILES), null where not available
+    hourly_wage_percentiles = serializers.ListField(child=serializers.FloatField(), allow_null=True, read_only=True)
+    annual_wage_percentiles = serializers.ListField(child=serializers.FloatField(), allow_null=True, read_only=True)
+
     class Meta:
         model = BlsOes
         fields = ("area_title",
+                  "area_code",
+                  "area_type",
                   "soc_code",
                   "soc_title",
                   "hourly_mean_wage",
                   "annual_mean_wage",
                   "total_employment",
                   "soc_decimal_code",
-                  "file_year")
+                  "file_year",
+                  "hourly_wage_percentiles",
+                  "annual_wage_percentiles")
+
+
+class BlsOesHistorySerializer(serializers.ModelSerializer):
+    """
+    Wage and employment series of an area and SOC code, aligned with years. pi is the probability of a transition from
+    the requested source SOC code to this one, if any (see WageTrendsViewSet).
+    """
+    years = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+    hourly_mean_wages = serializers.ListField(child=serializers.FloatField(), read_only=True)
+    annual_mean_wages = serializers.ListField(child=serializers.FloatField(), read_only=True)
+    total_employment = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+    pi = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = BlsOesHistory
+        fields = ("area_code",
+                  "area_title",
+                  "soc_code",
+                  "soc_title",
+                  "years",
+                  "hourly_mean_wages",
+                  "annual_mean_wages",
+                  "total_employment",
+                  "pi")
 
 
 class SocListSerializer(serializers.ModelSerializer):
@@ -35,6 +68,54 @@ class StateNamesSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class AreaSerializer(serializers.ModelSerializer):
+    state_code = serializers.CharField(source="state_id", allow_null=True)
+
+    class Meta:
+        model = Area
+        fields = ("area_code", "area_title", "area_type", "state_code")
+
+
+class IndustrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Industry
+        fields = ("naics_code", "naics_title", "industry_group")
+
+
+class BlsOesIndustrySerializer(serializers.ModelSerializer):
+    """
+    Industry-specific wages in the same shape as BlsOesSerializer, plus the industry. SOC codes are stored as integers
+    (see BlsOesIndustry), and formatted back into NN-NNNN codes here.
+    """
+    area_code = serializers.CharField(source="area_id")
+    area_title = serializers.CharField(source="area.area_title")
+    area_type = serializers.IntegerField(source="area.area_type")
+    naics_code = serializers.IntegerField(source="industry_id")
+    naics_title = serializers.CharField(source="industry.naics_title")
+    soc_code = serializers.SerializerMethodField()
+    soc_decimal_code = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BlsOesIndustry
+        fields = ("area_title",
+                  "area_code",
+                  "area_type",
+                  "naics_code",
+                  "naics_title",
+                  "soc_code",
+                  "hourly_mean_wage",
+                  "annual_mean_wage",
+                  "total_employment",
+                  "soc_decimal_code",
+                  "file_year")
+
+    def get_soc_code(self, estimate: BlsOesIndustry) -> str:
+        return f"{estimate.soc // 10000:02d}-{estimate.soc % 10000:04d}"
+
+    def get_soc_decimal_code(self, estimate: BlsOesIndustry) -> str:
+        return f"{self.get_soc_code(estimate)}.00"
+
+
 class OccupationTransitionsSerializer(serializers.ModelSerializer):
     class Meta:
         model = OccupationTransitions
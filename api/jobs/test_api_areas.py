@@ -0,0 +1,66 @@
+from django.test import TestCase
+
+from .models import Area, BlsOes, OccupationTransitions
+
+
+class AreasAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Area.objects.bulk_create([
+            Area(area_code="99", area_title="U.S.", area_type=Area.US),
+            Area(area_code="25", area_title="Massachusetts", area_type=Area.STATE),
+            Area(area_code="14460", area_title="Boston-Cambridge-Nashua, MA-NH", area_type=Area.METROPOLITAN,
+                 state_id="25"),
+            Area(area_code="2500004", area_title="Western Massachusetts nonmetropolitan area",
+                 area_type=Area.NONMETROPOLITAN, state_id="25"),
+        ])
+
+        wages = {"99": 20, "25": 22, "14460": 25}
+        BlsOes.objects.bulk_create([
+            BlsOes(area_code=area_code,
+                   area_title=Area.objects.get(area_code=area_code).area_title,
+                   soc_code=soc_code,
+                   soc_title=soc_code,
+                   hourly_mean_wage=wage + offset,
+                   annual_mean_wage=(wage + offset) * 2080,
+                   file_year=2019)
+            for area_code, wage in wages.items()
+            for offset, soc_code in enumerate(["35-3031", "41-2031", "43-4051", "11-1011"])
+        ])
+        OccupationTransitions.objects.bulk_create([
+            OccupationTransitions(soc1="35-3031", soc2="41-2031", pi=0.2),
+            OccupationTransitions(soc1="35-3031", soc2="43-4051", pi=0.1),
+        ])
+
+    def test_areas_filter_by_type_and_state(self):
+        response = self.client.get("/api/v1/jobs/areas/", {"area_type": Area.METROPOLITAN, "state": "25"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"area_code": "14460",
+                                            "area_title": "Boston-Cambridge-Nashua, MA-NH",
+                                            "area_type": Area.METROPOLITAN,
+                                            "state_code": "25"}])
+
+    def test_transitions_for_metropolitan_area(self):
+        # One query for the transitions and one for the wages of their SOC codes in the area
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/jobs/transitions-extended/", {"soc": "35-3031", "area_code": "14460"})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["source_soc"]["source_soc_area_code"], "14460")
+        self.assertEqual(float(data["source_soc"]["source_soc_hourly_mean_wage"]), 25)
+        self.assertEqual({(row["soc2"], float(row["soc2_hourly_mean_wage"])) for row in data["transition_rows"]},
+                         {("41-2031", 26), ("43-4051", 27)})
+
+    def test_transitions_default_to_area_title(self):
+        response = self.client.get("/api/v1/jobs/transitions-extended/", {"soc": "35-3031",
+                                                                          "area_title": "Massachusetts"})
+
+        self.assertEqual(response.json()["source_soc"]["source_soc_area_title"], "Massachusetts")
+
+    def test_wages_filter_by_area_code(self):
+        response = self.client.get("/api/v1/jobs/soc-codes/", {"area_codes": "14460,25", "socs": "11-1011"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(row["area_code"] for row in response.json()["results"]), ["14460", "25"])
@@ -0,0 +1,130 @@
+from django.test import SimpleTestCase, TestCase
+from openpyxl import Workbook
+from pathlib import Path
+import tempfile
+
+from data.bls.utils.oes_industry import (write_industry_partitions, read_industry_marker, read_industries,
+                                         iter_industry_partitions)
+from .models import Area, BlsOes, Industry, BlsOesIndustry
+
+
+class IndustryWagesAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Area.objects.bulk_create([
+            Area(area_code="99", area_title="U.S.", area_type=Area.US),
+            Area(area_code="25", area_title="Massachusetts", area_type=Area.STATE),
+        ])
+        Industry.objects.bulk_create([
+            Industry(naics_code=622100, naics_title="General Medical and Surgical Hospitals", industry_group="4-digit"),
+            Industry(naics_code=621100, naics_title="Offices of Physicians", industry_group="4-digit"),
+        ])
+        BlsOesIndustry.objects.bulk_create([
+            BlsOesIndustry(area_id=area_code, industry_id=naics_code, soc=soc, hourly_mean_wage=wage,
+                           annual_mean_wage=wage * 2080, total_employment=1000, file_year=2019)
+            for area_code in ["99", "25"]
+            for naics_code, wage in [(622100, 40.5), (621100, 35.25)]
+            for soc in [291141, 434171]
+        ])
+        BlsOes.objects.create(area_code="99", area_title="U.S.", soc_code="29-1141", soc_title="Registered Nurses",
+                              hourly_mean_wage=38, annual_mean_wage=79000, file_year=2019)
+
+    def test_wages_filter_by_industry(self):
+        response = self.client.get("/api/v1/jobs/soc-codes/", {"industry": "622100",
+                                                                 "socs": "29-1141",
+                                                                 "area_codes": "25"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [{"area_title": "Massachusetts",
+                                                       "area_code": "25",
+                                                       "area_type": Area.STATE,
+                                                       "naics_code": 622100,
+                                                       "naics_title": "General Medical and Surgical Hospitals",
+                                                       "soc_code": "29-1141",
+                                                       "hourly_mean_wage": 40.5,
+                                                       "annual_mean_wage": 40.5 * 2080,
+                                                       "total_employment": 1000,
+                                                       "soc_decimal_code": "29-1141.00",
+                                                       "file_year": 2019}])
+
+    def test_several_industries_in_one_query(self):
+        # The count, and the page of estimates with their areas and industries
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/jobs/soc-codes/", {"industry": "622100,621100", "areas": "U.S."})
+
+        self.assertEqual([(row["naics_code"], row["soc_code"]) for row in response.json()["results"]],
+                         [(621100, "29-1141"), (621100, "43-4171"), (622100, "29-1141"), (622100, "43-4171")])
+
+    def test_invalid_industry_is_rejected(self):
+        response = self.client.get("/api/v1/jobs/soc-codes/", {"industry": "hospitals"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_wages_without_industry_are_cross_industry(self):
+        response = self.client.get("/api/v1/jobs/soc-codes/", {"socs": "29-1141"})
+        self.assertEqual([row["hourly_mean_wage"] for row in response.json()["results"]], ["38.00"])
+
+    def test_industries(self):
+        response = self.client.get("/api/v1/jobs/industries/", {"naics_codes": "622100"})
+        self.assertEqual(response.json(), [{"naics_code": 622100,
+                                            "naics_title": "General Medical and Surgical Hospitals",
+                                            "industry_group": "4-digit"}])
+
+
+class IndustryPartitionTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_workbook(self) -> Path:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(["AREA", "AREA_TYPE", "NAICS", "NAICS_TITLE", "I_GROUP", "OCC_CODE", "H_MEAN", "A_MEAN",
+                      "TOT_EMP"])
+        sheet.append(["99", "1", "000000", "Cross-industry", "cross-industry", "29-1141", "38", "79000", "3000000"])
+        sheet.append(["99", "1", "622100", "Hospitals", "4-digit", "29-1141", "40.5", "84240", "1700000"])
+        sheet.append(["1", "2", "622100", "Hospitals", "4-digit", "29-1141", "*", "**", "40000"])
+        sheet.append(["99", "1", "621100", "Offices of Physicians", "4-digit", "29-1141", "35", "72800", "200000"])
+        sheet.append(["99", "1", "541500", "Computer Systems Design", "4-digit", "15-1252", "55", "114400", "#"])
+        sheet.append(["99", "1", "541500", "Computer Systems Design", "4-digit", "15-0000", "50", "104000", "900000"])
+        # Sector-level codes, a subsector of a sector that spans several codes, and an OES grouping without a NAICS key
+        sheet.append(["99", "1", "62", "Health Care and Social Assistance", "sector", "29-1141", "39", "81120",
+                      "2500000"])
+        sheet.append(["99", "1", "31-33", "Manufacturing", "sector", "51-4121", "22", "45760", "400000"])
+        sheet.append(["99", "1", "325400", "Pharmaceutical Manufacturing", "4-digit", "19-2031", "48", "99840", "20000"])
+        sheet.append(["99", "1", "3250A1", "Chemical Manufacturing (part)", "4-digit", "19-2031", "45", "93600", "9000"])
+        path = self.directory / "all_data_M_2019.xlsx"
+        workbook.save(path)
+        return path
+
+    def test_industry_rows_are_partitioned_by_sector(self):
+        partitions = self.directory / "oes_industry_2019"
+        with self.assertLogs(level="WARNING") as logs:
+            rows = write_industry_partitions(self.write_workbook(), "2019", partitions,
+                                             metadata={"cleaner_version": 1}, chunk_rows=2)
+        self.assertIn("Dropping 1 industry-specific OES rows", logs.output[0])
+        self.assertIn("3250A1", logs.output[0])
+
+        self.assertEqual(rows, 8)
+        self.assertEqual(read_industry_marker(partitions), {"cleaner_version": 1, "year": "2019", "rows": 8})
+        self.assertEqual(sorted(path.name for path in partitions.glob("sector=*")),
+                         ["sector=31", "sector=54", "sector=62"])
+        self.assertFalse(partitions.with_name("oes_industry_2019.part").exists())
+
+        [manufacturing, technical, health] = iter_industry_partitions(partitions)
+        self.assertEqual(list(manufacturing["naics_code"]), [310000, 325400])
+        self.assertEqual(list(health["naics_code"]), [622100, 622100, 621100, 620000])
+        self.assertEqual(list(health["soc"]), [291141, 291141, 291141, 291141])
+        self.assertEqual(list(health["area_code"]), ["99", "01", "99", "99"])
+        self.assertEqual(str(health["naics_code"].dtype), "int32")
+        self.assertEqual(str(health["hourly_mean_wage"].dtype), "float32")
+        self.assertTrue(health["hourly_mean_wage"].isna().iloc[1])
+        self.assertEqual(list(technical["soc"]), [151252, 150000])
+        self.assertTrue(technical["total_employment"].isna().iloc[0])
+
+        [health] = iter_industry_partitions(partitions, sectors=[62])
+        self.assertEqual(len(health), 4)
+        self.assertEqual(sorted(read_industries(partitions)["naics_code"]),
+                         [310000, 325400, 541500, 620000, 621100, 622100])
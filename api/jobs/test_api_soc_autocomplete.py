@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from .models import SocDescription
+from .search import soc_prefix_index
+
+
+class SocAutocompleteAPITests(TestCase):
+    def setUp(self):
+        SocDescription.objects.create(soc_code="29-1141", soc_title="Registered Nurses", total_transition_obs=5000)
+        SocDescription.objects.create(soc_code="29-2061", soc_title="Licensed Practical and Licensed Vocational Nurses",
+                                      total_transition_obs=3000)
+        SocDescription.objects.create(soc_code="31-1131", soc_title="Nursing Assistants", total_transition_obs=2000)
+        SocDescription.objects.create(soc_code="53-3032", soc_title="Heavy and Tractor-Trailer Truck Drivers",
+                                      total_transition_obs=8000)
+        soc_prefix_index.clear()
+
+    def tearDown(self):
+        soc_prefix_index.clear()
+
+    def test_title_prefixes_rank_before_word_prefixes(self):
+        """
+        Make sure that titles starting with the prefix come first, then titles with a later word matching it
+        """
+        response = self.client.get("/api/v1/jobs/soc-autocomplete/", {"q": "nurs"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([soc["soc_code"] for soc in response.json()], ["31-1131", "29-1141", "29-2061"])
+
+    def test_soc_code_prefix_and_limit(self):
+        """
+        Make sure that SOC codes can be typed with or without the dash, and that the limit is applied
+        """
+        response = self.client.get("/api/v1/jobs/soc-autocomplete/", {"q": "291", "limit": 1})
+        self.assertEqual([soc["soc_code"] for soc in response.json()], ["29-1141"])
+
+    def test_invalid_limit_is_a_bad_request(self):
+        """
+        Make sure that a limit that is not a positive integer is rejected rather than failing the request
+        """
+        for limit in ["x", "0"]:
+            response = self.client.get("/api/v1/jobs/soc-autocomplete/", {"q": "nurs", "limit": limit})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("limit", response.json())
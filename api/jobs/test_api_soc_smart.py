@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from unittest import mock
+import time
+
+from .api import SocListSmartViewSet
+from . import async_api
+from .cache import OnetKeywordCache
+from .models import SocDescription
+from .search import soc_title_corpus
+
+
+class SocSmartListAPITests(TestCase):
+    def setUp(self):
+        SocDescription.objects.create(soc_code="29-1141", soc_title="Registered Nurses", total_transition_obs=5000)
+        SocDescription.objects.create(soc_code="29-2061", soc_title="Licensed Practical and Licensed Vocational Nurses",
+                                      total_transition_obs=3000)
+        SocDescription.objects.create(soc_code="31-1131", soc_title="Nursing Assistants", total_transition_obs=10)
+        SocDescription.objects.create(soc_code="53-3032", soc_title="Heavy and Tractor-Trailer Truck Drivers",
+                                      total_transition_obs=8000)
+        soc_title_corpus.clear()
+
+    def tearDown(self):
+        soc_title_corpus.clear()
+
+    def test_keyword_returns_fuzzy_matches(self):
+        """
+        Make sure that SOCs whose titles match the keyword are returned, filtered by min_weighted_obs
+        """
+        response = self.client.get("/api/v1/jobs/soc-smart-list/", {"keyword_search": "nurse"})
+        self.assertEqual(response.status_code, 200)
+
+        soc_codes = [soc["soc_code"] for soc in response.json()]
+        self.assertIn("29-1141", soc_codes)
+        self.assertIn("29-2061", soc_codes)
+        self.assertNotIn("31-1131", soc_codes)
+        self.assertNotIn("53-3032", soc_codes)
+
+    def test_no_keyword_returns_available_socs(self):
+        """
+        Make sure that every SOC with enough observed transitions is returned when there is no keyword
+        """
+        response = self.client.get("/api/v1/jobs/soc-smart-list/", {"min_weighted_obs": 100})
+        self.assertEqual(len(response.json()), 3)
+
+    def test_async_search_returns_fuzzy_matches_when_onet_misses_deadline(self):
+        """
+        Make sure that the async smart search answers within its deadline with the fuzzy matches if O*NET is slow
+        """
+        def slow_onet_search(keyword, limit):
+            time.sleep(1)
+            return {"career": [{"code": "53-3032.00"}]}
+
+        with mock.patch.object(SocListSmartViewSet, "search_onet_keyword", side_effect=slow_onet_search), \
+                mock.patch.object(async_api, "SMART_SEARCH_DEADLINE", 0.2):
+            started = time.monotonic()
+            response = self.client.get("/api/v1/jobs/soc-smart-list-async/", {"keyword_search": "nurse"})
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(elapsed, 1)
+        self.assertEqual({soc["soc_code"] for soc in response.json()}, {"29-1141", "29-2061"})
+
+    # The O*NET pool's threads cannot write to the database cache while the test transaction holds SQLite's lock
+    @override_settings(CACHES={**settings.CACHES, "onet": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                                                           "LOCATION": "test-late-onet"}})
+    def test_async_search_caches_onet_matches_that_miss_the_deadline(self):
+        """
+        Make sure that an O*NET result that arrives after the deadline is still cached for the next search
+        """
+        def slow_onet_search(keyword, limit):
+            time.sleep(0.3)
+            return {"career": [{"code": "53-3032.00"}]}
+
+        with mock.patch.object(SocListSmartViewSet, "search_onet_keyword", side_effect=slow_onet_search), \
+                mock.patch.object(async_api, "SMART_SEARCH_DEADLINE", 0.05):
+            self.client.get("/api/v1/jobs/soc-smart-list-async/", {"keyword_search": "trucker"})
+
+        onet_cache = OnetKeywordCache()
+        for _ in range(50):
+            soc_codes = onet_cache.get("trucker", limit=SocListSmartViewSet.DEFAULT_LIMIT)
+            if soc_codes is not None:
+                break
+            time.sleep(0.05)
+        self.assertEqual(soc_codes, ["53-3032"])
+
+    def test_async_search_includes_onet_matches(self):
+        """
+        Make sure that O*NET matches that arrive within the deadline follow the fuzzy matches
+        """
+        with mock.patch.object(SocListSmartViewSet, "search_onet_keyword",
+                               return_value={"career": [{"code": "53-3032.00"}]}):
+            response = self.client.get("/api/v1/jobs/soc-smart-list-async/", {"keyword_search": "nurse"})
+
+        self.assertEqual([soc["soc_code"] for soc in response.json()][-1], "53-3032")
+
+    def test_async_responses_match_sync_responses(self):
+        """
+        Make sure that the async view renders the same bodies as /soc-smart-list/, e.g. decimals as numbers
+        """
+        with mock.patch.object(SocListSmartViewSet, "search_onet_keyword", return_value=None):
+            for params in [{"keyword_search": "nurse"}, {"min_weighted_obs": 100}]:
+                sync_response = self.client.get("/api/v1/jobs/soc-smart-list/", params)
+                async_response = self.client.get("/api/v1/jobs/soc-smart-list-async/", params)
+                self.assertEqual(async_response.json(), sync_response.json())
+                self.assertEqual(async_response["Content-Type"], "application/json")
+
+        self.assertIsInstance(async_response.json()[0]["total_transition_obs"], float)
+
+    def test_invalid_parameters_are_bad_requests(self):
+        """
+        Make sure that the sync and async views reject the same invalid parameters with the same errors
+        """
+        for params in [{"keyword_search": "nurse", "onet_limit": "abc"}, {"min_weighted_obs": "many"}]:
+            sync_response = self.client.get("/api/v1/jobs/soc-smart-list/", params)
+            async_response = self.client.get("/api/v1/jobs/soc-smart-list-async/", params)
+            self.assertEqual(sync_response.status_code, 400)
+            self.assertEqual(async_response.status_code, 400)
+            self.assertEqual(async_response.json(), sync_response.json())
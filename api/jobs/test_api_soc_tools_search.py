@@ -0,0 +1,63 @@
+from django.db import connection
+from django.test import TestCase
+
+from .models import SocDescription, OnetOccupationPhrase
+from .search import OnetPhraseSearch
+
+
+class SocToolSearchAPITests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # SQLite cannot roll back to a savepoint taken before CREATE VIRTUAL TABLE, so create the FTS5 table outside
+        # the test transactions; setUp only rebuilds its contents
+        OnetPhraseSearch.build_index(connection)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        OnetPhraseSearch.drop_index(connection)
+
+    def setUp(self):
+        SocDescription.objects.create(soc_code="53-7051", soc_title="Industrial Truck and Tractor Operators",
+                                      total_transition_obs=9000)
+        SocDescription.objects.create(soc_code="53-7062", soc_title="Laborers and Freight, Stock, and Material Movers",
+                                      total_transition_obs=20000)
+        SocDescription.objects.create(soc_code="43-3031", soc_title="Bookkeeping, Accounting, and Auditing Clerks",
+                                      total_transition_obs=500)
+
+        for soc_code, phrase, category in [("53-7051", "Forklifts", "Forklifts"),
+                                           ("53-7051", "Warehouse forklifts", "Forklifts"),
+                                           ("53-7062", "Pallet jacks", "Pallet trucks"),
+                                           ("53-7062", "Warehouse forklifts", "Forklifts"),
+                                           ("43-3031", "Desktop calculators", "Desktop calculator"),
+                                           ("99-9999", "Forklifts", "Forklifts")]:
+            OnetOccupationPhrase.objects.create(soc_code=soc_code, onet_soc_code=f"{soc_code}.00", phrase=phrase,
+                                                category=category, source="tool")
+        OnetPhraseSearch.build_index(connection)
+
+    def test_matches_are_grouped_by_soc_with_transitions_data(self):
+        """
+        Make sure that matching phrases are grouped by occupation, and that occupations without transitions data are
+        left out
+        """
+        response = self.client.get("/api/v1/jobs/soc-tools-search/", {"q": "forklift"})
+        self.assertEqual(response.status_code, 200)
+
+        socs = {soc["soc_code"]: soc for soc in response.json()}
+        self.assertEqual(set(socs), {"53-7051", "53-7062"})
+        self.assertEqual(set(socs["53-7051"]["matches"]), {"Forklifts", "Warehouse forklifts"})
+        self.assertEqual(socs["53-7062"]["matches"], ["Warehouse forklifts"])
+
+    def test_partial_terms_and_min_obs(self):
+        """
+        Make sure that partially typed words match, every word must match, and min_weighted_obs is applied
+        """
+        response = self.client.get("/api/v1/jobs/soc-tools-search/", {"q": "pallet tru"})
+        self.assertEqual([soc["soc_code"] for soc in response.json()], ["53-7062"])
+
+        response = self.client.get("/api/v1/jobs/soc-tools-search/", {"q": "calcul"})
+        self.assertEqual(response.json(), [])
+
+        response = self.client.get("/api/v1/jobs/soc-tools-search/", {"q": "calcul", "min_weighted_obs": 100})
+        self.assertEqual([soc["soc_code"] for soc in response.json()], ["43-3031"])
@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase, TestCase
+import pandas as pd
+
+from data.bls.oes_data_downloader import OESDataDownloader
+from data.bls.utils.wage_percentiles import unpack_wage_percentiles
+from .models import BlsOes, OccupationTransitions
+
+
+class WagePercentilesAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        BlsOes.objects.bulk_create([
+            BlsOes(area_code="99", area_title="U.S.", soc_code="35-3031", soc_title="Waiters and Waitresses",
+                   hourly_mean_wage=13, annual_mean_wage=27000, file_year=2019,
+                   hourly_wage_percentiles=[8.65, 9.35, 11.42, 15.72, 20.81],
+                   annual_wage_percentiles=[17990, 19460, 23740, 32690, 43280]),
+            BlsOes(area_code="99", area_title="U.S.", soc_code="11-1011", soc_title="Chief Executives",
+                   hourly_mean_wage=93.2, annual_mean_wage=193850, file_year=2019,
+                   hourly_wage_percentiles=[43.5, 75.01, None, None, None],
+                   annual_wage_percentiles=[90480, 156010, None, None, None]),
+            BlsOes(area_code="99", area_title="U.S.", soc_code="41-2031", soc_title="Retail Salespersons",
+                   hourly_mean_wage=13.81, annual_mean_wage=28720, file_year=2019),
+        ])
+        OccupationTransitions.objects.bulk_create([
+            OccupationTransitions(soc1="35-3031", soc2="11-1011", pi=0.02),
+            OccupationTransitions(soc1="35-3031", soc2="41-2031", pi=0.05),
+        ])
+
+    def test_wages_include_percentiles(self):
+        response = self.client.get("/api/v1/jobs/soc-codes/", {"socs": "35-3031,11-1011"})
+
+        percentiles = {row["soc_code"]: (row["hourly_wage_percentiles"], row["annual_wage_percentiles"])
+                       for row in response.json()["results"]}
+        self.assertEqual(percentiles, {
+            "35-3031": ([8.65, 9.35, 11.42, 15.72, 20.81], [17990, 19460, 23740, 32690, 43280]),
+            "11-1011": ([43.5, 75.01, None, None, None], [90480, 156010, None, None, None]),
+        })
+
+    def test_transitions_include_percentiles_of_source_and_destinations(self):
+        # One query for the transitions, and one for the wages (and distributions) of every SOC code
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/jobs/transitions-extended/", {"soc": "35-3031"})
+
+        data = response.json()
+        self.assertEqual(data["source_soc"]["source_soc_hourly_wage_percentiles"], [8.65, 9.35, 11.42, 15.72, 20.81])
+        destinations = {row["soc2"]: row["soc2_annual_wage_percentiles"] for row in data["transition_rows"]}
+        self.assertEqual(destinations, {"11-1011": [90480, 156010, None, None, None], "41-2031": None})
+
+
+class WagePercentilesCleaningTests(SimpleTestCase):
+    def test_percentiles_are_packed_per_row(self):
+        columns = {"area": ["99", "99"], "area_title": ["U.S.", "U.S."], "area_type": ["1", "1"],
+                   "naics": ["000000", "000000"], "occ_code": ["35-3031", "11-1011"],
+                   "occ_title": ["Waiters and Waitresses", "Chief Executives"], "h_mean": ["13", "93.2"],
+                   "a_mean": ["27000", "193850"], "tot_emp": ["2579020", "205890"]}
+        for prefix, wages in [("h", ["8.65", "43.5"]), ("a", ["17990", "90480"])]:
+            for name in ["pct10", "pct25", "median", "pct75", "pct90"]:
+                columns[f"{prefix}_{name}"] = [wages[0], "#" if name in ("median", "pct75", "pct90") else wages[1]]
+
+        # _clean_oes_data does not use the downloader's state
+        downloader = OESDataDownloader.__new__(OESDataDownloader)
+        cleaned = downloader._clean_oes_data(pd.DataFrame(columns))
+
+        hourly = unpack_wage_percentiles(cleaned["hourly_wage_percentiles"])
+        self.assertEqual(hourly.shape, (2, 5))
+        self.assertEqual(str(hourly.dtype), "float32")
+        self.assertAlmostEqual(float(hourly[0, 2]), 8.65, places=5)
+        self.assertEqual(pd.isna(hourly[1]).tolist(), [False, False, True, True, True])
+        self.assertEqual(len(cleaned["annual_wage_percentiles"][0]), 20)
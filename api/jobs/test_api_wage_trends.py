@@ -0,0 +1,94 @@
+from django.test import SimpleTestCase, TestCase
+import numpy as np
+import pandas as pd
+
+from data.bls.utils.oes_history import oes_history_table
+from .models import BlsOesHistory, OccupationTransitions
+
+
+class WageTrendsAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        BlsOesHistory.objects.bulk_create([
+            BlsOesHistory(area_code="99", area_title="U.S.", soc_code="35-3031", soc_title="Waiters and Waitresses",
+                          years=[2017, 2018, 2019], hourly_mean_wages=[12.48, 12.87, 13.34],
+                          annual_mean_wages=[25960, 26770, 27750], total_employment=[2564610, 2582410, 2579020]),
+            BlsOesHistory(area_code="99", area_title="U.S.", soc_code="41-2031", soc_title="Retail Salespersons",
+                          years=[2018, 2019], hourly_mean_wages=[13.37, 13.81],
+                          annual_mean_wages=[27800, 28720], total_employment=[None, 4317950]),
+            BlsOesHistory(area_code="99", area_title="U.S.", soc_code="43-4051", soc_title="Customer Service",
+                          years=[2019], hourly_mean_wages=[None], annual_mean_wages=[None], total_employment=[2919230]),
+            BlsOesHistory(area_code="25", area_title="Massachusetts", soc_code="35-3031",
+                          soc_title="Waiters and Waitresses", years=[2019], hourly_mean_wages=[15.5],
+                          annual_mean_wages=[32240], total_employment=[60000]),
+        ])
+        OccupationTransitions.objects.bulk_create([
+            OccupationTransitions(soc1="35-3031", soc2="41-2031", pi=0.05),
+            OccupationTransitions(soc1="35-3031", soc2="43-4051", pi=0.08),
+            OccupationTransitions(soc1="35-3031", soc2="11-1011", pi=0.001),
+        ])
+
+    def test_trend_for_soc(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/v1/jobs/wage-trends/", {"soc": "35-3031"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "source_soc": {"area_code": "99",
+                           "area_title": "U.S.",
+                           "soc_code": "35-3031",
+                           "soc_title": "Waiters and Waitresses",
+                           "years": [2017, 2018, 2019],
+                           "hourly_mean_wages": [12.48, 12.87, 13.34],
+                           "annual_mean_wages": [25960, 26770, 27750],
+                           "total_employment": [2564610, 2582410, 2579020],
+                           "pi": None},
+            "transition_rows": [],
+        })
+
+    def test_trends_for_soc_and_transitions_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/v1/jobs/wage-trends/", {"soc": "35-3031", "transitions": "true"})
+
+        data = response.json()
+        self.assertEqual(data["source_soc"]["soc_code"], "35-3031")
+        self.assertEqual([(row["soc_code"], row["pi"]) for row in data["transition_rows"]],
+                         [("43-4051", 0.08), ("41-2031", 0.05)])
+        self.assertEqual(data["transition_rows"][1]["total_employment"], [None, 4317950])
+        self.assertEqual(data["transition_rows"][0]["hourly_mean_wages"], [None])
+
+    def test_trend_for_area(self):
+        response = self.client.get("/api/v1/jobs/wage-trends/", {"soc": "35-3031", "area_code": "25"})
+        self.assertEqual(response.json()["source_soc"]["hourly_mean_wages"], [15.5])
+
+        response = self.client.get("/api/v1/jobs/wage-trends/", {"soc": "35-3031", "area_title": "Massachusetts"})
+        self.assertEqual(response.json()["source_soc"]["years"], [2019])
+
+    def test_invalid_probability_is_rejected(self):
+        response = self.client.get("/api/v1/jobs/wage-trends/", {"transitions": "true",
+                                                                 "min_transition_probability": "high"})
+        self.assertEqual(response.status_code, 400)
+
+
+class OesHistoryTableTests(SimpleTestCase):
+    def test_years_are_packed_per_area_and_soc(self):
+        all_years = pd.DataFrame({
+            "area_code": ["99", "99", "99", "25"],
+            "area_title": ["U.S.", "U.S.", "U.S.", "Massachusetts"],
+            "soc_code": ["11-1011", "11-1011", "35-3031", "11-1011"],
+            "soc_title": ["Chief Executives", "Chief executives", "Waiters and Waitresses", "Chief Executives"],
+            "file_year": [2019, 2018, 2019, 2019],
+            "hourly_mean_wage": [93.2, 90.1, 13.34, np.nan],
+            "annual_mean_wage": [193850, 187400, 27750, np.nan],
+            "total_employment": pd.array([205890, None, 2579020, 3000], dtype="Int64"),
+        }).astype({"area_code": "category", "soc_code": "category"})
+
+        history = oes_history_table(all_years)
+
+        self.assertEqual(list(zip(history["area_code"], history["soc_code"], history["soc_title"])),
+                         [("25", "11-1011", "Chief Executives"), ("99", "11-1011", "Chief Executives"),
+                          ("99", "35-3031", "Waiters and Waitresses")])
+        self.assertEqual(np.frombuffer(history["years"][1], dtype="<i2").tolist(), [2018, 2019])
+        self.assertEqual(np.frombuffer(history["total_employment"][1], dtype="<f8")[1], 205890)
+        self.assertTrue(np.isnan(np.frombuffer(history["total_employment"][1], dtype="<f8")[0]))
+        self.assertEqual(len(history["hourly_mean_wages"][2]), 4)
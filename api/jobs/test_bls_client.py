@@ -0,0 +1,138 @@
+from django.test import SimpleTestCase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import json
+import tempfile
+import threading
+import time
+
+from data.bls.utils.bls_api_v1 import parse_bls_api_query_v1
+from data.bls.utils.bls_timeseries import BlsTimeSeriesClient, BlsApiError
+
+
+class StubBlsApiHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the BLS time series API: one annual observation (M13) per requested series and year, whose value
+    is the year. Set server.failures to answer that many requests with 503 first, and server.status to answer with an
+    unprocessed request.
+    """
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests_seen.append((self.path, body, time.monotonic()))
+            failing = self.server.failures > 0
+            self.server.failures -= 1
+
+        if failing:
+            return self.respond(503, {})
+        series = [{"seriesID": series_id,
+                   "data": [{"year": str(year),
+                             "period": "M13",
+                             "periodName": "Annual",
+                             "latest": "false",
+                             "value": "-" if series_id.endswith("NA") else str(year),
+                             "footnotes": [{"code": "P", "text": "preliminary"}, {}]}
+                            for year in range(int(body["endyear"]), int(body["startyear"]) - 1, -1)]}
+                  for series_id in body["seriesid"]]
+        self.respond(200, {"status": self.server.status, "message": [], "Results": {"series": series}})
+
+    def respond(self, status, body):
+        body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class BlsTimeSeriesClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubBlsApiHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests_seen = []
+        self.server.failures = 0
+        self.server.status = "REQUEST_SUCCEEDED"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def bls_client(self, **kwargs):
+        options = {"api_key": "",
+                   "base_url": f"http://127.0.0.1:{self.server.server_port}/publicAPI/",
+                   "cache_dir": self.cache_dir,
+                   "min_interval": 0}
+        return BlsTimeSeriesClient(**{**options, **kwargs})
+
+    def test_requests_are_batched_within_limits_and_merged(self):
+        series_ids = [f"OEUN{i:04d}" for i in range(30)]
+        frame = self.bls_client().get_series(series_ids + series_ids[:5], 2001, 2015)
+
+        # 30 series in batches of 25, 15 years in windows of 10
+        batches = sorted((len(body["seriesid"]), body["startyear"], body["endyear"])
+                         for path, body, sent in self.server.requests_seen)
+        self.assertEqual(batches, [(5, "2001", "2010"), (5, "2011", "2015"), (25, "2001", "2010"),
+                                   (25, "2011", "2015")])
+        self.assertTrue(all(path == "/publicAPI/v1/timeseries/data/" for path, body, sent in self.server.requests_seen))
+
+        self.assertEqual(len(frame), 30 * 15)
+        self.assertEqual(list(frame.columns),
+                         ["series_id", "year", "period", "period_name", "value", "latest", "footnotes"])
+        self.assertEqual(str(frame["year"].dtype), "int64")
+        self.assertEqual(str(frame["value"].dtype), "float64")
+        self.assertEqual(list(frame["year"][:3]), [2001, 2002, 2003])
+        self.assertEqual(frame["value"][0], 2001.0)
+        self.assertEqual(frame["footnotes"][0], "preliminary")
+
+    def test_registration_key_uses_v2_limits(self):
+        self.bls_client(api_key="key").get_series([f"OEUN{i:04d}" for i in range(30)], 2001, 2015)
+
+        [(path, body, sent)] = self.server.requests_seen
+        self.assertEqual(path, "/publicAPI/v2/timeseries/data/")
+        self.assertEqual(body["registrationkey"], "key")
+
+    def test_cached_responses_are_reused(self):
+        self.bls_client().get_series(["OEUN0001"], 2001, 2002)
+        frame = self.bls_client().get_series(["OEUN0001"], 2001, 2002)
+
+        self.assertEqual(len(self.server.requests_seen), 1)
+        self.assertEqual(len(frame), 2)
+
+    def test_missing_values_are_na(self):
+        frame = self.bls_client().get_series(["OEUN0001NA"], 2001, 2001)
+        self.assertTrue(frame["value"].isna().all())
+
+    def test_requests_are_rate_limited(self):
+        series_ids = [f"OEUN{i:04d}" for i in range(100)]
+        self.bls_client(min_interval=0.1, cache_dir=None).get_series(series_ids, 2001, 2001)
+
+        sent = sorted(sent for path, body, sent in self.server.requests_seen)
+        self.assertEqual(len(sent), 4)
+        self.assertGreaterEqual(sent[-1] - sent[0], 0.25)
+
+    def test_unavailable_responses_are_retried(self):
+        self.server.failures = 1
+        frame = self.bls_client(cache_dir=None).get_series(["OEUN0001"], 2001, 2001)
+
+        self.assertEqual(len(self.server.requests_seen), 2)
+        self.assertEqual(len(frame), 1)
+
+    def test_unprocessed_request_raises(self):
+        self.server.status = "REQUEST_NOT_PROCESSED"
+        with self.assertRaises(BlsApiError):
+            self.bls_client().get_series(["OEUN0001"], 2001, 2001)
+        self.assertEqual(list(self.cache_dir.iterdir()), [])
+
+    def test_v1_parser_reads_every_series(self):
+        response = {"Results": {"series": [{"seriesID": "A", "data": [{"value": "1"}]},
+                                           {"seriesID": "B", "data": [{"value": "2"}]}]}}
+        self.assertEqual(parse_bls_api_query_v1(response),
+                         [{"value": "1", "series_name": "A"}, {"value": "2", "series_name": "B"}])
@@ -0,0 +1,101 @@
+from django.test import SimpleTestCase
+from pathlib import Path
+import json
+import tempfile
+import threading
+
+from data.instrumentation import collect_stages, load_report, measure_stage, record_stages, WorkerStages
+
+
+class LoadReportTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.report_dir = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_reports(self):
+        return [json.loads(path.read_text()) for path in sorted(self.report_dir.glob("test-*.json"))]
+
+    def test_stages_from_threads_and_workers_are_reported(self):
+        def parse():
+            with measure_stage("parse", bytes_read=100) as stage:
+                stage.rows_out = 10
+
+        with load_report("test", self.report_dir):
+            thread = threading.Thread(target=parse)
+            thread.start()
+            thread.join()
+
+            # As a worker process would, collect stages into a list and send them back to be recorded
+            with collect_stages() as worker_stages:
+                with measure_stage("clean", rows_in=10) as stage:
+                    stage.rows_out = 8
+            record_stages(worker_stages)
+
+        [report] = self.read_reports()
+        stages = {stage["stage"]: stage for stage in report["stages"]}
+        self.assertEqual(set(stages), {"parse", "clean"})
+        self.assertEqual((stages["parse"]["bytes_read"], stages["parse"]["rows_out"]), (100, 10))
+        self.assertEqual((stages["clean"]["rows_in"], stages["clean"]["rows_out"]), (10, 8))
+        for stage in stages.values():
+            self.assertGreaterEqual(stage["wall_seconds"], 0)
+            self.assertGreaterEqual(stage["cpu_seconds"], 0)
+            self.assertGreater(stage["peak_rss_bytes"], 0)
+
+    def test_worker_cpu_is_charged_to_the_stage_that_recorded_it(self):
+        worker_stages = WorkerStages([{"stage": "parse", "cpu_seconds": 5.0}])
+        worker_stages.cpu_seconds = 5.0
+
+        def other_stage():
+            with measure_stage("other"):
+                recorded.wait()
+
+        recorded = threading.Event()
+        with load_report("test", self.report_dir):
+            thread = threading.Thread(target=other_stage)
+            thread.start()
+            with measure_stage("combine"):
+                with measure_stage("gather"):
+                    record_stages(worker_stages)
+            recorded.set()
+            thread.join()
+
+        [report] = self.read_reports()
+        stages = {stage["stage"]: stage for stage in report["stages"]}
+        self.assertGreaterEqual(stages["gather"]["cpu_seconds"], 5.0)
+        self.assertGreaterEqual(stages["combine"]["cpu_seconds"], 5.0)
+        # A stage running in parallel in another thread is not charged for the worker
+        self.assertLess(stages["other"]["cpu_seconds"], 5.0)
+
+    def test_failed_stage_is_reported(self):
+        with self.assertRaises(ValueError):
+            with load_report("test", self.report_dir):
+                with measure_stage("write"):
+                    raise ValueError("bad row")
+
+        [report] = self.read_reports()
+        self.assertEqual(report["stages"][0]["error"], "ValueError: bad row")
+
+    def test_nested_reports_are_merged(self):
+        with load_report("test", self.report_dir):
+            with load_report("inner", self.report_dir):
+                with measure_stage("parse"):
+                    pass
+
+        [report] = self.read_reports()
+        self.assertEqual([stage["stage"] for stage in report["stages"]], ["parse"])
+        self.assertEqual(list(self.report_dir.glob("inner-*.json")), [])
+
+    def test_summary_compares_to_previous_report(self):
+        with load_report("test", self.report_dir) as report:
+            with measure_stage("parse"):
+                pass
+        report.stages[0]["wall_seconds"] = 3.0
+        previous = {"stages": [{"stage": "parse", "wall_seconds": 2.0}]}
+
+        header, rule, parse = report.summary(previous).splitlines()
+        self.assertTrue(header.startswith("stage"))
+        self.assertTrue(header.endswith("wall vs last"))
+        self.assertRegex(parse, r"^parse +3\.00 .* \+50%$")
@@ -0,0 +1,107 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+import tempfile
+import threading
+
+from data.pipeline import Stage
+from jobs.management.commands.load_data import sqlalchemy_engine
+from jobs.models import DataLoadStage
+
+
+class LoadDataCommandTests(TestCase):
+    """
+    load_data with stand-in stages that record when they run, instead of loading data
+    """
+    def setUp(self):
+        self.ran = []
+        self.failing = set()
+        self.lock = threading.Lock()
+
+        def stage(name, *depends_on):
+            def run():
+                if name in self.failing:
+                    raise RuntimeError(f"{name} failed")
+                with self.lock:
+                    self.ran.append(name)
+            return Stage(name, run, depends_on)
+
+        stages = [
+            stage("download"),
+            stage("transitions"),
+            stage("oes", "download"),
+            stage("derived", "oes", "transitions"),
+        ]
+        patcher = mock.patch("jobs.management.commands.load_data.Command.get_stages", return_value=stages)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        report_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(report_dir.cleanup)
+        self.report_dir = Path(report_dir.name)
+        patcher = mock.patch("data.instrumentation.REPORT_DIR", self.report_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def load_data(self, *args):
+        call_command("load_data", *args, stdout=StringIO())
+
+    def completed(self):
+        return set(DataLoadStage.objects.values_list("name", flat=True))
+
+    def test_stages_run_after_their_dependencies(self):
+        self.load_data()
+
+        self.assertEqual(set(self.ran), {"download", "transitions", "oes", "derived"})
+        self.assertLess(self.ran.index("download"), self.ran.index("oes"))
+        self.assertEqual(self.ran[-1], "derived")
+        self.assertEqual(self.completed(), {"download", "transitions", "oes", "derived"})
+        self.assertEqual(len(list(self.report_dir.glob("load_data-*.json"))), 1)
+
+    def test_failed_run_resumes_from_completed_stages(self):
+        self.failing = {"oes"}
+        with self.assertRaises(CommandError):
+            self.load_data()
+        self.assertEqual(self.completed(), {"download", "transitions"})
+        self.assertNotIn("derived", self.ran)
+
+        self.failing = set()
+        self.ran.clear()
+        self.load_data()
+        self.assertEqual(self.ran, ["oes", "derived"])
+        self.assertEqual(self.completed(), {"download", "transitions", "oes", "derived"})
+
+    def test_named_stages_run_with_their_dependencies(self):
+        self.load_data("oes")
+        self.assertEqual(self.ran, ["download", "oes"])
+
+    def test_skipped_stages_are_not_run(self):
+        self.load_data("--skip", "download")
+        self.assertNotIn("download", self.ran)
+        self.assertIn("oes", self.ran)
+        self.assertNotIn("download", self.completed())
+
+    def test_force_reruns_stages_and_their_dependents(self):
+        self.load_data()
+        self.ran.clear()
+
+        self.load_data("--force", "transitions")
+        self.assertEqual(self.ran, ["transitions", "derived"])
+        self.assertEqual(self.completed(), {"download", "transitions", "oes", "derived"})
+
+        self.ran.clear()
+        self.load_data()
+        self.assertEqual(self.ran, [])
+
+    def test_unknown_stage_is_an_error(self):
+        with self.assertRaises(CommandError):
+            self.load_data("nonexistent")
+        self.assertEqual(self.ran, [])
+
+    def test_non_postgres_database_is_rejected(self):
+        with self.assertRaisesMessage(CommandError, "load_data loads into Postgres"):
+            sqlalchemy_engine(connection)
@@ -0,0 +1,60 @@
+from django.test import SimpleTestCase
+from pathlib import Path
+import hashlib
+import tempfile
+
+import pandas as pd
+
+from data.bls.utils.oes_cache import OESParquetCache, file_sha256
+
+
+class OESParquetCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = OESParquetCache(Path(self.tmpdir.name))
+        self.data = pd.DataFrame({
+            "soc_code": ["29-1141", "53-3032"],
+            "hourly_mean_wage": [38.47, None],
+            "total_employment": pd.array([2982280, None], dtype="Int64"),
+            "total_employment_suppressed": [False, True],
+        })
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_keeps_column_types(self):
+        self.cache.save("2019", self.data, source_sha256="abc", cleaner_version=4)
+
+        loaded = self.cache.load("2019")
+        pd.testing.assert_frame_equal(loaded, self.data)
+        self.assertEqual(self.cache.metadata("2019"), {"year": "2019", "source_sha256": "abc", "cleaner_version": 4})
+        self.assertFalse(self.cache.path("2019").with_suffix(".parquet.part").exists())
+
+    def test_entries_are_keyed_by_year_source_and_cleaner_version(self):
+        self.cache.save("2019", self.data, source_sha256="abc", cleaner_version=4)
+
+        self.assertTrue(self.cache.is_valid("2019", 4))
+        self.assertTrue(self.cache.is_valid("2019", 4, source_sha256="abc"))
+        # A changed workbook or cleaning code invalidates the entry
+        self.assertFalse(self.cache.is_valid("2019", 4, source_sha256="def"))
+        self.assertFalse(self.cache.is_valid("2019", 5))
+        self.assertFalse(self.cache.is_valid("2018", 4))
+
+    def test_entry_saved_for_another_year_is_invalid(self):
+        self.cache.save("2018", self.data, source_sha256="abc", cleaner_version=4)
+        self.cache.path("2018").rename(self.cache.path("2019"))
+
+        self.assertFalse(self.cache.is_valid("2019", 4))
+
+    def test_unreadable_entry_is_invalid(self):
+        self.cache.path("2019").write_bytes(b"not parquet")
+
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(self.cache.metadata("2019"))
+        self.assertFalse(self.cache.is_valid("2019", 4))
+
+    def test_file_sha256(self):
+        path = Path(self.tmpdir.name) / "workbook.xlsx"
+        path.write_bytes(b"workbook")
+
+        self.assertEqual(file_sha256(path, chunk_size=3), hashlib.sha256(b"workbook").hexdigest())
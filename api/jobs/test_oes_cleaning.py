@@ -0,0 +1,76 @@
+from django.test import SimpleTestCase
+import pandas as pd
+
+from data.bls.oes_data_downloader import OESDataDownloader
+from data.bls.utils.constants import OES_XLSX_PARAMS, OES_HOURLY_PERCENTILE_COLUMNS, OES_ANNUAL_PERCENTILE_COLUMNS
+from data.bls.utils.dtype_conversion import to_numeric_flagged
+from data.bls.utils.wage_percentiles import unpack_wage_percentiles
+
+MARKERS = OES_XLSX_PARAMS["na_values"]
+
+
+class ToNumericFlaggedTests(SimpleTestCase):
+    def test_markers_are_na_and_flagged(self):
+        numbers, suppressed = to_numeric_flagged(pd.Series(["12.5", "*", "**", "#", None, " 7 ", "n/a"]), MARKERS)
+
+        self.assertEqual(numbers.tolist()[0], 12.5)
+        self.assertEqual(numbers.tolist()[5], 7.0)
+        self.assertTrue(numbers.iloc[[1, 2, 3, 4, 6]].isna().all())
+        # Missing values and other text are NA too, but were not suppressed by BLS
+        self.assertEqual(suppressed.tolist(), [False, True, True, True, False, False, False])
+
+    def test_integer_columns_are_nullable(self):
+        numbers, suppressed = to_numeric_flagged(pd.Series(["1200", "**", "35.0"]), MARKERS, integer=True)
+
+        self.assertEqual(str(numbers.dtype), "Int64")
+        self.assertEqual(numbers.tolist(), [1200, pd.NA, 35])
+        self.assertEqual(suppressed.tolist(), [False, True, False])
+
+    def test_numeric_columns_are_not_suppressed(self):
+        numbers, suppressed = to_numeric_flagged(pd.Series([1.5, None]), MARKERS)
+
+        self.assertEqual(numbers.iloc[0], 1.5)
+        self.assertFalse(suppressed.any())
+
+
+class CleanOESDataTests(SimpleTestCase):
+    def workbook_rows(self) -> pd.DataFrame:
+        """
+        Rows as the downloader reads them from a workbook: every value as text, with the footnote markers kept
+        """
+        rows = pd.DataFrame({
+            "area": ["99", "25", "25"],
+            "area_title": ["U.S.", "Massachusetts", "Massachusetts"],
+            "area_type": ["1", "2", "2"],
+            "naics": ["000000", "000000", "622100"],
+            "occ_code": ["29-1141", " 53-3032 ", "29-1141"],
+            "occ_title": ["Registered Nurses", "Heavy and Tractor-Trailer Truck Drivers", "Registered Nurses"],
+            "h_mean": ["38.47", "*", "45"],
+            "a_mean": ["80010", "#", "93600"],
+            "tot_emp": ["2982280", "**", "40000"],
+        })
+        for columns in [OES_HOURLY_PERCENTILE_COLUMNS, OES_ANNUAL_PERCENTILE_COLUMNS]:
+            for position, name in enumerate(columns):
+                rows[name] = [str(10 * (position + 1)), "#", "1"]
+        return rows
+
+    def test_cross_industry_rows_are_cleaned_with_suppressed_flags(self):
+        cleaned = OESDataDownloader(year="2019")._clean_oes_data(self.workbook_rows())
+
+        self.assertEqual(cleaned["soc_code"].tolist(), ["29-1141", "53-3032"])
+        self.assertEqual(cleaned["area_code"].tolist(), ["99", "25"])
+        self.assertEqual(cleaned["hourly_mean_wage"].iloc[0], 38.47)
+        self.assertEqual(str(cleaned["total_employment"].dtype), "Int64")
+        self.assertEqual(cleaned["total_employment"].iloc[0], 2982280)
+
+        massachusetts = cleaned.iloc[1]
+        self.assertTrue(pd.isna(massachusetts["hourly_mean_wage"]))
+        self.assertTrue(pd.isna(massachusetts["annual_mean_wage"]))
+        self.assertTrue(pd.isna(massachusetts["total_employment"]))
+        self.assertEqual(cleaned["hourly_mean_wage_suppressed"].tolist(), [False, True])
+        self.assertEqual(cleaned["annual_mean_wage_suppressed"].tolist(), [False, True])
+        self.assertEqual(cleaned["total_employment_suppressed"].tolist(), [False, True])
+
+        hourly = unpack_wage_percentiles(cleaned["hourly_wage_percentiles"])
+        self.assertEqual(hourly[0].tolist(), [10, 20, 30, 40, 50])
+        self.assertTrue(pd.isna(hourly[1]).all())
@@ -0,0 +1,134 @@
+from django.test import SimpleTestCase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+from zipfile import ZipFile
+import tempfile
+import threading
+
+from data.bls.oes_data_downloader import OESDataDownloader
+from data.bls.utils.oes_download import download_file, DownloadManifest
+
+
+class StubBlsHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the BLS site: the OES tables page and the zip files it links to, with ETag validation and
+    Range requests. Set server.files to the bytes to serve by path.
+    """
+    def do_GET(self):
+        self.server.requests_seen.append((self.path, dict(self.headers)))
+        if self.path == "/oes/tables.htm":
+            links = "".join(f'<a href="{path.lstrip("/")}">{path}</a>' for path in self.server.files)
+            return self.respond(200, f"<html><body>{links}</body></html>".encode())
+
+        body = self.server.files.get(self.path)
+        if body is None:
+            return self.respond(404, b"")
+
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.respond(304, b"", etag=etag)
+
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", etag) == etag:
+            start = int(range_header[len("bytes="):].rstrip("-"))
+            if start >= len(body):
+                return self.respond(416, b"")
+            return self.respond(206, body[start:], etag=etag)
+        return self.respond(200, body, etag=etag)
+
+    def respond(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def oes_zip(year: str, workbook: bytes) -> bytes:
+    zipped = BytesIO()
+    with ZipFile(zipped, "w") as archive:
+        archive.writestr(f"oesm{year[2:]}all/all_data_M_{year}.xlsx", workbook)
+        archive.writestr(f"oesm{year[2:]}all/file_descriptions.xlsx", b"not needed")
+    return zipped.getvalue()
+
+
+class OESDownloadTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubBlsHandler)
+        self.server.files = {}
+        self.server.requests_seen = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/"
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.download_dir = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_download_is_conditional_once_downloaded(self):
+        self.server.files["/file.zip"] = b"x" * 1000
+        path = self.download_dir / "file.zip"
+
+        first = download_file(f"{self.base_url}file.zip", path)
+        self.assertTrue(first["changed"])
+        self.assertEqual(path.read_bytes(), b"x" * 1000)
+
+        second = download_file(f"{self.base_url}file.zip", path, etag=first["etag"])
+        self.assertFalse(second["changed"])
+        self.assertEqual(self.server.requests_seen[-1][1]["If-None-Match"], first["etag"])
+
+    def test_interrupted_download_resumes(self):
+        body = bytes(range(256)) * 100
+        self.server.files["/file.zip"] = body
+        path = self.download_dir / "file.zip"
+        etag = f'"{hash(body)}"'
+        (self.download_dir / "file.zip.part").write_bytes(body[:5000])
+        (self.download_dir / "file.zip.part.validator").write_text(etag)
+
+        download_file(f"{self.base_url}file.zip", path)
+
+        self.assertEqual(path.read_bytes(), body)
+        self.assertEqual(self.server.requests_seen[-1][1]["Range"], "bytes=5000-")
+        self.assertFalse((self.download_dir / "file.zip.part").exists())
+
+    def test_download_restarts_if_file_changed_since_interruption(self):
+        self.server.files["/file.zip"] = b"new" * 1000
+        path = self.download_dir / "file.zip"
+        (self.download_dir / "file.zip.part").write_bytes(b"old" * 100)
+        (self.download_dir / "file.zip.part.validator").write_text('"stale"')
+
+        download_file(f"{self.base_url}file.zip", path)
+
+        self.assertEqual(path.read_bytes(), b"new" * 1000)
+
+    def test_downloader_uses_manifest_and_extracts_workbook_only(self):
+        self.server.files["/oes/special.requests/oesm19all.zip"] = oes_zip("2019", b"workbook")
+
+        with mock.patch.dict("os.environ", {"BLS_BASE_URL": self.base_url}):
+            downloader = OESDataDownloader(year="2019")
+            downloader.download_dir = self.download_dir
+            downloader.manifest = DownloadManifest(self.download_dir / "manifest.json")
+            workbook = downloader._download_workbook()
+
+            self.assertEqual(workbook.read_bytes(), b"workbook")
+            self.assertEqual([path.name for path in (self.download_dir / "oesm19all").iterdir()],
+                             ["all_data_M_2019.xlsx"])
+
+            # A new downloader resolves the URL from the manifest, and an unchanged zip is not downloaded again
+            downloader = OESDataDownloader(year="2019")
+            downloader.download_dir = self.download_dir
+            downloader.manifest = DownloadManifest(self.download_dir / "manifest.json")
+            self.assertEqual(downloader._download_workbook(refresh=True), workbook)
+
+        paths = [path for path, headers in self.server.requests_seen]
+        self.assertEqual(paths.count("/oes/tables.htm"), 1)
+        self.assertIn("If-None-Match", self.server.requests_seen[-1][1])
@@ -0,0 +1,79 @@
+from django.test import SimpleTestCase
+from openpyxl import Workbook
+from pathlib import Path
+import tempfile
+
+import pandas as pd
+
+from data.bls.utils.oes_xlsx_reader import read_oes_xlsx, iter_oes_xlsx, CROSS_INDUSTRY_NAICS
+
+
+class OESXlsxReaderTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.workbook = Path(self.tmpdir.name) / "all_data_M_2019.xlsx"
+
+        workbook = Workbook()
+        sheet = workbook.active
+        # Headers are upper case in the workbooks, and columns the reader does not need are mixed in
+        sheet.append(["AREA", "AREA_TITLE", "AREA_TYPE", "PRIM_STATE", "NAICS", "NAICS_TITLE", "OCC_CODE", "OCC_TITLE",
+                      "TOT_EMP", "H_MEAN", "A_MEAN"])
+        sheet.append(["99", "U.S.", "1", "US", "000000", "Cross-industry", "29-1141", "Registered Nurses", 2982280,
+                      38.47, 80010])
+        sheet.append(["99", "U.S.", "1", "US", "622100", "Hospitals", "29-1141", "Registered Nurses", 1700000, 40.5,
+                      84240])
+        sheet.append(["25", "Massachusetts", "2", "MA", "000000", "Cross-industry", "53-3032",
+                      " Heavy and Tractor-Trailer Truck Drivers ", "**", "*", "#"])
+        # Empty cells are left out of the sheet XML
+        sheet.append(["25", "Massachusetts", "2", "MA", "000000", "Cross-industry", "29-1141", "Registered Nurses",
+                      None, 45, None])
+        workbook.save(self.workbook)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reads_requested_columns_of_cross_industry_rows(self):
+        data = read_oes_xlsx(self.workbook, columns=["occ_code", "area", "h_mean", "tot_emp", "occ_title"])
+
+        self.assertEqual(list(data.columns), ["occ_code", "area", "h_mean", "tot_emp", "occ_title", "prim_state"])
+        self.assertEqual(data["occ_code"].tolist(), ["29-1141", "53-3032", "29-1141"])
+        self.assertEqual(data["prim_state"].tolist(), ["US", "MA", "MA"])
+        self.assertEqual(data["occ_title"].iloc[1], "Heavy and Tractor-Trailer Truck Drivers")
+
+        # Footnote markers and empty cells are NA, and integer columns are nullable
+        self.assertEqual(data["h_mean"].iloc[0], 38.47)
+        self.assertTrue(pd.isna(data["h_mean"].iloc[1]))
+        self.assertEqual(data["h_mean"].iloc[2], 45)
+        self.assertEqual(str(data["tot_emp"].dtype), "Int64")
+        self.assertEqual(data["tot_emp"].iloc[0], 2982280)
+        self.assertTrue(pd.isna(data["tot_emp"].iloc[1]))
+        self.assertTrue(pd.isna(data["tot_emp"].iloc[2]))
+
+    def test_values_are_text_without_dtypes(self):
+        data = read_oes_xlsx(self.workbook, columns=["h_mean", "a_mean"], dtype={}, na_values=[],
+                             optional_columns=[])
+
+        self.assertEqual(data["h_mean"].tolist(), ["38.47", "*", "45"])
+        self.assertEqual(data["a_mean"].tolist(), ["80010", "#", None])
+
+    def test_every_industry_and_column(self):
+        data = read_oes_xlsx(self.workbook, columns=None, naics=None)
+
+        self.assertEqual(len(data), 4)
+        self.assertEqual(data["naics"].tolist(), ["000000", "622100", "000000", "000000"])
+        self.assertIn("naics_title", data.columns)
+
+    def test_chunks_exclude_an_industry(self):
+        chunks = list(iter_oes_xlsx(self.workbook,
+                                    columns=["area", "occ_code"],
+                                    naics=None,
+                                    exclude_naics="622100",
+                                    optional_columns=[],
+                                    chunk_rows=2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(pd.concat(chunks)["area"].tolist(), ["99", "25", "25"])
+
+    def test_missing_column_is_an_error(self):
+        with self.assertRaises(ValueError):
+            read_oes_xlsx(self.workbook, columns=["area", "h_pct10"], naics=CROSS_INDUSTRY_NAICS)
@@ -0,0 +1,53 @@
+from django.test import TestCase
+from unittest import mock
+
+from .cache import OnetKeywordCache
+
+
+class OnetKeywordCacheTests(TestCase):
+    def setUp(self):
+        self.onet_cache = OnetKeywordCache()
+        self.onet_cache.cache.clear()
+        self.onet_cache.reset_stats()
+
+    def test_normalized_keywords_share_an_entry(self):
+        """
+        Make sure that differently-cased/spaced keywords are served from the same entry
+        """
+        self.onet_cache.set("Registered  Nurse ", limit=10, soc_codes=["29-1141", "29-1171"])
+        self.assertEqual(self.onet_cache.get("registered nurse", limit=10), ["29-1141", "29-1171"])
+
+    def test_larger_limit_satisfies_smaller_limit(self):
+        """
+        Make sure that a cached result for a larger limit answers smaller limits, but not larger ones
+        """
+        soc_codes = ["53-3032", "53-3033", "53-3031", "53-7051"]
+        self.onet_cache.set("driver", limit=4, soc_codes=soc_codes)
+
+        self.assertEqual(self.onet_cache.get("driver", limit=2), soc_codes[:2])
+        self.assertIsNone(self.onet_cache.get("driver", limit=10))
+        self.assertEqual(self.onet_cache.stats()["hits"], 1)
+        self.assertEqual(self.onet_cache.stats()["misses"], 1)
+
+    def test_complete_result_satisfies_any_limit(self):
+        """
+        Make sure that a result with fewer codes than its limit is treated as complete
+        """
+        self.onet_cache.set("astronaut", limit=10, soc_codes=["11-9121"])
+        self.assertEqual(self.onet_cache.get("astronaut", limit=50), ["11-9121"])
+
+    def test_lookups_do_not_write_to_the_cache(self):
+        """
+        Make sure that counting hits and misses does not add cache writes (database round trips) to lookups
+        """
+        self.onet_cache.set("nurse", limit=10, soc_codes=["29-1141"])
+        with mock.patch.object(self.onet_cache.cache, "set") as cache_set, \
+                mock.patch.object(self.onet_cache.cache, "add") as cache_add, \
+                mock.patch.object(self.onet_cache.cache, "incr") as cache_incr:
+            self.onet_cache.get("nurse", limit=10)
+            self.onet_cache.get("welder", limit=10)
+
+        for method in [cache_set, cache_add, cache_incr]:
+            method.assert_not_called()
+        self.assertEqual(self.onet_cache.stats()["hits"], 1)
+        self.assertEqual(self.onet_cache.stats()["misses"], 1)
@@ -0,0 +1,103 @@
+from django.test import SimpleTestCase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import json
+import threading
+import time
+import requests
+
+from .onet import OnetClient, CircuitBreaker, CircuitBreakerOpen
+
+
+class StubOnetHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the O*NET keyword search endpoint. Set server.delay to simulate a slow O*NET, and
+    server.garbled to answer with a body that is not JSON.
+    """
+    def do_GET(self):
+        self.server.requests_seen += 1
+        time.sleep(self.server.delay)
+
+        query = parse_qs(urlparse(self.path).query)
+        body = json.dumps({
+            "keyword": query["keyword"][0],
+            "career": [{"code": "29-1141.00", "title": "Registered Nurses"}][:int(query["end"][0])],
+        }).encode()
+        if self.server.garbled:
+            body = b"<html>Service Unavailable</html>"
+
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class OnetClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubOnetHandler)
+        self.server.delay = 0
+        self.server.garbled = False
+        self.server.requests_seen = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.client = OnetClient(username="user",
+                                 password="password",
+                                 base_url=f"http://127.0.0.1:{self.server.server_port}/",
+                                 read_timeout=0.2,
+                                 circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_search_keyword(self):
+        """
+        Make sure that keyword searches are parsed from the O*NET response
+        """
+        response = self.client.search_keyword("nurse", limit=10)
+        self.assertEqual(response["keyword"], "nurse")
+        self.assertEqual(response["career"][0]["code"], "29-1141.00")
+
+    def test_circuit_breaker_opens_after_timeouts(self):
+        """
+        Make sure that slow responses time out, and that the breaker stops requests once it opens
+        """
+        self.server.delay = 0.5
+        for _ in range(2):
+            with self.assertRaises(requests.RequestException):
+                self.client.search_keyword("nurse")
+
+        with self.assertRaises(CircuitBreakerOpen):
+            self.client.search_keyword("nurse")
+        self.assertEqual(self.server.requests_seen, 2)
+
+    def test_invalid_responses_count_as_failures(self):
+        """
+        Make sure that responses that are not JSON open the breaker, and that a failed trial request re-opens it
+        instead of leaving it waiting for the trial forever
+        """
+        self.server.garbled = True
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.client.search_keyword("nurse")
+        self.assertEqual(self.client.circuit_breaker.state, CircuitBreaker.OPEN)
+
+        # Half-open: the trial request fails too
+        self.client.circuit_breaker.opened_at -= 60
+        with self.assertRaises(ValueError):
+            self.client.search_keyword("nurse")
+        self.assertEqual(self.client.circuit_breaker.state, CircuitBreaker.OPEN)
+
+        # The next trial is allowed through, and closes the breaker
+        self.server.garbled = False
+        self.client.circuit_breaker.opened_at -= 60
+        self.assertEqual(self.client.search_keyword("nurse")["keyword"], "nurse")
+        self.assertEqual(self.client.circuit_breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.server.requests_seen, 4)
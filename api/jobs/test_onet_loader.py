@@ -0,0 +1,185 @@
+from django.test import SimpleTestCase
+from pathlib import Path
+import tempfile
+
+from data.scripts.bulk_copy import frame_column_types
+from data.scripts.onet_loader import (parse_onet_dump, read_onet_table, read_onet_tools, read_onet_emerging_tasks,
+                                      read_onet_occupation_phrases, PHRASE_COLUMNS)
+
+# Small dumps in the SQLiteStudio format of data/onet. The last tools INSERT carries more rows as tab-separated text
+# in its Example column, like the real dump.
+TOOLS_DUMP = """\
+--
+-- File generated with SQLiteStudio v3.2.1
+--
+PRAGMA foreign_keys = off;
+BEGIN TRANSACTION;
+
+-- Table: onet_tools_used
+DROP TABLE IF EXISTS onet_tools_used;
+
+CREATE TABLE onet_tools_used (
+    [O*NET-SOC Code],
+    Example,
+    [Commodity Code],
+    [Commodity Title]
+);
+
+INSERT INTO onet_tools_used (
+                                [O*NET-SOC Code],
+                                Example,
+                                [Commodity Code],
+                                [Commodity Title]
+                            )
+                            VALUES (
+                                '11-1011.00',
+                                '10-key calculators',
+                                '44101809',
+                                'Desktop calculator'
+                            );
+
+INSERT INTO onet_tools_used (
+                                [O*NET-SOC Code],
+                                Example,
+                                [Commodity Code],
+                                [Commodity Title]
+                            )
+                            VALUES (
+                                '29-1141.01',
+                                'Nurses'' call systems; bedside',
+                                '42192104',
+                                'Nurse call systems'
+                            );
+
+INSERT INTO onet_tools_used (
+                                [O*NET-SOC Code],
+                                Example,
+                                [Commodity Code],
+                                [Commodity Title]
+                            )
+                            VALUES (
+                                '29-1141.00',
+                                'Stethoscopes\t42181604\tStethoscopes
+29-1141.00\tBlood pressure cuffs\t42181612\tBlood pressure cuffs
+53-3032.00\tTractor trailers\t25101802\tTrailers
+
+',
+                                NULL,
+                                NULL
+                            );
+
+COMMIT TRANSACTION;
+PRAGMA foreign_keys = on;
+"""
+
+TASKS_DUMP = """\
+-- Table: onet_emerging_tasks
+DROP TABLE IF EXISTS onet_emerging_tasks;
+
+CREATE TABLE onet_emerging_tasks (
+    [O*NET-SOC Code],
+    Task,
+    Category,
+    [Write-in Total],
+    Date
+);
+
+INSERT INTO onet_emerging_tasks (
+                                    [O*NET-SOC Code],
+                                    Task,
+                                    Category,
+                                    [Write-in Total],
+                                    Date
+                                )
+                                VALUES (
+                                    '29-1141.00',
+                                    'Monitor patients using telehealth; escalate.',
+                                    'New',
+                                    12,
+                                    '07/2019'
+                                );
+
+INSERT INTO onet_emerging_tasks (
+                                    [O*NET-SOC Code],
+                                    Task,
+                                    Category,
+                                    [Write-in Total],
+                                    Date
+                                )
+                                VALUES (
+                                    '29-1141.01',
+                                    '  Stethoscopes  ',
+                                    'Revision',
+                                    NULL,
+                                    '07/2019'
+                                );
+
+COMMIT TRANSACTION;
+"""
+
+
+class OnetLoaderTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.onet_dir = Path(self.tmpdir.name)
+        (self.onet_dir / "onet_tools_used.sql").write_text(TOOLS_DUMP, encoding="utf-8")
+        (self.onet_dir / "onet_emerging_tasks.sql").write_text(TASKS_DUMP, encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_parse_dump(self):
+        table_name, columns, rows = parse_onet_dump(self.onet_dir / "onet_emerging_tasks.sql")
+
+        self.assertEqual(table_name, "onet_emerging_tasks")
+        self.assertEqual(columns, ["O*NET-SOC Code", "Task", "Category", "Write-in Total", "Date"])
+        self.assertEqual(list(rows), [
+            ("29-1141.00", "Monitor patients using telehealth; escalate.", "New", 12, "07/2019"),
+            ("29-1141.01", "  Stethoscopes  ", "Revision", None, "07/2019"),
+        ])
+
+    def test_packed_tools_record_is_expanded(self):
+        tools = read_onet_tools(self.onet_dir / "onet_tools_used.sql")
+
+        self.assertEqual(list(tools.columns), ["onet_soc_code", "example", "commodity_code", "commodity_title"])
+        self.assertEqual(len(tools), 5)
+        self.assertEqual(tools["example"].tolist(), ["10-key calculators", "Nurses' call systems; bedside",
+                                                     "Stethoscopes", "Blood pressure cuffs", "Tractor trailers"])
+        self.assertEqual(tools.iloc[2].tolist(), ["29-1141.00", "Stethoscopes", "42181604", "Stethoscopes"])
+        self.assertEqual(tools.iloc[4].tolist(), ["53-3032.00", "Tractor trailers", "25101802", "Trailers"])
+
+    def test_tables_are_normalized(self):
+        table_name, table = read_onet_table(self.onet_dir / "onet_emerging_tasks.sql")
+
+        self.assertEqual(table_name, "onet_emerging_tasks")
+        self.assertEqual(list(table.columns), ["soc_code", "onet_soc_code", "task", "category", "write_in_total",
+                                               "date"])
+        self.assertEqual(table["soc_code"].tolist(), ["29-1141", "29-1141"])
+        self.assertEqual(len(read_onet_emerging_tasks(self.onet_dir / "onet_emerging_tasks.sql")), 2)
+
+    def test_occupation_phrases(self):
+        phrases = read_onet_occupation_phrases(self.onet_dir)
+
+        self.assertEqual(list(phrases.columns), PHRASE_COLUMNS)
+        self.assertEqual(len(phrases), 7)
+        self.assertEqual(phrases["source"].value_counts().to_dict(), {"tool": 5, "emerging_task": 2})
+        # Phrases are stripped, and tasks have no category
+        tasks = phrases[phrases["source"] == "emerging_task"]
+        self.assertEqual(tasks["phrase"].tolist(), ["Monitor patients using telehealth; escalate.", "Stethoscopes"])
+        self.assertEqual(tasks["category"].tolist(), ["", ""])
+        self.assertEqual(sorted(phrases["soc_code"].unique()), ["11-1011", "29-1141", "53-3032"])
+
+    def test_postgres_column_types_follow_the_parsed_values(self):
+        table_name, table = read_onet_table(self.onet_dir / "onet_emerging_tasks.sql")
+        table["n"] = [3, 4]
+
+        # As to_sql types them on SQLite, so numbers compare and sort as numbers on both databases
+        self.assertEqual(frame_column_types(table), {
+            "soc_code": "text",
+            "onet_soc_code": "text",
+            "task": "text",
+            "category": "text",
+            "write_in_total": "double precision",
+            "date": "text",
+            "n": "bigint",
+        })
@@ -0,0 +1,61 @@
+from django.test import SimpleTestCase
+from pathlib import Path
+import os
+import tempfile
+
+import pandas as pd
+
+from data.scripts.transitions_reader import read_occupation_transitions, TRANSITIONS_CSV_DTYPES
+
+TRANSITIONS_CSV = """\
+"","soc1","soc1_name","soc2","soc2_name","total_obs","transition_share"
+"1","11-1011","Chief Executives","11-1021","General and Operations Managers",1506.5,0.25
+"2","11-1011","Chief Executives","11-2022","Sales Managers",1506.5,0.125
+"3","11-1011","Chief Executives",NA,NA,1506.5,0.5
+"4","29-1141","Registered Nurses","29-2061","Licensed Practical and Licensed Vocational Nurses",98211.25,0.0375
+"5","29-1141","Registered Nurses","11-1021","General and Operations Managers",98211.25,0.01
+"6","53-3032","Heavy and Tractor-Trailer Truck Drivers","53-7062","Laborers and Freight, Stock, and Material Movers",40000,0.08
+"7","53-3032","Heavy and Tractor-Trailer Truck Drivers","11-1021","General and Operations Managers",40000,0.002
+"""
+
+
+class TransitionsReaderTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "occupation_transitions_public_data_set.csv"
+        self.path.write_text(TRANSITIONS_CSV)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_chunked_read_matches_one_shot_read(self):
+        expected = pd.read_csv(self.path, na_values=["NA"], usecols=list(TRANSITIONS_CSV_DTYPES))[
+            list(TRANSITIONS_CSV_DTYPES)]
+
+        # Chunks of 2 rows split source SOC codes across chunks, and each chunk has its own categories
+        for chunk_rows in [2, 3, 100]:
+            data = read_occupation_transitions(self.path, chunk_rows=chunk_rows)
+
+            transitions = data.transitions.astype({name: object for name, dtype in TRANSITIONS_CSV_DTYPES.items()
+                                                   if dtype == "category"})
+            pd.testing.assert_frame_equal(transitions, expected, check_dtype=False)
+            self.assertEqual(data.source_socs, {"11-1011", "29-1141", "53-3032"})
+            self.assertEqual(data.total_obs.to_dict(), expected.groupby("soc1")["total_obs"].first().to_dict())
+
+    def test_codes_and_names_are_categorical(self):
+        transitions = read_occupation_transitions(self.path, chunk_rows=2).transitions
+
+        self.assertEqual(str(transitions["soc1"].dtype), "category")
+        self.assertEqual(sorted(transitions["soc2"].cat.categories),
+                         ["11-1021", "11-2022", "29-2061", "53-7062"])
+        self.assertTrue(transitions["soc2"].isna().iloc[2])
+
+    def test_reads_are_memoized_until_the_file_changes(self):
+        first = read_occupation_transitions(self.path)
+        self.assertIs(read_occupation_transitions(self.path), first)
+
+        self.path.write_text(TRANSITIONS_CSV.rsplit("\n", 2)[0] + "\n")
+        # File timestamps can be coarser than the time between the writes
+        modified_ns = self.path.stat().st_mtime_ns + 10 ** 9
+        os.utime(self.path, ns=(modified_ns, modified_ns))
+        self.assertEqual(len(read_occupation_transitions(self.path).transitions), 6)
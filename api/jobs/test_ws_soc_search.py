@@ -0,0 +1,115 @@
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from unittest import mock
+import asyncio
+import json
+import time
+
+from .api import SocListSmartViewSet
+from .consumers import SocSearchConsumer
+from .models import SocDescription
+from .search import soc_title_corpus
+
+
+class SocSearchConsumerTests(TestCase):
+    def setUp(self):
+        SocDescription.objects.create(soc_code="29-1141", soc_title="Registered Nurses", total_transition_obs=5000)
+        SocDescription.objects.create(soc_code="53-3032", soc_title="Heavy and Tractor-Trailer Truck Drivers",
+                                      total_transition_obs=8000)
+        soc_title_corpus.clear()
+
+    def tearDown(self):
+        soc_title_corpus.clear()
+
+    def converse(self, queries, expected_messages):
+        """
+        Connect to the consumer, send the queries back to back, and collect the expected number of messages.
+        Connections are not closed between queries here, since that would end the test's transaction.
+        """
+        with mock.patch("jobs.consumers.close_old_connections") as close_old_connections:
+            accepted, messages = self._converse(queries, expected_messages)
+        self.close_old_connections_calls = close_old_connections.call_count
+        return accepted, messages
+
+    @staticmethod
+    @async_to_sync
+    async def _converse(queries, expected_messages):
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        consumer = asyncio.ensure_future(SocSearchConsumer({"type": "websocket"}, inbox.get, outbox.put).run())
+
+        await inbox.put({"type": "websocket.connect"})
+        accepted = await outbox.get()
+        for query in queries:
+            await inbox.put({"type": "websocket.receive", "text": json.dumps(query)})
+
+        messages = [json.loads((await asyncio.wait_for(outbox.get(), timeout=5))["text"])
+                    for _ in range(expected_messages)]
+
+        await inbox.put({"type": "websocket.disconnect"})
+        await consumer
+        return accepted, messages
+
+    def test_streams_local_then_onet_results(self):
+        """
+        Make sure that local matches are sent first, followed by results including O*NET matches
+        """
+        with mock.patch.object(SocListSmartViewSet, "search_onet_keyword",
+                               return_value={"career": [{"code": "53-3032.00"}]}):
+            accepted, messages = self.converse([{"id": 1, "keyword_search": "nurse"}], expected_messages=2)
+
+        self.assertEqual(accepted["type"], "websocket.accept")
+        self.assertEqual([message["stage"] for message in messages], ["local", "onet"])
+        self.assertEqual([soc["soc_code"] for soc in messages[0]["results"]], ["29-1141"])
+        self.assertEqual([soc["soc_code"] for soc in messages[1]["results"]], ["29-1141", "53-3032"])
+
+    def test_newer_query_cancels_outstanding_query(self):
+        """
+        Make sure that only the latest query's results are streamed when queries arrive while one is running
+        """
+        def slow_onet_search(keyword, limit):
+            time.sleep(0.2)
+            return {"career": []}
+
+        with mock.patch.object(SocListSmartViewSet, "search_onet_keyword", side_effect=slow_onet_search):
+            accepted, messages = self.converse([{"id": 1, "keyword_search": "nur"},
+                                                {"id": 2, "keyword_search": "truck"}],
+                                               expected_messages=2)
+
+        self.assertEqual([message["id"] for message in messages], [2, 2])
+
+    def test_invalid_query_is_answered_with_an_error(self):
+        """
+        Make sure that a query with invalid parameters gets an error message rather than closing the connection
+        """
+        accepted, [message] = self.converse([{"id": 1, "keyword_search": "nurse", "onet_limit": "abc"}],
+                                            expected_messages=1)
+
+        self.assertEqual(message["id"], 1)
+        self.assertIn("onet_limit", message["error"])
+
+    def test_connections_are_refreshed_around_each_query(self):
+        """
+        Make sure that old database connections are closed before and after each query's database work, since a
+        socket can stay open for longer than CONN_MAX_AGE
+        """
+        with mock.patch.object(SocListSmartViewSet, "search_onet_keyword", return_value=None):
+            self.converse([{"id": 1, "keyword_search": "nurse"}], expected_messages=2)
+
+        # Once around each of fuzzy_search, match and the two combine_smart_search calls with the trigram backend;
+        # the in-memory corpus only needs the database for fuzzy_search
+        self.assertEqual(self.close_old_connections_calls, 2)
+
+    def test_queries_beyond_the_rate_limit_are_throttled(self):
+        """
+        Make sure that a connection sending queries faster than the rate limit gets errors for the extra queries
+        """
+        with mock.patch.object(SocListSmartViewSet, "search_onet_keyword", return_value=None), \
+                mock.patch.object(SocSearchConsumer, "RATE_LIMIT", 1):
+            accepted, messages = self.converse([{"id": 1, "keyword_search": "nurse"},
+                                                {"id": 2, "keyword_search": "truck"}],
+                                               expected_messages=3)
+
+        # The throttled query does not cancel the one before it
+        errors = {message["id"]: message.get("error") for message in messages}
+        self.assertEqual(errors, {1: None, 2: "Query was throttled."})
+        self.assertEqual([message["stage"] for message in messages if message["id"] == 1], ["local", "onet"])
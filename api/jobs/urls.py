@@ -1,24 +1,36 @@
 from django.urls import path, include
-# from . import views # Relevant ViewSets are contained in api.py
+# from . import views # Relevant ViewSets are contained in api.py; async views are in async_api.py
 # from django.conf.urls import url
 from rest_framework import routers
 from .api import (
     SocListSimpleViewSet,
     BlsOesViewSet,
     StateViewSet,
+    AreaViewSet,
+    IndustryViewSet,
     OccupationTransitionsViewSet,
     BlsTransitionsViewSet,
-    SocListSmartViewSet
+    WageTrendsViewSet,
+    SocListSmartViewSet,
+    SocAutocompleteViewSet,
+    SocToolSearchViewSet,
 )
+from . import async_api
 
 router = routers.DefaultRouter()
 router.register("transitions", OccupationTransitionsViewSet)
 router.register("soc-codes", BlsOesViewSet)
 router.register("soc-list", SocListSimpleViewSet)
 router.register("state", StateViewSet, basename="abbr")
+router.register("areas", AreaViewSet)
+router.register("industries", IndustryViewSet)
 router.register("transitions-extended", BlsTransitionsViewSet, basename="lol")
+router.register("wage-trends", WageTrendsViewSet, basename="trends")
 router.register("soc-smart-list", SocListSmartViewSet, basename="onet")
+router.register("soc-autocomplete", SocAutocompleteViewSet, basename="autocomplete")
+router.register("soc-tools-search", SocToolSearchViewSet, basename="tools")
 
 urlpatterns = [
+    path("soc-smart-list-async/", async_api.soc_smart_list, name="soc-smart-list-async"),
     path("", include(router.urls)),
 ]